@@ -13,6 +13,9 @@ REPLICAS=(1 2 3)
 SCRNA_DATASETS=(data/atlas200k.h5ad data/pbmc3k_pped.h5ad)
 SPATIAL_DATASETS=(human_lymph_node visium_hne)
 GENE_COUNTS=(5 20 100 200)
+CHUNKED_CASES=(heatmap dotplot stacked_violin)
+CHUNK_SIZES=(5000 20000)
+RANKING_METHODS=(t-test wilcoxon)
 
 # Resolve this file's location whether run or sourced, under bash or zsh.
 if [ -n "${ZSH_VERSION:-}" ]; then
@@ -92,6 +95,30 @@ run_spatial_var() {
     done
 }
 
+run_chunked() {
+    for case in "${CHUNKED_CASES[@]}"; do
+        for dataset in "${SCRNA_DATASETS[@]}"; do
+            for n_genes in "${GENE_COUNTS[@]}"; do
+                for chunk_size in "${CHUNK_SIZES[@]}"; do
+                    for replica in "${REPLICAS[@]}"; do
+                        poetry run python "$SCRIPTS_DIR/chunked.py" -k "$case" -d "$dataset" -n "$n_genes" -c "$chunk_size" -r "$replica"
+                    done
+                done
+            done
+        done
+    done
+}
+
+run_rank_genes_groups() {
+    for dataset in "${SCRNA_DATASETS[@]}"; do
+        for method in "${RANKING_METHODS[@]}"; do
+            for replica in "${REPLICAS[@]}"; do
+                poetry run python "$SCRIPTS_DIR/rank_genes_groups.py" -d "$dataset" -m "$method" -r "$replica"
+            done
+        done
+    done
+}
+
 run_all() {
     run_umap_cat
     run_umap_var
@@ -101,6 +128,8 @@ run_all() {
     run_violin
     run_spatial_cat
     run_spatial_var
+    run_chunked
+    run_rank_genes_groups
 }
 
 # Execute everything only when run directly, not when sourced.
@@ -0,0 +1,202 @@
+"""
+Chunked heatmap-family benchmark: cellestial with ``chunk_size`` vs its baseline.
+
+Measures peak memory and time for building and rendering a heatmap, dotplot or
+stacked violin with the long-form frame built in chunks of ``-c`` observations,
+then appends the results to ``benchmarks/results.feather`` under library
+``cellestial_chunk{c}``. The matching unchunked ``cellestial`` rows already in
+the results (same case, dataset and ``n_cols``) are used as the baseline, so run
+the case's own script first.
+
+Run from the repo root::
+
+    poetry run python benchmarks/scripts/chunked.py -k heatmap -d data/atlas200k.h5ad -n 200 -c 20000 -r 1
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import polars as pl
+import psutil
+import scanpy as sc
+
+import cellestial as cl
+
+CATEGORICAL = 0
+RESULTS = Path(__file__).resolve().parent.parent / "results.feather"
+SCHEMA: dict[str, pl.DataType] = {
+    "library": pl.Utf8,
+    "case": pl.Utf8,
+    "categorical": pl.Int64,
+    "replica_id": pl.Int64,
+    "dataset": pl.Utf8,
+    "n_obs": pl.Int64,
+    "n_cols": pl.Int64,
+    "n_items": pl.Int64,
+    "memory(MB)": pl.Float64,
+    "time(s)": pl.Float64,
+}
+DEDUP_KEYS = ["library", "case", "categorical", "replica_id", "dataset", "n_cols"]
+FUNCTIONS = {
+    "heatmap": cl.heatmap,
+    "dotplot": cl.dotplot,
+    "stacked_violin": cl.stacked_violin,
+}
+
+
+def _pick_group_by(data) -> str:
+    """Return the first available categorical column to group by."""
+    for name in ("leiden", "cell_type_lvl1", "cell_type", "clusters"):
+        if name in data.obs.columns:
+            return name
+    message = f"no categorical group_by column found in {list(data.obs.columns)}"
+    raise ValueError(message)
+
+
+def _pick_genes(data, n: int) -> list[str]:
+    """Return up to ``n`` genes: highly-variable if known, else top mean expression."""
+    var = data.var
+    if "highly_variable_rank" in var.columns:
+        ordered = var["highly_variable_rank"].dropna().sort_values()
+        names = list(ordered.index[:n])
+        if names:
+            return names
+    if "highly_variable" in var.columns:
+        mask = var["highly_variable"].to_numpy().astype(bool)
+        names = list(var.index[mask][:n])
+        if names:
+            return names
+    matrix = data.X
+    mean_expression = np.asarray(matrix.mean(axis=0)).ravel()
+    order = np.argsort(-mean_expression)[:n]
+    return [str(name) for name in data.var_names[order]]
+
+
+def _measure(function) -> tuple[float, float]:
+    """Run ``function`` while sampling RSS; return (peak_delta_MB, seconds)."""
+    process = psutil.Process()
+    gc.collect()
+    baseline = process.memory_info().rss
+    peak = baseline
+    stop = threading.Event()
+
+    def sample() -> None:
+        nonlocal peak
+        while not stop.is_set():
+            peak = max(peak, process.memory_info().rss)
+            time.sleep(0.005)
+
+    sampler = threading.Thread(target=sample, daemon=True)
+    sampler.start()
+    start = time.perf_counter()
+    function()
+    elapsed = time.perf_counter() - start
+    stop.set()
+    sampler.join()
+    peak = max(peak, process.memory_info().rss)
+    return (peak - baseline) / 1e6, elapsed
+
+
+def _render_cellestial(plot) -> None:
+    """Render a cellestial plot to a throwaway SVG."""
+    with tempfile.TemporaryDirectory() as directory:
+        cl.save(plot, "render.svg", path=directory)
+
+
+def _cl_chunked(case: str, data, genes: list[str], group_by: str, chunk_size: int) -> None:
+    # heatmap draws a raster, which has no tooltips to switch off.
+    extra = {} if case == "heatmap" else {"tooltips": "none"}
+    plot = FUNCTIONS[case](data, keys=genes, group_by=group_by, chunk_size=chunk_size, **extra)
+    _render_cellestial(plot)
+
+
+def _baseline(case: str, dataset: str, n_cols: int) -> tuple[float, float] | None:
+    """Mean (memory, time) of the unchunked cellestial rows for this case, if any."""
+    if not RESULTS.exists():
+        return None
+    rows = pl.read_ipc(RESULTS).filter(
+        (pl.col("library") == "cellestial")
+        & (pl.col("case") == case)
+        & (pl.col("dataset") == dataset)
+        & (pl.col("n_cols") == n_cols)
+    )
+    if rows.is_empty():
+        return None
+    return float(rows["memory(MB)"].mean()), float(rows["time(s)"].mean())
+
+
+def _upsert(rows: list[dict[str, object]]) -> None:
+    """Overwrite rows matching the dedup keys and append the rest."""
+    incoming = pl.DataFrame(rows, schema=SCHEMA)
+    if RESULTS.exists():
+        existing = pl.read_ipc(RESULTS)
+        kept = existing.join(incoming.select(DEDUP_KEYS), on=DEDUP_KEYS, how="anti")
+        merged = pl.concat([kept, incoming], how="vertical_relaxed")
+    else:
+        merged = incoming
+    partial = RESULTS.with_suffix(".feather.part")
+    merged.write_ipc(partial)
+    partial.replace(RESULTS)
+
+
+def main() -> None:
+    """Parse arguments, benchmark the chunked build, and append the results."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-r", "--replica", type=int, required=True)
+    parser.add_argument("-d", "--dataset", required=True, help="path to an .h5ad file")
+    parser.add_argument("-n", "--n-genes", type=int, required=True, help="number of genes")
+    parser.add_argument(
+        "-c", "--chunk-size", type=int, required=True, help="observations per chunk"
+    )
+    parser.add_argument("-k", "--case", choices=sorted(FUNCTIONS), default="heatmap")
+    args = parser.parse_args()
+
+    data = sc.read_h5ad(args.dataset)
+    dataset = Path(args.dataset).stem
+    group_by = _pick_group_by(data)
+    genes = _pick_genes(data, args.n_genes)
+    n_obs = int(data.n_obs)
+    n_cols = len(genes)
+    n_items = n_obs * n_cols
+    library = f"cellestial_chunk{args.chunk_size}"
+
+    memory, seconds = _measure(
+        lambda: _cl_chunked(args.case, data, genes, group_by, args.chunk_size)
+    )
+
+    rows = [
+        {
+            "library": library,
+            "case": args.case,
+            "categorical": CATEGORICAL,
+            "replica_id": args.replica,
+            "dataset": dataset,
+            "n_obs": n_obs,
+            "n_cols": n_cols,
+            "n_items": n_items,
+            "memory(MB)": memory,
+            "time(s)": seconds,
+        },
+    ]
+    baseline = _baseline(args.case, dataset, n_cols)
+    _upsert(rows)
+    message = (
+        f"{args.case} {dataset} r{args.replica} n={n_cols} {library} {seconds:.3f}s {memory:.1f}MB"
+    )
+    if baseline is not None:
+        baseline_memory, baseline_time = baseline
+        message += f" | cellestial {baseline_time:.3f}s {baseline_memory:.1f}MB"
+        if baseline_memory > 0:
+            message += f" (memory x{memory / baseline_memory:.2f})"
+    print(message)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""
+Differential-expression benchmark: cellestial's native ranking vs scanpy.
+
+Measures peak memory and time for ranking all genes of every group against the
+rest with ``-m`` (``t-test`` or ``wilcoxon``), once through
+``scanpy.tl.rank_genes_groups`` and once through cellestial's native engine,
+then appends both to ``benchmarks/results.feather`` under case
+``rank_genes_groups_{method}``. The largest score difference between the two
+results is printed as a sanity check.
+
+Run from the repo root::
+
+    poetry run python benchmarks/scripts/rank_genes_groups.py -d data/atlas200k.h5ad -m wilcoxon -r 1
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import polars as pl
+import psutil
+import scanpy as sc
+
+from cellestial.single.differential.ranking import _rank_genes_groups
+
+CATEGORICAL = 1
+RESULTS = Path(__file__).resolve().parent.parent / "results.feather"
+SCHEMA: dict[str, pl.DataType] = {
+    "library": pl.Utf8,
+    "case": pl.Utf8,
+    "categorical": pl.Int64,
+    "replica_id": pl.Int64,
+    "dataset": pl.Utf8,
+    "n_obs": pl.Int64,
+    "n_cols": pl.Int64,
+    "n_items": pl.Int64,
+    "memory(MB)": pl.Float64,
+    "time(s)": pl.Float64,
+}
+DEDUP_KEYS = ["library", "case", "categorical", "replica_id", "dataset", "n_cols"]
+
+
+def _pick_group_by(data) -> str:
+    """Return the first available categorical column to group by."""
+    for name in ("leiden", "cell_type_lvl1", "cell_type", "clusters"):
+        if name in data.obs.columns:
+            return name
+    message = f"no categorical group_by column found in {list(data.obs.columns)}"
+    raise ValueError(message)
+
+
+def _measure(function) -> tuple[float, float]:
+    """Run ``function`` while sampling RSS; return (peak_delta_MB, seconds)."""
+    process = psutil.Process()
+    gc.collect()
+    baseline = process.memory_info().rss
+    peak = baseline
+    stop = threading.Event()
+
+    def sample() -> None:
+        nonlocal peak
+        while not stop.is_set():
+            peak = max(peak, process.memory_info().rss)
+            time.sleep(0.005)
+
+    sampler = threading.Thread(target=sample, daemon=True)
+    sampler.start()
+    start = time.perf_counter()
+    function()
+    elapsed = time.perf_counter() - start
+    stop.set()
+    sampler.join()
+    peak = max(peak, process.memory_info().rss)
+    return (peak - baseline) / 1e6, elapsed
+
+
+def _max_score_difference(data, first: str, second: str) -> float:
+    """Largest absolute score difference between two rankings, matched by gene."""
+    reference, record = data.uns[first], data.uns[second]
+    worst = 0.0
+    for group in reference["names"].dtype.names:
+        positions = {name: index for index, name in enumerate(reference["names"][group])}
+        order = [positions[name] for name in record["names"][group]]
+        difference = np.abs(
+            np.asarray(reference["scores"][group], dtype=float)[order]
+            - np.asarray(record["scores"][group], dtype=float)
+        )
+        worst = max(worst, float(difference.max()))
+    return worst
+
+
+def _upsert(rows: list[dict[str, object]]) -> None:
+    """Overwrite rows matching the dedup keys and append the rest."""
+    incoming = pl.DataFrame(rows, schema=SCHEMA)
+    if RESULTS.exists():
+        existing = pl.read_ipc(RESULTS)
+        kept = existing.join(incoming.select(DEDUP_KEYS), on=DEDUP_KEYS, how="anti")
+        merged = pl.concat([kept, incoming], how="vertical_relaxed")
+    else:
+        merged = incoming
+    partial = RESULTS.with_suffix(".feather.part")
+    merged.write_ipc(partial)
+    partial.replace(RESULTS)
+
+
+def main() -> None:
+    """Parse arguments, benchmark both rankings, and append the results."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-r", "--replica", type=int, required=True)
+    parser.add_argument("-d", "--dataset", required=True, help="path to an .h5ad file")
+    parser.add_argument("-m", "--method", choices=["t-test", "wilcoxon"], default="wilcoxon")
+    args = parser.parse_args()
+
+    data = sc.read_h5ad(args.dataset)
+    data.raw = None
+    dataset = Path(args.dataset).stem
+    group_by = _pick_group_by(data)
+    n_obs = int(data.n_obs)
+    n_cols = int(data.n_vars)
+    n_items = n_obs * n_cols
+    case = f"rank_genes_groups_{args.method}"
+
+    measured = {
+        "scanpy": _measure(
+            lambda: sc.tl.rank_genes_groups(data, group_by, method=args.method, key_added="scanpy")
+        ),
+        "cellestial": _measure(
+            lambda: _rank_genes_groups(data, group_by, method=args.method, key_added="cellestial")
+        ),
+    }
+
+    rows = [
+        {
+            "library": library,
+            "case": case,
+            "categorical": CATEGORICAL,
+            "replica_id": args.replica,
+            "dataset": dataset,
+            "n_obs": n_obs,
+            "n_cols": n_cols,
+            "n_items": n_items,
+            "memory(MB)": memory,
+            "time(s)": seconds,
+        }
+        for library, (memory, seconds) in measured.items()
+    ]
+    _upsert(rows)
+    difference = _max_score_difference(data, "scanpy", "cellestial")
+    for library, (memory, seconds) in measured.items():
+        print(f"{case} {dataset} r{args.replica} {library} {seconds:.3f}s {memory:.1f}MB")
+    print(f"{case} {dataset} max |score difference| {difference:.2e}")
+
+
+if __name__ == "__main__":
+    main()
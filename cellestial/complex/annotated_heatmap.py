@@ -31,7 +31,7 @@ from mudata import MuData
 from cellestial.frames import build_frame
 from cellestial.single.heatmap.utilities import _scale_values
 from cellestial.themes import _THEME_HEATMAP
-from cellestial.util import _fill_gradient, _get_dendrogram, _warn
+from cellestial.util import _cluster_keys, _fill_gradient, _get_dendrogram, _warn
 from cellestial.util.errors import _unsupported_data_type
 from cellestial.util.utilities import _modality_source
 
@@ -299,7 +299,7 @@ def _dendrogram_panel(
     kwargs: dict,
 ) -> PlotSpec:
     """
-    Build the group dendrogram as a panel on one `side` of the heatmap.
+    Build a group (or key) dendrogram as a panel on one `side` of the heatmap.
 
     Leaves sit at the group centers (height 0, next to the tracks); the root
     extends away from the heatmap toward `side`. `position_limits` match the
@@ -347,6 +347,7 @@ def annotated_heatmap(
     scale_axis: Literal[0, 1] | None = None,
     transpose: bool = False,
     dendrogram: bool = False,
+    cluster_keys: bool = False,
     group_lines: bool = True,
     group_lines_color: str = "white",
     group_lines_size: float = 0.6,
@@ -419,6 +420,10 @@ def annotated_heatmap(
     dendrogram : bool, default=False
         Whether to cluster the groups and draw a dendrogram panel to the left.
         The clustering is computed if not already available. Requires `group_by`.
+    cluster_keys : bool, default=False
+        Whether to order the keys by the similarity of their values across rows
+        and draw a dendrogram panel for them along the key axis, outside the
+        column annotation tracks.
     group_lines : bool, default=True
         Whether to draw horizontal separator lines between groups.
     group_lines_color : str, default='white'
@@ -492,9 +497,10 @@ def annotated_heatmap(
     composed with `gggrid`, each keeping its own legend.
 
     When `dendrogram=True` and the requested dendrogram is absent from
-    `data.uns`, plot construction calls `scanpy.tl.dendrogram` and stores the
-    result in `data.uns`. This mutates the input `AnnData`. Precompute the
-    dendrogram under `dendrogram_key` to avoid mutation during plotting.
+    the dataset, plot construction clusters the groups on their mean profile
+    (the principal components when available) and stores the result in the
+    dataset. This mutates the input data. Precompute the dendrogram under
+    `dendrogram_key` to avoid mutation during plotting.
 
     Examples
     --------
@@ -551,6 +557,13 @@ def annotated_heatmap(
     observations = _bin_observations(observations, group_by=group_by, max_rows=max_rows)
     observations = _assign_position_y(observations)
 
+    # CLUSTER: order keys by their profile over the (binned) rows.
+    key_paths = None
+    if cluster_keys:
+        keys, key_paths = _cluster_keys(
+            observations, keys=keys, group_by=group_by, aggregation="binned"
+        )
+
     # BUILD: long-form heatmap frame on shared x / y positions.
     position_x = {key: index for index, key in enumerate(keys)}
     frame = (
@@ -751,6 +764,23 @@ def annotated_heatmap(
             shared_layers,
         )
 
+    # KEY DENDROGRAM panel (key clustering), drawn outermost along the variable axis.
+    if key_paths is not None:
+        key_dendrogram_panel = _apply_layers(
+            _dendrogram_panel(
+                key_paths,
+                group_centers=[float(index) for index in range(n_keys)],
+                n_groups=n_keys,
+                position_limits=key_limits,
+                color=dendrogram_color,
+                size=dendrogram_size,
+                side=variable_side,
+                kwargs=dendrogram_kwargs or {},
+            ),
+            shared_layers,
+        )
+        column_strips.insert(0, key_dendrogram_panel)
+
     # COMPOSE: the observation group (dendrogram outermost, then observation
     # tracks) and the variable group (variable tracks). One group flanks the
     # heatmap horizontally (left/right side), the other vertically (top/bottom),
@@ -760,6 +790,8 @@ def annotated_heatmap(
     observation_panels = ([dendrogram_panel] if dendrogram_panel is not None else []) + row_strips
     observation_thickness = dendrogram_thickness + [row_annotation_width] * len(row_strips)
     variable_thickness = [column_annotation_height] * len(column_strips)
+    if key_paths is not None:
+        variable_thickness[0] = _DENDROGRAM_WIDTH
     if observation_side in ("left", "right"):
         flank_panels, flank_thickness, flank_side = (
             observation_panels,
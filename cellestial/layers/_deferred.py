@@ -1,8 +1,12 @@
 from __future__ import annotations
 
+from concurrent.futures import ThreadPoolExecutor
 from typing import TYPE_CHECKING
 
 from lets_plot.plot.core import FeatureSpec, PlotSpec
+from lets_plot.plot.subplots import SupPlotsSpec
+
+from cellestial.util.operations import _grid_figures, _regrid
 
 if TYPE_CHECKING:
     from collections.abc import Callable
@@ -10,7 +14,7 @@ if TYPE_CHECKING:
     from lets_plot.plot.core import FeatureSpecArray, LayerSpec
 
 
-class DeferredLayer(PlotSpec):
+class DeferredLayer(PlotSpec, SupPlotsSpec):
     """
     A layer whose construction depends on an existing plot's data and aesthetics.
 
@@ -35,6 +39,11 @@ class DeferredLayer(PlotSpec):
     never fire, subclassing restores that fallback via the priority rule.
     The base `__init__` is deliberately bypassed because `DeferredLayer`
     does not carry real plot data; only :meth:`__radd__` is ever used.
+
+    Subclassing `SupPlotsSpec` as well gives grids the same priority, so
+    `grid + cl.layer()` builds the layer for every panel of the grid. The
+    panels are built in parallel threads, which pays off when the layer does
+    real work per panel (e.g. `bracket` on a `violins` grid).
     """
 
     __slots__ = ("_builder",)
@@ -47,5 +56,12 @@ class DeferredLayer(PlotSpec):
         FeatureSpec.__init__(self, kind="deferred", name=None)
         self._builder = builder
 
-    def __radd__(self, plot: PlotSpec) -> PlotSpec:
+    def __radd__(self, plot: PlotSpec | SupPlotsSpec) -> PlotSpec | SupPlotsSpec:
+        if isinstance(plot, SupPlotsSpec):
+            figures = _grid_figures(plot)
+            with ThreadPoolExecutor() as executor:
+                panels = list(
+                    executor.map(lambda figure: None if figure is None else figure + self, figures)
+                )
+            return _regrid(plot, panels)
         return plot + self._builder(plot)
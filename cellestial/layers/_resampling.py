@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from itertools import combinations, islice
+from math import comb
+from typing import Literal
+
+import numpy as np
+
+# Index-matrix entries drawn per chunk; bounds the memory of one resampling chunk.
+_RESAMPLE_ENTRIES = 2_000_000
+
+
+def _resampled_sums(
+    values: np.ndarray,
+    n_pick: int,
+    n_resamples: int,
+    *,
+    replace: bool,
+    seed: np.random.SeedSequence,
+    n_jobs: int | None = None,
+) -> np.ndarray:
+    """
+    Sum `n_pick` values drawn from `values` in each of `n_resamples` resamples.
+
+    Resamples are drawn in chunks as `(chunk, n_pick)` index matrices: random
+    subsets (the `n_pick` smallest of uniform keys) without replacement,
+    uniform indices with replacement. Every chunk has its own child of `seed`,
+    so the result does not depend on `n_jobs`.
+    """
+    n_values = len(values)
+    chunk_size = max(_RESAMPLE_ENTRIES // max(n_values, n_pick, 1), 1)
+    starts = range(0, n_resamples, chunk_size)
+    seeds = seed.spawn(len(starts))
+
+    def draw(chunk: int) -> np.ndarray:
+        rng = np.random.default_rng(seeds[chunk])
+        rows = min(chunk_size, n_resamples - starts[chunk])
+        if replace:
+            indices = rng.integers(0, n_values, size=(rows, n_pick))
+        elif n_pick < n_values:
+            indices = np.argpartition(rng.random((rows, n_values)), n_pick - 1, axis=1)
+            indices = indices[:, :n_pick]
+        else:
+            indices = np.broadcast_to(np.arange(n_values), (rows, n_values))
+        return values[indices].sum(axis=1)
+
+    with ThreadPoolExecutor(max_workers=n_jobs) as executor:
+        sums = list(executor.map(draw, range(len(starts))))
+    return np.concatenate(sums) if sums else np.empty(0)
+
+
+def _permutation_test(
+    first: np.ndarray,
+    second: np.ndarray,
+    *,
+    alternative: Literal["two-sided", "less", "greater"],
+    n_resamples: int,
+    seed: np.random.SeedSequence,
+    n_jobs: int | None = None,
+) -> tuple[float, float]:
+    """
+    Difference in means and its permutation p-value, as `scipy.stats.permutation_test`.
+
+    When the groups can be split in at most `n_resamples` ways, every split is
+    enumerated and the p-value is exact; otherwise `n_resamples` random splits
+    are drawn and the observed split is counted among them.
+    """
+    pooled = np.concatenate([first, second])
+    n_first, n_total = len(first), len(pooled)
+    total = pooled.sum()
+    observed = first.mean() - second.mean()
+
+    exact = comb(n_total, n_first) <= n_resamples
+    if exact:
+        splits = combinations(range(n_total), n_first)
+        chunk_size = max(_RESAMPLE_ENTRIES // n_first, 1)
+        chunks = []
+        while chunk := list(islice(splits, chunk_size)):
+            chunks.append(pooled[np.asarray(chunk, dtype=np.int64)].sum(axis=1))
+        sums = np.concatenate(chunks)
+    else:
+        sums = _resampled_sums(
+            pooled, n_first, n_resamples, replace=False, seed=seed, n_jobs=n_jobs
+        )
+    null = sums / n_first - (total - sums) / (n_total - n_first)
+
+    # compare with a relative tolerance so splits equal to the observed one count
+    gamma = abs(np.finfo(np.float64).eps * 100 * observed)
+    adjustment = 0 if exact else 1
+    n_null = len(null) + adjustment
+    less = (np.count_nonzero(null <= observed + gamma) + adjustment) / n_null
+    greater = (np.count_nonzero(null >= observed - gamma) + adjustment) / n_null
+    if alternative == "less":
+        pvalue = less
+    elif alternative == "greater":
+        pvalue = greater
+    else:
+        pvalue = min(2 * min(less, greater), 1.0)
+    return float(observed), float(pvalue)
+
+
+def _bootstrap_interval(
+    first: np.ndarray,
+    second: np.ndarray,
+    *,
+    confidence_level: float,
+    n_resamples: int,
+    seed: np.random.SeedSequence,
+    n_jobs: int | None = None,
+) -> tuple[float, float]:
+    """Percentile bootstrap interval of the difference in means, each group resampled."""
+    seed_first, seed_second = seed.spawn(2)
+    means_first = _resampled_sums(
+        first, len(first), n_resamples, replace=True, seed=seed_first, n_jobs=n_jobs
+    ) / len(first)
+    means_second = _resampled_sums(
+        second, len(second), n_resamples, replace=True, seed=seed_second, n_jobs=n_jobs
+    ) / len(second)
+    tail = (1 - confidence_level) / 2
+    low, high = np.quantile(means_first - means_second, [tail, 1 - tail])
+    return float(low), float(high)
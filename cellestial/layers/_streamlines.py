@@ -0,0 +1,375 @@
+from __future__ import annotations
+
+from typing import Literal
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+# Velocity-grid constants, as in scvelo's `compute_velocity_on_grid`.
+_GRID_POINTS = 50
+_GRID_PADDING = 0.01
+# Streamline constants, as in matplotlib's `streamplot`.
+_MASK_CELLS = 30
+_MAX_ERROR = 0.003
+_MIN_LENGTH = 0.1
+# Neighbour pairs queried from the KD-tree at a time.
+_QUERY_PAIRS = 2_000_000
+
+_KIND_VISIT = 0  # the point at the start of an attempted step, recorded
+_KIND_MOVE = 1  # an accepted step, checked against and marked in the mask
+_KIND_EDGE = 2  # Euler step onto the domain boundary, recorded
+
+
+def _velocity_grid(
+    coordinates: np.ndarray,
+    velocities: np.ndarray,
+    *,
+    grid_density: float = 1,
+    smooth: float = 0.5,
+    n_neighbors: int | None = None,
+    min_mass: float = 1,
+    cutoff_percentile: float | None = None,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Smooth per-observation velocities onto a regular grid.
+
+    Each grid point averages the velocities of its `n_neighbors` nearest
+    observations (found with a KD-tree) under a Gaussian kernel whose scale is
+    `smooth` grid steps. Points with too little velocity mass, or whose
+    neighbourhood moves less than the `cutoff_percentile` (default 5th)
+    percentile, are set to NaN so no streamline crosses them.
+
+    Returns `(x, y, u, v)`: the grid axes and the `(len(y), len(x))`
+    velocity components.
+    """
+    n_obs = len(coordinates)
+    axes = []
+    for dimension in range(2):
+        low, high = coordinates[:, dimension].min(), coordinates[:, dimension].max()
+        low = low - _GRID_PADDING * np.abs(high - low)
+        high = high + _GRID_PADDING * np.abs(high - low)
+        axes.append(np.linspace(low, high, int(_GRID_POINTS * grid_density)))
+    x_axis, y_axis = axes
+    mesh_x, mesh_y = np.meshgrid(x_axis, y_axis)
+    grid_points = np.column_stack([mesh_x.ravel(), mesh_y.ravel()])
+
+    if n_neighbors is None:
+        n_neighbors = int(n_obs / 50)
+    n_neighbors = min(max(n_neighbors, 1), n_obs)
+    scale = np.mean([axis[1] - axis[0] for axis in axes]) * smooth
+
+    tree = cKDTree(coordinates)
+    magnitudes = np.abs(velocities)
+    step = max(_QUERY_PAIRS // n_neighbors, 1)
+    smoothed, masses, lengths = [], [], []
+    for start in range(0, len(grid_points), step):
+        distances, neighbors = tree.query(
+            grid_points[start : start + step], k=range(1, n_neighbors + 1), workers=-1
+        )
+        weights = np.exp(-0.5 * (distances / scale) ** 2) / (scale * np.sqrt(2 * np.pi))
+        smoothed.append(np.einsum("gk,gkd->gd", weights, velocities[neighbors]))
+        masses.append(weights.sum(axis=1))
+        lengths.append(magnitudes[neighbors].mean(axis=1).sum(axis=1))
+    mass = np.concatenate(masses)
+    grid_velocities = np.concatenate(smoothed) / np.maximum(1, mass)[:, None]
+
+    size = (len(y_axis), len(x_axis))
+    u = grid_velocities[:, 0].reshape(size)
+    v = grid_velocities[:, 1].reshape(size)
+    speed = np.sqrt(u**2 + v**2)
+    threshold = np.clip(10 ** (min_mass - 6), None, np.max(speed) * 0.9)
+    cutoff = speed < threshold
+    length = np.concatenate(lengths).reshape(size)
+    cutoff |= length < np.percentile(length, 5 if cutoff_percentile is None else cutoff_percentile)
+    u[cutoff] = np.nan
+    return x_axis, y_axis, u, v
+
+
+def _spiral(n_x: int, n_y: int) -> np.ndarray:
+    """Mask cells from the corner spiralling inwards, boundary seeds first."""
+    x_first, y_first, x_last, y_last = 0, 1, n_x - 1, n_y - 1
+    x, y = 0, 0
+    direction = "right"
+    cells = np.empty(n_x * n_y, dtype=np.int64)
+    for index in range(n_x * n_y):
+        cells[index] = y * n_x + x
+        if direction == "right":
+            x += 1
+            if x >= x_last:
+                x_last -= 1
+                direction = "up"
+        elif direction == "up":
+            y += 1
+            if y >= y_last:
+                y_last -= 1
+                direction = "left"
+        elif direction == "left":
+            x -= 1
+            if x <= x_first:
+                x_first += 1
+                direction = "down"
+        else:
+            y -= 1
+            if y <= y_first:
+                y_first += 1
+                direction = "right"
+    return cells
+
+
+def _interpolate(field: np.ndarray, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """Bilinear interpolation of `field` at grid coordinates inside the grid."""
+    n_y, n_x = field.shape
+    column = x.astype(np.int64)
+    row = y.astype(np.int64)
+    next_column = np.minimum(column + 1, n_x - 1)
+    next_row = np.minimum(row + 1, n_y - 1)
+    x_fraction = x - column
+    y_fraction = y - row
+    bottom = field[row, column] * (1 - x_fraction) + field[row, next_column] * x_fraction
+    top = field[next_row, column] * (1 - x_fraction) + field[next_row, next_column] * x_fraction
+    return bottom * (1 - y_fraction) + top * y_fraction
+
+
+def _integrate(
+    u: np.ndarray,
+    v: np.ndarray,
+    speed: np.ndarray,
+    x: np.ndarray,
+    y: np.ndarray,
+    *,
+    sign: float,
+    max_step: float,
+    max_length: float,
+) -> tuple[np.ndarray, ...]:
+    """
+    Integrate every seed at once with adaptive-step Heun (RK12) steps.
+
+    Each trajectory keeps its own step size and stops on leaving the grid, on
+    a NaN or zero speed, or past `max_length`; the streamline mask is applied
+    afterwards. Returns the events as flat, trajectory-ordered arrays
+    `(trajectory, x, y, length, kind)` with `length` the path length so far
+    and `kind` one of the `_KIND_*` constants.
+    """
+    n_y, n_x = speed.shape
+
+    def inside(x_grid: np.ndarray, y_grid: np.ndarray) -> np.ndarray:
+        return (x_grid >= 0) & (x_grid <= n_x - 1) & (y_grid >= 0) & (y_grid <= n_y - 1)
+
+    def gradient(x_grid: np.ndarray, y_grid: np.ndarray) -> tuple[np.ndarray, ...]:
+        rate = _interpolate(speed, x_grid, y_grid)
+        valid = np.isfinite(rate) & (rate != 0)
+        inverse = 1.0 / np.where(valid, rate, 1.0)
+        step_x = sign * (_interpolate(u, x_grid, y_grid) * inverse)
+        step_y = sign * (_interpolate(v, x_grid, y_grid) * inverse)
+        return step_x, step_y, valid
+
+    # seeds rounded just outside the grid never start
+    start = inside(x, y)
+    trajectory = np.flatnonzero(start)
+    x, y = x[start].astype(np.float64), y[start].astype(np.float64)
+    step = np.full(len(x), max_step)
+    length = np.zeros(len(x))
+    steps: list[tuple[np.ndarray, ...]] = []
+
+    def record(selected: np.ndarray, at_x, at_y, at_length, kind: int) -> None:
+        steps.append(
+            (trajectory[selected], at_x, at_y, at_length, np.full(len(at_x), kind, dtype=np.int64))
+        )
+
+    while trajectory.size:
+        # every attempt, accepted or not, records the current point
+        record(slice(None), x, y, length, _KIND_VISIT)
+        k1_x, k1_y, running = gradient(x, y)
+        trial_x = x + step * k1_x
+        trial_y = y + step * k1_y
+        edge = running & ~inside(trial_x, trial_y)
+
+        # OUT OF BOUNDS: one Euler step onto the boundary, then stop
+        if edge.any():
+            c_x, c_y, at_x, at_y = k1_x[edge], k1_y[edge], x[edge], y[edge]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                to_x = np.where(c_x < 0, at_x / -c_x, (n_x - 1 - at_x) / c_x)
+                to_y = np.where(c_y < 0, at_y / -c_y, (n_y - 1 - at_y) / c_y)
+            to_x[c_x == 0] = np.inf
+            to_y[c_y == 0] = np.inf
+            boundary = np.minimum(to_x, to_y)
+            record(
+                edge,
+                at_x + c_x * boundary,
+                at_y + c_y * boundary,
+                length[edge] + boundary,
+                _KIND_EDGE,
+            )
+
+        running &= ~edge
+        k2_x, k2_y, valid = gradient(
+            np.where(running, trial_x, 0.0), np.where(running, trial_y, 0.0)
+        )
+        running &= valid
+
+        d1_x = step * k1_x
+        d1_y = step * k1_y
+        d2_x = step * 0.5 * (k1_x + k2_x)
+        d2_y = step * 0.5 * (k1_y + k2_y)
+        error = np.hypot((d2_x - d1_x) / (n_x - 1), (d2_y - d1_y) / (n_y - 1))
+
+        # ACCEPT: steps within tolerance move; leaving the grid or running
+        # past `max_length` stops the trajectory
+        accepted = running & (error < _MAX_ERROR)
+        new_x = x + d2_x
+        new_y = y + d2_y
+        moved = accepted & inside(new_x, new_y)
+        running &= ~(accepted & ~moved)
+        if moved.any():
+            record(moved, new_x[moved], new_y[moved], length[moved], _KIND_MOVE)
+        last = moved & (length + step > max_length)
+        running &= ~last
+        length = np.where(moved, length + step, length)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            adapted = np.minimum(max_step, 0.85 * step * (_MAX_ERROR / error) ** 0.5)
+        step = np.where(error == 0, max_step, adapted)
+        x = np.where(moved, new_x, x)
+        y = np.where(moved, new_y, y)
+
+        trajectory, x, y, step, length = (
+            values[running] for values in (trajectory, x, y, step, length)
+        )
+
+    if not steps:
+        empty = np.empty(0)
+        return empty.astype(np.int64), empty, empty, empty, empty.astype(np.int64)
+    columns = [np.concatenate(column) for column in zip(*steps, strict=True)]
+    order = np.argsort(columns[0], kind="stable")
+    return tuple(column[order] for column in columns)
+
+
+def _streamlines(
+    x_axis: np.ndarray,
+    y_axis: np.ndarray,
+    u: np.ndarray,
+    v: np.ndarray,
+    *,
+    density: float | tuple[float, float] = 1,
+    max_length: float = 4.0,
+    integration_direction: Literal["forward", "backward", "both"] = "both",
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Trace evenly spaced streamlines through a gridded velocity field.
+
+    Follows matplotlib's `streamplot`: seeds are tried on a `30 * density`
+    mask, spiralling in from the boundary, and a streamline stops when it
+    enters a mask cell another streamline (or itself) already crossed.
+    Streamlines shorter than a tenth of the domain are dropped. All seeds are
+    integrated together by `_integrate`; only the cheap mask bookkeeping runs
+    per seed.
+
+    Returns `(points, lengths)`: the data-coordinate vertices of every
+    streamline, concatenated, and the number of vertices of each.
+    """
+    if integration_direction not in ("forward", "backward", "both"):
+        msg = (
+            "`integration_direction` must be one of 'forward', 'backward' or 'both', "
+            f"got {integration_direction!r}."
+        )
+        raise ValueError(msg)
+    n_y, n_x = u.shape
+    mask_x, mask_y = (_MASK_CELLS * np.broadcast_to(density, 2)).astype(int)
+    if mask_x < 0 or mask_y < 0:
+        msg = "`density` must be positive"
+        raise ValueError(msg)
+    if integration_direction == "both":
+        max_length /= 2.0
+
+    # RESCALE: velocities to grid units, speed to axes units
+    dx, dy = x_axis[1] - x_axis[0], y_axis[1] - y_axis[0]
+    u = u * (1.0 / dx)
+    v = v * (1.0 / dy)
+    speed = np.sqrt((u / (n_x - 1)) ** 2 + (v / (n_y - 1)) ** 2)
+    grid_to_mask_x = (mask_x - 1) / (n_x - 1)
+    grid_to_mask_y = (mask_y - 1) / (n_y - 1)
+
+    seeds = _spiral(mask_x, mask_y)
+    seed_x = (seeds % mask_x) * (1.0 / grid_to_mask_x)
+    seed_y = (seeds // mask_x) * (1.0 / grid_to_mask_y)
+    max_step = min(1.0 / mask_x, 1.0 / mask_y, 0.1)
+
+    directions = {
+        "backward": (-1.0,),
+        "forward": (1.0,),
+        "both": (-1.0, 1.0),
+    }[integration_direction]
+    integrated = []
+    for sign in directions:
+        trajectory, x, y, length, kind = _integrate(
+            u, v, speed, seed_x, seed_y, sign=sign, max_step=max_step, max_length=max_length
+        )
+        cell = np.rint(y * grid_to_mask_y).astype(np.int64) * mask_x + np.rint(
+            x * grid_to_mask_x
+        ).astype(np.int64)
+        offsets = np.searchsorted(trajectory, np.arange(len(seeds) + 1))
+        integrated.append((x, y, length, kind, cell, offsets))
+
+    # MASK: walk the seeds in order, truncating each trajectory at the first
+    # cell that is already taken
+    occupied = np.zeros(mask_x * mask_y, dtype=bool)
+    lines: list[np.ndarray] = []
+    # like matplotlib's mask, the current cell carries over between seeds: a
+    # seed in the cell the previous trajectory ended in is not marked
+    current = -1
+    for index, seed in enumerate(seeds):
+        if occupied[seed]:
+            continue
+        taken = []
+        if seed != current:
+            occupied[seed] = True
+            taken.append(np.array([seed]))
+        current = seed
+        total = 0.0
+        halves = []
+        for x, y, length, kind, cell, offsets in integrated:
+            start, stop = offsets[index], offsets[index + 1]
+            moves = start + np.flatnonzero(kind[start:stop] == _KIND_MOVE)
+            move_cells = cell[moves]
+            previous = np.concatenate(([seed], move_cells[:-1]))
+            changed = np.flatnonzero(move_cells != previous)
+            entered = move_cells[changed]
+            blocked = occupied[entered]
+            _, first = np.unique(entered, return_index=True)
+            repeated = np.ones(len(entered), dtype=bool)
+            repeated[first] = False
+            blocked |= repeated
+            end = stop
+            if blocked.any():
+                cut = int(np.argmax(blocked))
+                end = moves[changed[cut]]
+                entered = entered[:cut]
+            occupied[entered] = True
+            taken.append(entered)
+            current = entered[-1] if len(entered) else seed
+            kept = slice(start, end)
+            # a seed that never started records nothing in this direction
+            if end > start:
+                total += length[end - 1]
+            recorded = kind[kept] != _KIND_MOVE
+            halves.append(np.column_stack([x[kept][recorded], y[kept][recorded]]))
+
+        if total <= _MIN_LENGTH:
+            if taken:
+                occupied[np.concatenate(taken)] = False
+            continue
+        # each half starts at the seed; the backward half is reversed
+        if integration_direction == "both":
+            line = np.concatenate([halves[0][::-1], halves[1][1:]])
+        elif integration_direction == "backward":
+            line = halves[0][::-1]
+        else:
+            line = halves[0][1:]
+        lines.append(line)
+
+    if not lines:
+        return np.empty((0, 2)), np.empty(0, dtype=np.int64)
+    points = np.concatenate(lines)
+    points[:, 0] = points[:, 0] / (1.0 / dx) + x_axis[0]
+    points[:, 1] = points[:, 1] / (1.0 / dy) + y_axis[0]
+    return points, np.array([len(line) for line in lines], dtype=np.int64)
@@ -1,14 +1,18 @@
 from __future__ import annotations
 
+from functools import partial
 from itertools import combinations
 from typing import TYPE_CHECKING, Literal
 
 import numpy as np
 import polars as pl
 from lets_plot import aes, geom_bracket
-from scipy.stats import mannwhitneyu, ttest_ind
+from scipy import special
+from scipy.stats import mannwhitneyu
+from scipy.stats import t as student_t
 
 from cellestial.layers._deferred import DeferredLayer
+from cellestial.layers._resampling import _bootstrap_interval, _permutation_test
 from cellestial.util import get_mapping, retrieve
 from cellestial.util.errors import InvalidComparisonError, MissingAestheticError
 
@@ -115,16 +119,156 @@ def _expand_comparisons(
     return expanded
 
 
+def _group_samples(frame: DataFrame, *, x: str, y: str) -> dict[object, np.ndarray]:
+    """Partition the `y` values by `x` in one pass, each group sorted ascending."""
+    partitioned = frame.group_by(x, maintain_order=True).agg(pl.col(y).sort().cast(pl.Float64))
+    return {
+        group: values.to_numpy()
+        for group, values in zip(partitioned[x].to_list(), partitioned[y], strict=True)
+    }
+
+
+def _mannwhitney_pairs(
+    samples: dict[object, np.ndarray],
+    pairs: Sequence[tuple[object, object]],
+    alternative: Literal["two-sided", "less", "greater"],
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Mann-Whitney U statistics and p-values for every pair, as scipy computes them.
+
+    U counts, over the distinct values of the first group, how many values of
+    the (sorted) second group lie below them, ties counting half. The tie
+    correction of the pooled sample is assembled from per-group value counts,
+    so nothing is re-ranked per pair. Pairs that scipy would test exactly
+    (a group of at most 8 values and no ties) are handed to `mannwhitneyu`.
+    """
+    distinct = {}
+    for group, values in samples.items():
+        uniques, counts = np.unique(values, return_counts=True)
+        distinct[group] = (uniques, counts.astype(np.float64), np.sum(counts**3.0 - counts))
+
+    n_pairs = len(pairs)
+    statistics = np.empty(n_pairs)
+    n_first = np.empty(n_pairs)
+    n_second = np.empty(n_pairs)
+    tie_terms = np.empty(n_pairs)
+    exact = []
+    for index, (group_a, group_b) in enumerate(pairs):
+        uniques_a, counts_a, ties_a = distinct[group_a]
+        uniques_b, counts_b, ties_b = distinct[group_b]
+        sorted_b = samples[group_b]
+        below = np.searchsorted(sorted_b, uniques_a, side="left")
+        equal = np.searchsorted(sorted_b, uniques_a, side="right") - below
+        statistics[index] = np.dot(counts_a, below + 0.5 * equal)
+        n_first[index], n_second[index] = len(samples[group_a]), len(sorted_b)
+        # (c_a + c_b)^3 - (c_a + c_b) over the pooled values, from each side's terms
+        _, in_a, in_b = np.intersect1d(
+            uniques_a, uniques_b, assume_unique=True, return_indices=True
+        )
+        shared_a, shared_b = counts_a[in_a], counts_b[in_b]
+        tie_terms[index] = (
+            ties_a + ties_b + np.sum(3 * shared_a * shared_b * (shared_a + shared_b))
+        )
+        if (n_first[index] <= 8 or n_second[index] <= 8) and tie_terms[index] == 0:
+            exact.append(index)
+
+    complement = n_first * n_second - statistics
+    if alternative == "greater":
+        tail, factor = statistics, 1
+    elif alternative == "less":
+        tail, factor = complement, 1
+    else:
+        tail, factor = np.maximum(statistics, complement), 2
+    total = n_first + n_second
+    scale = np.sqrt(n_first * n_second / 12 * ((total + 1) - tie_terms / (total * (total - 1))))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z = (tail - n_first * n_second / 2 - 0.5) / scale
+    pvalues = np.clip(special.ndtr(-z) * factor, 0.0, 1.0)
+
+    for index in exact:
+        group_a, group_b = pairs[index]
+        result = mannwhitneyu(
+            samples[group_a], samples[group_b], alternative=alternative, method="exact"
+        )
+        pvalues[index] = result.pvalue
+    return statistics, pvalues
+
+
+def _ttest_pairs(
+    samples: dict[object, np.ndarray],
+    pairs: Sequence[tuple[object, object]],
+    alternative: Literal["two-sided", "less", "greater"],
+) -> tuple[np.ndarray, np.ndarray]:
+    """Pooled-variance two-sample t statistics and p-values for every pair."""
+    groups = list(samples)
+    position = {group: index for index, group in enumerate(groups)}
+    sizes = np.array([len(samples[group]) for group in groups], dtype=np.float64)
+    means = np.array([samples[group].mean() for group in groups])
+    variances = np.array(
+        [samples[group].var(ddof=1) if len(samples[group]) > 1 else np.nan for group in groups]
+    )
+
+    first = np.array([position[group_a] for group_a, _ in pairs], dtype=np.int64)
+    second = np.array([position[group_b] for _, group_b in pairs], dtype=np.int64)
+    n_a, n_b = sizes[first], sizes[second]
+    freedom = n_a + n_b - 2
+    pooled = ((n_a - 1) * variances[first] + (n_b - 1) * variances[second]) / freedom
+    with np.errstate(divide="ignore", invalid="ignore"):
+        statistics = (means[first] - means[second]) / np.sqrt(pooled * (1 / n_a + 1 / n_b))
+    if alternative == "less":
+        pvalues = student_t.cdf(statistics, freedom)
+    elif alternative == "greater":
+        pvalues = student_t.sf(statistics, freedom)
+    else:
+        pvalues = 2 * student_t.sf(np.abs(statistics), freedom)
+    return statistics, np.clip(pvalues, 0.0, 1.0)
+
+
+def _permutation_pairs(
+    samples: dict[object, np.ndarray],
+    pairs: Sequence[tuple[object, object]],
+    alternative: Literal["two-sided", "less", "greater"],
+    *,
+    n_resamples: int = 9999,
+    seed: np.random.SeedSequence | None = None,
+    n_jobs: int | None = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Differences in means and their permutation p-values for every pair."""
+    seeds = (seed or np.random.SeedSequence()).spawn(len(pairs))
+    results = np.array(
+        [
+            _permutation_test(
+                samples[group_a],
+                samples[group_b],
+                alternative=alternative,
+                n_resamples=n_resamples,
+                seed=pair_seed,
+                n_jobs=n_jobs,
+            )
+            for (group_a, group_b), pair_seed in zip(pairs, seeds, strict=True)
+        ]
+    ).reshape(-1, 2)
+    return results[:, 0], results[:, 1]
+
+
+_PAIRWISE_TESTS = {
+    "mannwhitney": _mannwhitney_pairs,
+    "ttest": _ttest_pairs,
+    "permutation": _permutation_pairs,
+}
+
+
 def _compute_bracket_frame(
     frame: DataFrame,
     *,
     x: str,
     y: str,
     comparisons: Sequence[Sequence[str]] | None,
-    test: Literal["mannwhitney", "ttest"],
+    test: Literal["mannwhitney", "ttest", "permutation"],
     alternative: Literal["two-sided", "less", "greater"],
     correction: Literal["none", "bonferroni", "fdr_bh"],
-    label: Literal["stars", "pvalue", "padj"] | Sequence[Literal["stars", "pvalue", "padj"]],
+    label: Literal["stars", "pvalue", "padj", "ci"]
+    | Sequence[Literal["stars", "pvalue", "padj", "ci"]],
     label_format: str,
     prefix: str,
     prefix_style: Literal["=", "<"] | None,
@@ -133,6 +277,10 @@ def _compute_bracket_frame(
     y_position: float | None,
     y_step: float | None,
     y_padding: float,
+    n_resamples: int = 9999,
+    ci: float | None = None,
+    seed: int | None = 0,
+    n_jobs: int | None = None,
 ) -> DataFrame:
     """Build a `geom_bracket` DataFrame from pairwise significance tests."""
     finite_frame = frame.filter(pl.col(y).is_not_null() & pl.col(y).is_finite())
@@ -148,36 +296,32 @@ def _compute_bracket_frame(
         msg = "No group pairs available to compare."
         raise ValueError(msg)
 
-    # run the pairwise test
-    test_functions = {
-        "mannwhitney": lambda a, b: mannwhitneyu(a, b, alternative=alternative),
-        "ttest": lambda a, b: ttest_ind(a, b, alternative=alternative),
-    }
-    if test not in test_functions:
-        msg = f"`test` must be one of {list(test_functions)}. Received: {test!r}"
+    # run the pairwise tests, all pairs at once
+    if test not in _PAIRWISE_TESTS:
+        msg = f"`test` must be one of {list(_PAIRWISE_TESTS)}. Received: {test!r}"
         raise ValueError(msg)
-    run_test = test_functions[test]
-
-    records = []
-    invalid_comparisons = []
-    for group_a, group_b in pairs:
-        values_a = finite_frame.filter(pl.col(x) == group_a)[y].to_numpy()
-        values_b = finite_frame.filter(pl.col(x) == group_b)[y].to_numpy()
-        if len(values_a) < 2 or len(values_b) < 2:
-            invalid_comparisons.append(
-                f"{group_a!r} ({len(values_a)}) vs {group_b!r} ({len(values_b)})"
-            )
-            continue
-        result = run_test(values_a, values_b)
-        records.append(
-            {
-                "xmin": group_a,
-                "xmax": group_b,
-                "statistic": float(result.statistic),
-                "pvalue": float(result.pvalue),
-            }
+    if alternative not in ("two-sided", "less", "greater"):
+        msg = (
+            "`alternative` must be one of 'two-sided', 'less', 'greater'. "
+            f"Received: {alternative!r}"
         )
+        raise ValueError(msg)
 
+    if n_resamples < 1:
+        msg = f"`n_resamples` must be >= 1, got {n_resamples}."
+        raise ValueError(msg)
+    if ci is not None and not 0 < ci < 1:
+        msg = f"`ci` must be a confidence level between 0 and 1, got {ci}."
+        raise ValueError(msg)
+
+    samples = _group_samples(finite_frame, x=x, y=y)
+    empty = np.empty(0)
+    invalid_comparisons = [
+        f"{group_a!r} ({len(samples.get(group_a, empty))}) "
+        f"vs {group_b!r} ({len(samples.get(group_b, empty))})"
+        for group_a, group_b in pairs
+        if len(samples.get(group_a, empty)) < 2 or len(samples.get(group_b, empty)) < 2
+    ]
     if invalid_comparisons:
         prefix = (
             "No valid group comparisons available. "
@@ -191,7 +335,38 @@ def _compute_bracket_frame(
         )
         raise ValueError(msg)
 
-    brackets = pl.DataFrame(records)
+    # the test and the interval draw from independent streams of one seed
+    test_seed, interval_seed = np.random.SeedSequence(seed).spawn(2)
+    run_test = _PAIRWISE_TESTS[test]
+    if test == "permutation":
+        run_test = partial(run_test, n_resamples=n_resamples, seed=test_seed, n_jobs=n_jobs)
+    statistics, pvalues = run_test(samples, pairs, alternative)
+    brackets = pl.DataFrame(
+        {
+            "xmin": [group_a for group_a, _ in pairs],
+            "xmax": [group_b for _, group_b in pairs],
+            "statistic": statistics,
+            "pvalue": pvalues,
+        }
+    )
+    if ci is not None:
+        intervals = [
+            _bootstrap_interval(
+                samples[group_a],
+                samples[group_b],
+                confidence_level=ci,
+                n_resamples=n_resamples,
+                seed=pair_seed,
+                n_jobs=n_jobs,
+            )
+            for (group_a, group_b), pair_seed in zip(
+                pairs, interval_seed.spawn(len(pairs)), strict=True
+            )
+        ]
+        brackets = brackets.with_columns(
+            ci_low=pl.Series([low for low, _ in intervals], dtype=pl.Float64),
+            ci_high=pl.Series([high for _, high in intervals], dtype=pl.Float64),
+        )
 
     # adjust for multiple testing
     pvalue_adjusted = _correct_pvalues(brackets["pvalue"].to_numpy(), method=correction)
@@ -206,17 +381,20 @@ def _compute_bracket_frame(
 
     # build the label column - one component per label kind, merged row-wise
     label_kinds = [label] if isinstance(label, str) else list(label)
-    valid_kinds = {"stars", "pvalue", "padj"}
+    valid_kinds = {"stars", "pvalue", "padj", "ci"}
     invalid = [kind for kind in label_kinds if kind not in valid_kinds]
     if invalid:
         msg = (
-            "`label` entries must be from 'stars', 'pvalue', 'padj'. "
+            "`label` entries must be from 'stars', 'pvalue', 'padj', 'ci'. "
             f"Received invalid: {invalid!r}"
         )
         raise ValueError(msg)
     if len(label_kinds) == 0:
         msg = "`label` must contain at least one entry."
         raise ValueError(msg)
+    if "ci" in label_kinds and ci is None:
+        msg = "`label='ci'` needs a confidence level in `ci`, e.g. `ci=0.95`."
+        raise ValueError(msg)
 
     pvalues_raw = brackets["pvalue"].to_list()
     pvalues_adj = brackets["pvalue_adj"].to_list()
@@ -242,8 +420,15 @@ def _compute_bracket_frame(
             components.append([_significance_stars(pvalue) for pvalue in pvalues_for_stars])
         elif kind == "pvalue":
             components.append([_format_pvalue(pvalue) for pvalue in pvalues_raw])
-        else:  # "padj"
+        elif kind == "padj":
             components.append([_format_pvalue(pvalue) for pvalue in pvalues_adj])
+        else:  # "ci"
+            components.append(
+                [
+                    f"[{low:{label_format}}, {high:{label_format}}]"
+                    for low, high in zip(brackets["ci_low"], brackets["ci_high"], strict=True)
+                ]
+            )
 
     labels = [separator.join(parts) for parts in zip(*components, strict=True)]
     brackets = brackets.with_columns(label=pl.Series(labels))
@@ -265,11 +450,11 @@ def bracket(
     *,
     plot: PlotSpec | None = None,
     comparisons: Sequence[Sequence[str]] | None = None,
-    test: Literal["mannwhitney", "ttest"] = "mannwhitney",
+    test: Literal["mannwhitney", "ttest", "permutation"] = "mannwhitney",
     alternative: Literal["two-sided", "less", "greater"] = "two-sided",
     correction: Literal["none", "bonferroni", "fdr_bh"] = "fdr_bh",
-    label: Literal["stars", "pvalue", "padj"]
-    | Sequence[Literal["stars", "pvalue", "padj"]] = "stars",
+    label: Literal["stars", "pvalue", "padj", "ci"]
+    | Sequence[Literal["stars", "pvalue", "padj", "ci"]] = "stars",
     label_format: str = ".3g",
     prefix: str = "",
     prefix_style: Literal["=", "<"] | None = "=",
@@ -278,6 +463,10 @@ def bracket(
     y_position: float | None = None,
     y_step: float | None = None,
     y_padding: float = 0.08,
+    n_resamples: int = 9999,
+    ci: float | None = None,
+    seed: int | None = 0,
+    n_jobs: int | None = None,
     color: str | None = "#1f1f1f",
     label_size: float | None = None,
     segment_size: float = 0.5,
@@ -301,10 +490,13 @@ def bracket(
         If None, every pair of groups present in the plot is compared.
         `"*"` on either side expands to all other groups, so
         `[("A", "*")]` compares `A` against every remaining group.
-    test : {'mannwhitney', 'ttest'}, default='mannwhitney'
+    test : {'mannwhitney', 'ttest', 'permutation'}, default='mannwhitney'
         Statistical test used for each pairwise comparison.
         'mannwhitney' is non-parametric and recommended for expression data.
         'ttest' is an independent two-sample t-test (assumes normality).
+        'permutation' tests the difference in means by reshuffling the group
+        labels, with no distributional assumption; suited to small groups
+        such as pseudobulk samples.
     alternative : {'two-sided', 'less', 'greater'}, default='two-sided'
         The alternative hypothesis passed to the underlying test.
     correction : {'none', 'bonferroni', 'fdr_bh'}, default='fdr_bh'
@@ -314,6 +506,8 @@ def bracket(
         'stars' maps p-values to asterisks (`****` < 0.0001, `***` < 0.001,
         `**` < 0.01, `*` < 0.05, `ns` otherwise).
         'pvalue' prints the raw p-value and 'padj' prints the adjusted p-value.
+        'ci' prints the bootstrap interval of the difference in means, and
+        needs `ci`.
         A sequence merges each component with a newline, e.g.
         `label=("stars", "padj")` stacks the stars on top of the adjusted p-value.
     label_format : str, default='.3g'
@@ -349,6 +543,20 @@ def bracket(
     y_padding : float, default=0.08
         Fraction of the `y` range used as vertical padding above the data
         and as the default spacing between stacked brackets.
+    n_resamples : int, default=9999
+        Number of resamples drawn for `test='permutation'` and for `ci`. When
+        two groups can be split in no more ways than this, the permutation
+        test enumerates every split and is exact.
+    ci : float | None, default=None
+        If provided, the confidence level (e.g. 0.95) of a percentile
+        bootstrap interval for the difference in means of each pair, stored
+        in the `ci_low` and `ci_high` columns and available as `label='ci'`.
+    seed : int | None, default=0
+        Seed of the permutations and bootstrap resamples. None draws fresh
+        randomness on every build.
+    n_jobs : int | None, default=None
+        Number of worker threads drawing resamples; None lets the thread
+        pool decide. Results do not depend on it.
     color : str, default='#1f1f1f'
         Color of the brackets and labels.
     label_size : float | None, default=None
@@ -389,6 +597,16 @@ def bracket(
     -----
     Pairwise tests are computed from the plot's retrieved DataFrame using the `x`
     aesthetic as the grouping column and the `y` aesthetic as the value column.
+    The values are split by group once and all pairs are tested together; the
+    statistics and p-values are those of `scipy.stats.mannwhitneyu` and
+    `scipy.stats.ttest_ind`. Added to a grid such as `violins` or `boxplots`,
+    the brackets are computed for every panel, in parallel threads.
+
+    Permutations and bootstrap resamples are drawn in batches as index
+    matrices, in chunks of bounded size, and follow
+    `scipy.stats.permutation_test`: a random permutation p-value counts the
+    observed split, so it is never below `1 / (n_resamples + 1)`. Raise
+    `n_resamples` for p-values small enough to earn `****`.
 
     Examples
     --------
@@ -505,6 +723,10 @@ def bracket(
             y_position=y_position,
             y_step=y_step,
             y_padding=y_padding,
+            n_resamples=n_resamples,
+            ci=ci,
+            seed=seed,
+            n_jobs=n_jobs,
         )
 
         # build and return the layer
@@ -1,11 +1,12 @@
 from __future__ import annotations
 
+from concurrent.futures import ThreadPoolExecutor
 from typing import TYPE_CHECKING, Literal
 
 import numpy as np
 import polars as pl
 from lets_plot import aes, geom_path
-from scipy.stats import gaussian_kde
+from scipy.ndimage import gaussian_filter
 
 from cellestial.layers._deferred import DeferredLayer
 from cellestial.util import _drop_nonfinite_rows, get_mapping
@@ -18,6 +19,40 @@ if TYPE_CHECKING:
     from polars import DataFrame
 
 
+def _smoothed_histograms(
+    points: np.ndarray,
+    codes: np.ndarray,
+    n_groups: int,
+    lower: np.ndarray,
+    upper: np.ndarray,
+    grid_size: int,
+) -> np.ndarray:
+    """
+    Bin the points of every group onto its own `grid_size x grid_size` grid.
+
+    Each point is spread over the four grid nodes around it with bilinear
+    weights (linear binning), all groups at once, with the group code as the
+    leading histogram axis. Returns an array of shape
+    `(n_groups, grid_size, grid_size)` indexed `[group, y, x]`.
+    """
+    spacing = (upper - lower) / (grid_size - 1)
+    position = (points - lower[codes]) / spacing[codes]
+    base = np.clip(np.floor(position).astype(np.int64), 0, grid_size - 2)
+    fraction = position - base
+
+    histograms = np.zeros(n_groups * grid_size * grid_size)
+    offset = codes.astype(np.int64) * grid_size * grid_size
+    for step_y in (0, 1):
+        weight_y = fraction[:, 1] if step_y else 1 - fraction[:, 1]
+        for step_x in (0, 1):
+            weight_x = fraction[:, 0] if step_x else 1 - fraction[:, 0]
+            cells = offset + (base[:, 1] + step_y) * grid_size + base[:, 0] + step_x
+            histograms += np.bincount(
+                cells, weights=weight_x * weight_y, minlength=histograms.size
+            )
+    return histograms.reshape(n_groups, grid_size, grid_size)
+
+
 def _get_density_boundaries(
     frame: DataFrame,
     x: str,
@@ -28,7 +63,15 @@ def _get_density_boundaries(
     level: float = 0.1,
     grid_size: int = 200,
 ) -> DataFrame:
-    """Creates and Returns a DataFrame to encircle the cluster via `geom_path`."""
+    """
+    Creates and Returns a DataFrame to encircle the cluster via `geom_path`.
+
+    The density of every group is a linearly binned histogram on the group's
+    padded bounding box, smoothed by a separable Gaussian whose per-axis
+    bandwidth follows Scott's rule (the diagonal of what `gaussian_kde` would
+    use). All groups are binned in one pass over the frame, and the smoothing
+    and contouring of each group run in a thread pool.
+    """
     from skimage import measure
 
     # 1. Normalize input to a Sequence of Sequences: List[List[str]]
@@ -47,56 +90,92 @@ def _get_density_boundaries(
         )
         raise ValueError(msg)
 
-    boundaries = []
-    for group in groups:
-        group_label = "+".join(group) if len(group) > 1 else group[0]
-        group_frame = frame.filter(pl.col(group_by).is_in(group))
-        points = _drop_nonfinite_rows(group_frame, [x, y]).select([x, y]).to_numpy()
-        if len(points) < 5:
-            continue
-
-        # 2. KDE Calculation
-        kde = gaussian_kde(points.T)
-
-        # 3. Create Grid
-        x_min, y_min = points.min(axis=0) - padding
-        x_max, y_max = points.max(axis=0) + padding
-
-        x_range = np.linspace(x_min, x_max, grid_size)
-        y_range = np.linspace(y_min, y_max, grid_size)
-        xi, yi = np.meshgrid(x_range, y_range)
-
-        # 4. Evaluate Density
-        zi = kde(np.vstack([xi.flatten(), yi.flatten()])).reshape(xi.shape)
+    # 2. Assign every point to each outline it belongs to; a label requested
+    # in several outlines is repeated once per outline
+    labels = ["+".join(group) if len(group) > 1 else group[0] for group in groups]
+    membership = pl.DataFrame(
+        {
+            "__label": [g for group in groups for g in group],
+            "__code": [code for code, group in enumerate(groups) for _ in group],
+        },
+        schema={"__label": pl.String, "__code": pl.Int64},
+    ).unique(maintain_order=True)
+    members = (
+        _drop_nonfinite_rows(frame.select([x, y, group_by]), [x, y])
+        .with_columns(pl.col(group_by).cast(pl.String).alias("__label"))
+        .join(membership, on="__label", how="inner")
+    )
+    summary = (
+        members.group_by("__code")
+        .agg(
+            pl.len().alias("n"),
+            pl.col(x).min().alias("x_min"),
+            pl.col(x).max().alias("x_max"),
+            pl.col(x).std().alias("x_std"),
+            pl.col(y).min().alias("y_min"),
+            pl.col(y).max().alias("y_max"),
+            pl.col(y).std().alias("y_std"),
+        )
+        .filter(pl.col("n") >= 5)
+        .sort("__code")
+    )
+    if summary.is_empty():
+        msg = (
+            "No cluster outline could be computed. "
+            "Requested groups exist but have fewer than 5 points each."
+        )
+        raise ValueError(msg)
 
-        # 5. Extract Contours (The skimage magic)
-        threshold = zi.max() * level
+    # 3. Create one padded grid per outline and bin all points at once
+    kept = summary["__code"].to_numpy()
+    position = np.full(len(groups), -1, dtype=np.int64)
+    position[kept] = np.arange(len(kept))
+    members = members.filter(pl.col("__code").is_in(kept.tolist()))
+    lower = summary.select("x_min", "y_min").to_numpy() - padding
+    upper = summary.select("x_max", "y_max").to_numpy() + padding
+    histograms = _smoothed_histograms(
+        members.select([x, y]).to_numpy().astype(np.float64),
+        position[members["__code"].to_numpy()],
+        len(kept),
+        lower,
+        upper,
+        grid_size,
+    )
+    # Scott's rule, in grid steps: sigma = std * n ** (-1 / 6) for 2D data
+    spacing = (upper - lower) / (grid_size - 1)
+    deviation = np.nan_to_num(summary.select("x_std", "y_std").to_numpy())
+    sigma = deviation * summary["n"].to_numpy()[:, None] ** (-1 / 6) / spacing
+
+    # 4. Smooth and extract contours per outline (the skimage magic)
+    def outline(index: int) -> list[DataFrame]:
+        density = gaussian_filter(
+            histograms[index], sigma=(sigma[index, 1], sigma[index, 0]), mode="constant"
+        )
+        threshold = density.max() * level
+        label = labels[kept[index]]
+        x_range = np.linspace(lower[index, 0], upper[index, 0], grid_size)
+        y_range = np.linspace(lower[index, 1], upper[index, 1], grid_size)
+        paths = []
         # find_contours returns a list of [row, col] arrays
-        contours = measure.find_contours(zi, threshold)
-
-        for i, contour in enumerate(contours):
+        for i, contour in enumerate(measure.find_contours(density, threshold)):
             # Map grid indices back to DIM coordinates
             # Note: skimage returns (row, col) which maps to (y_index, x_index)
             actual_x = np.interp(contour[:, 1], np.arange(grid_size), x_range)
             actual_y = np.interp(contour[:, 0], np.arange(grid_size), y_range)
-
-            boundaries.append(
+            paths.append(
                 pl.DataFrame(
                     {
                         x: actual_x,
                         y: actual_y,
-                        group_by: [group_label] * len(actual_x),
-                        "path": [f"{group_label}_{i}"] * len(actual_x),
+                        group_by: [label] * len(actual_x),
+                        "path": [f"{label}_{i}"] * len(actual_x),
                     }
                 )
             )
+        return paths
 
-    if not boundaries:
-        msg = (
-            "No cluster outline could be computed. "
-            "Requested groups exist but have fewer than 5 points each."
-        )
-        raise ValueError(msg)
+    with ThreadPoolExecutor() as executor:
+        boundaries = [path for paths in executor.map(outline, range(len(kept))) for path in paths]
 
     return pl.concat(boundaries)
 
@@ -181,6 +260,13 @@ def cluster_outlines(
     ValueError
         If no outline can be computed for the requested groups.
 
+    Notes
+    -----
+    Each group's density is a histogram on `grid_size x grid_size` nodes
+    smoothed by a Gaussian with Scott's-rule bandwidths along each axis, a close
+    and much cheaper stand-in for a full kernel density estimate. All groups are
+    binned in one pass over the plot data and contoured in parallel threads.
+
     Examples
     --------
     Outline a specific group or cluster.
@@ -3,6 +3,7 @@ from __future__ import annotations
 import re
 from typing import TYPE_CHECKING, Literal
 
+import numpy as np
 import polars as pl
 from lets_plot import (
     aes,
@@ -12,6 +13,7 @@ from lets_plot import (
 )
 
 from cellestial.layers._deferred import DeferredLayer
+from cellestial.layers._streamlines import _streamlines, _velocity_grid
 from cellestial.util import _drop_nonfinite_rows, get_mapping, retrieve
 from cellestial.util.errors import MissingAestheticError
 
@@ -119,13 +121,14 @@ def stream(
         If dimension numbers cannot be parsed when `velocity_key` is provided.
     KeyError
         If the required velocity columns are not present in the plot data.
-    ImportError
-        If `scvelo` is not installed.
 
     Notes
     -----
-    This function requires the `scvelo` package to be installed.
-    This function utilizes the `matplotlib`'s `streamplot` function to get stream lines.
+    Velocities are smoothed onto a grid with a Gaussian kernel over each grid
+    point's nearest cells (found with a KD-tree), as scvelo's velocity grid
+    does. Streamlines are then traced through the grid the way matplotlib's
+    `streamplot` traces them, all seeds integrated together. Neither scvelo
+    nor matplotlib is needed.
 
     Examples
     --------
@@ -219,68 +222,46 @@ def stream(
             )
             raise KeyError(msg)
 
-        # contained imports
-        try:
-            from matplotlib.figure import Figure
-            from scvelo.plotting.velocity_embedding_grid import compute_velocity_on_grid
-        except ImportError as err:
-            msg = "`scvelo` must be installed to use the stream layer."
-            raise ImportError(msg) from err
-
         frame = _drop_nonfinite_rows(frame, [x, y, x_velocity, y_velocity])
 
         # extract coordinates and velocities as numpy arrays
-        dimensions = frame.select(pl.col(x), pl.col(y)).to_numpy()
+        dimensions = frame.select(pl.col(x), pl.col(y)).to_numpy().astype(np.float64)
         velocities = frame.select(pl.col(x_velocity), pl.col(y_velocity)).to_numpy()
 
-        # compute velocity grid using scvelo's compute_velocity_on_grid
-        X_grid, V_grid = compute_velocity_on_grid(
-            X_emb=dimensions,  # UMAP/tSNE etc. coords
-            V_emb=velocities,  # velocities
-            density=grid_density,
+        # smooth the velocities onto a grid and trace streamlines through it
+        x_axis, y_axis, u, v = _velocity_grid(
+            dimensions,
+            velocities.astype(np.float64),
+            grid_density=grid_density,
             smooth=smooth,
             n_neighbors=n_neighbors,
             min_mass=min_mass,
-            autoscale=False,
-            adjust_for_stream=True,  # reshape output into the meshgrid format for streams
-            cutoff_perc=cutoff_percentile,
+            cutoff_percentile=cutoff_percentile,
         )
-
-        # mock build streamplot to extract line segment coordinates
-        ax = Figure().add_subplot(1, 1, 1)
-        _stream = ax.streamplot(
-            X_grid[0],
-            X_grid[1],
-            V_grid[0],
-            V_grid[1],
+        points, lengths = _streamlines(
+            x_axis,
+            y_axis,
+            u,
+            v,
             density=density,
-            maxlength=max_length,
+            max_length=max_length,
             integration_direction=integration_direction,
         )
-        line_paths = _stream.lines.get_paths()  # extract line segment coordinates
 
-        # extract path segments from streamplot and convert to DataFrame
-        records_path = [
-            {"x": float(x), "y": float(y), "group": i}
-            for i, path in enumerate(line_paths)
-            for x, y in path.vertices
-        ]
-        frame_streams = pl.DataFrame(records_path)
-        # compute arrow coordinates (midpoint of each path segment)
-        frame_arrows = (
-            (
-                frame_streams.group_by("group")
-                .agg(pl.col("x"), pl.col("y"))
-                .with_columns(mid=pl.col("x").list.len() // 2)
-            )
-            .with_columns(
-                pl.col("x").list.get(pl.col("mid")).alias("x"),
-                pl.col("y").list.get(pl.col("mid")).alias("y"),
-                pl.col("x").list.get(pl.col("mid").add(1)).alias("xend"),
-                pl.col("y").list.get(pl.col("mid").add(1)).alias("yend"),
-            )
-            .drop("mid")
-            .sort("group")
+        # one row per streamline vertex
+        groups = np.repeat(np.arange(len(lengths), dtype=np.int64), lengths)
+        frame_streams = pl.DataFrame({"x": points[:, 0], "y": points[:, 1], "group": groups})
+        # one arrow per streamline, from its middle vertex to the next one
+        starts = np.concatenate(([0], np.cumsum(lengths)[:-1])).astype(np.int64)
+        middles = starts + np.minimum(lengths // 2, lengths - 2)
+        frame_arrows = pl.DataFrame(
+            {
+                "group": np.arange(len(lengths), dtype=np.int64),
+                "x": points[middles, 0],
+                "y": points[middles, 1],
+                "xend": points[middles + 1, 0],
+                "yend": points[middles + 1, 1],
+            }
         )
 
         # handle arrow kwargs
@@ -24,6 +24,7 @@ from cellestial.util import (
     _validate_tooltips,
 )
 from cellestial.util.errors import _unsupported_data_type
+from cellestial.util.operations import _register_plot
 
 if TYPE_CHECKING:
     from collections.abc import Sequence
@@ -227,17 +228,13 @@ def xyplot(
     _validate_tooltips(tooltips, frame)
 
     # BUILD: the scatterplot
-    scttr = (
-        ggplot(data=frame)
-        + geom_point(
-            mapping=mapping,
-            tooltips=tooltips,
-            **point_kwargs,
-        )
-        + labs(x=x, y=y)
-        + _THEME_SCATTER
+    point_layer = geom_point(
+        mapping=mapping,
+        tooltips=tooltips,
+        **point_kwargs,
     )
+    scttr = ggplot(data=frame) + point_layer + labs(x=x, y=y) + _THEME_SCATTER
     if interactive:
         scttr += ggtb(size_zoomin=-1)
 
-    return scttr
+    return _register_plot(scttr, [point_layer])
@@ -0,0 +1,421 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+import polars as pl
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+    from typing import Literal
+
+    from numpy.typing import NDArray
+
+# Grid points the values are linearly binned onto before the FFT convolution.
+_KDE_BINS = 1024
+# Multipliers of the rule-of-thumb bandwidths, as in R's `bw.nrd0` and `bw.nrd`.
+_BANDWIDTH_RULES = {"nrd0": 0.9, "nrd": 1.06}
+
+
+def _bandwidths(
+    stats: pl.DataFrame, *, bw: Literal["nrd0", "nrd"] | float, adjust: float
+) -> NDArray:
+    """
+    Bandwidth of every group from its `count`, `sd`, `iqr` and `first` columns.
+
+    A string `bw` picks the rule of thumb `factor * min(sd, iqr / 1.34) * n^(-1/5)`,
+    falling back to the sd, the first value and 1 when the spread is zero, the
+    way R does; a number is used for every group. Both are multiplied by `adjust`.
+    """
+    if not isinstance(bw, str):
+        return np.full(stats.height, float(bw) * adjust)
+    if bw not in _BANDWIDTH_RULES:
+        msg = f"`bw` must be one of {list(_BANDWIDTH_RULES)} or a number, got {bw!r}"
+        raise ValueError(msg)
+    sd = stats["sd"].fill_null(0).to_numpy().astype(np.float64)
+    spread = np.minimum(sd, stats["iqr"].to_numpy() / 1.34)
+    spread = np.where(spread > 0, spread, sd)
+    spread = np.where(spread > 0, spread, np.abs(stats["first"].to_numpy()))
+    spread = np.where(spread > 0, spread, 1.0)
+    count = stats["count"].to_numpy().astype(np.float64)
+    return _BANDWIDTH_RULES[bw] * spread * count ** (-0.2) * adjust
+
+
+def _binned_kde(
+    values: NDArray,
+    codes: NDArray,
+    n_groups: int,
+    *,
+    bandwidths: NDArray,
+    lower: float,
+    upper: float,
+    bins: int = _KDE_BINS,
+) -> tuple[NDArray, NDArray]:
+    """
+    Gaussian densities of all groups on one shared grid, in one vectorised pass.
+
+    `values` belong to the groups `codes` (`0..n_groups-1`). They are linearly
+    binned onto `bins` points spanning `[lower, upper]`, and every group's
+    counts are convolved with its own Gaussian of `bandwidths[group]` by a
+    batched real FFT. Returns the grid and the `(n_groups, bins)` densities,
+    each integrating to 1 over the grid.
+
+    Notes
+    -----
+    The counts are zero-padded to twice the grid, so the circular convolution
+    does not wrap around as long as the grid reaches a few bandwidths past the
+    values; callers pad `[lower, upper]` by that much.
+    """
+    grid = np.linspace(lower, upper, bins)
+    delta = (upper - lower) / (bins - 1) if upper > lower else 1.0
+    position = (values - lower) / delta
+    left = np.clip(np.floor(position).astype(np.int64), 0, bins - 2)
+    right_weight = np.clip(position - left, 0.0, 1.0)
+    cells = codes.astype(np.int64) * bins + left
+    counts = np.bincount(cells, weights=1 - right_weight, minlength=n_groups * bins)
+    counts += np.bincount(cells + 1, weights=right_weight, minlength=n_groups * bins)
+    counts = counts.reshape(n_groups, bins)
+
+    size = 2 * bins
+    frequency = np.fft.rfftfreq(size)
+    kernel = np.exp(-0.5 * (2 * np.pi * frequency[None, :] * (bandwidths[:, None] / delta)) ** 2)
+    smoothed = np.fft.irfft(np.fft.rfft(counts, n=size, axis=1) * kernel, n=size, axis=1)
+    totals = counts.sum(axis=1, keepdims=True)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        density = np.clip(smoothed[:, :bins], 0.0, None) / (totals * delta)
+    return grid, np.nan_to_num(density)
+
+
+def _evaluate(grid: NDArray, density: NDArray, points: NDArray) -> NDArray:
+    """Linear interpolation of each row of `density` at the matching row of `points`."""
+    delta = grid[1] - grid[0] if grid[-1] > grid[0] else 1.0
+    position = (points - grid[0]) / delta
+    left = np.clip(np.floor(position).astype(np.int64), 0, len(grid) - 2)
+    right_weight = np.clip(position - left, 0.0, 1.0)
+    low = np.take_along_axis(density, left, axis=1)
+    high = np.take_along_axis(density, left + 1, axis=1)
+    return low * (1 - right_weight) + high * right_weight
+
+
+def _violin_summary(
+    frame: pl.DataFrame,
+    *,
+    value_column: str,
+    x_column: str,
+    dodge_columns: Sequence[str],
+    scale: Literal["area", "count", "width"] = "area",
+    trim: bool = True,
+    tails_cutoff: float = 3.0,
+    bw: Literal["nrd0", "nrd"] | float = "nrd0",
+    adjust: float = 1.0,
+    n: int = 512,
+    width: float = 1.0,
+) -> tuple[pl.DataFrame, pl.DataFrame, list[str]]:
+    """
+    Violin outlines and box statistics of every group, computed from `frame`.
+
+    A group is a value of `x_column`, split further by `dodge_columns`; groups
+    sit at `0..n_x-1` along x in order of appearance, dodged side by side
+    within `width`. Densities come from `_binned_kde`, evaluated at `n` points
+    over each group's range (widened by `tails_cutoff` bandwidths unless
+    `trim`), and are scaled to half-widths the way `geom_violin` scales them.
+
+    Returns the polygon vertex frame (`violin_id`, `violin_x`, `value_column`
+    and the group columns), one row of statistics per group (`violin_x`,
+    `count`, `lower`, `q1`, `median`, `q3`, `upper`, Tukey whiskers at 1.5 IQR),
+    and the x labels.
+    """
+    if scale not in ("area", "count", "width"):
+        msg = f"scale must be one of 'area', 'count', 'width' (got {scale!r})"
+        raise ValueError(msg)
+    columns = list(dict.fromkeys([x_column, *dodge_columns]))
+    value = pl.col(value_column).cast(pl.Float64)
+    q1, q3 = value.quantile(0.25, "linear"), value.quantile(0.75, "linear")
+    grouped = frame.group_by(columns, maintain_order=True).agg(
+        value.alias("_values"),
+        value.len().alias("count"),
+        value.std().alias("sd"),
+        (q3 - q1).alias("iqr"),
+        value.first().alias("first"),
+        value.min().alias("_min"),
+        value.max().alias("_max"),
+        value.filter(value >= q1 - 1.5 * (q3 - q1)).min().alias("lower"),
+        q1.alias("q1"),
+        value.median().alias("median"),
+        q3.alias("q3"),
+        value.filter(value <= q3 + 1.5 * (q3 - q1)).max().alias("upper"),
+    )
+    labels = frame[x_column].cast(pl.String).unique(maintain_order=True).to_list()
+
+    # dodge slots: each combination of the dodge columns, in order of appearance
+    slot_count = 1
+    slots = np.zeros(grouped.height, dtype=np.int64)
+    if len(columns) > 1:
+        levels = grouped.select(columns[1:]).unique(maintain_order=True).with_row_index("_slot")
+        slot_count = levels.height
+        slots = (
+            grouped.select(columns[1:])
+            .join(levels, on=columns[1:], how="left", nulls_equal=True, maintain_order="left")[
+                "_slot"
+            ]
+            .to_numpy()
+            .astype(np.int64)
+        )
+    x_index = (
+        grouped[x_column].cast(pl.String).replace_strict(labels, range(len(labels))).to_numpy()
+    )
+    body = width / slot_count
+    centres = x_index - width / 2 + (slots + 0.5) * body
+
+    values = grouped["_values"].explode().to_numpy().astype(np.float64)
+    counts = grouped["count"].to_numpy()
+    codes = np.repeat(np.arange(grouped.height), counts)
+    bandwidths = _bandwidths(grouped, bw=bw, adjust=adjust)
+    low, high = grouped["_min"].to_numpy(), grouped["_max"].to_numpy()
+    pad = tails_cutoff * float(bandwidths.max()) if grouped.height else 0.0
+    grid, density = _binned_kde(
+        values,
+        codes,
+        grouped.height,
+        bandwidths=bandwidths,
+        lower=float(low.min()) - pad if grouped.height else 0.0,
+        upper=float(high.max()) + pad if grouped.height else 1.0,
+    )
+
+    if not trim:
+        low, high = low - tails_cutoff * bandwidths, high + tails_cutoff * bandwidths
+    steps = np.linspace(0.0, 1.0, n)
+    points = low[:, None] + (high - low)[:, None] * steps[None, :]
+    heights = _evaluate(grid, density, points)
+    if scale == "count":
+        heights = heights * counts[:, None]
+    peaks = heights.max(axis=1, keepdims=True) if scale == "width" else heights.max()
+    with np.errstate(invalid="ignore", divide="ignore"):
+        half_widths = np.nan_to_num(heights / peaks) * body / 2
+
+    # right side bottom-up, left side top-down
+    outline_x = np.hstack(
+        [centres[:, None] + half_widths, (centres[:, None] - half_widths)[:, ::-1]]
+    )
+    outline_y = np.hstack([points, points[:, ::-1]])
+    violin_id = np.repeat(np.arange(grouped.height), 2 * n)
+    polygons = (
+        grouped.select(columns)
+        .gather(violin_id)
+        .with_columns(
+            pl.Series("violin_id", violin_id),
+            pl.Series("violin_x", outline_x.ravel()),
+            pl.Series(value_column, outline_y.ravel()),
+        )
+    )
+    stats = grouped.select(
+        *columns,
+        pl.Series("violin_x", centres),
+        "count",
+        "lower",
+        "q1",
+        "median",
+        "q3",
+        "upper",
+    )
+    return polygons, stats, labels
+
+
+def _ridge_densities(
+    frame: pl.DataFrame,
+    *,
+    value_column: str,
+    group_columns: Sequence[str],
+    trim: bool = False,
+    tails_cutoff: float | None = None,
+    bw: Literal["nrd0", "nrd"] | float = "nrd0",
+    adjust: float = 1.0,
+    n: int = 512,
+) -> pl.DataFrame:
+    """
+    Ridge densities of every group of `frame`, evaluated at `n` points each.
+
+    A group is a combination of `group_columns`, in order of appearance.
+    Densities come from `_binned_kde` and span the range of all groups, as
+    `geom_area_ridges` draws them, or each group's own range when `trim`,
+    widened by `tails_cutoff` bandwidths when that is given.
+
+    Returns the group columns, `value_column` and `density`, with `height`
+    the density over its largest value across all groups.
+    """
+    columns = list(dict.fromkeys(group_columns))
+    value = pl.col(value_column).cast(pl.Float64)
+    grouped = frame.group_by(columns, maintain_order=True).agg(
+        value.alias("_values"),
+        value.len().alias("count"),
+        value.std().alias("sd"),
+        (value.quantile(0.75, "linear") - value.quantile(0.25, "linear")).alias("iqr"),
+        value.first().alias("first"),
+        value.min().alias("_min"),
+        value.max().alias("_max"),
+    )
+    if grouped.is_empty():
+        return (
+            frame.select(columns, value)
+            .clear()
+            .with_columns(
+                pl.lit(None, pl.Float64).alias("density"), pl.lit(None, pl.Float64).alias("height")
+            )
+        )
+
+    values = grouped["_values"].explode().to_numpy().astype(np.float64)
+    codes = np.repeat(np.arange(grouped.height), grouped["count"].to_numpy())
+    bandwidths = _bandwidths(grouped, bw=bw, adjust=adjust)
+    low, high = grouped["_min"].to_numpy(), grouped["_max"].to_numpy()
+    if not trim:
+        if tails_cutoff is None:
+            low, high = np.full_like(low, low.min()), np.full_like(high, high.max())
+        else:
+            low, high = low - tails_cutoff * bandwidths, high + tails_cutoff * bandwidths
+    pad = 3.0 * float(bandwidths.max())
+    grid, density = _binned_kde(
+        values,
+        codes,
+        grouped.height,
+        bandwidths=bandwidths,
+        lower=min(float(low.min()), float(values.min()) - pad),
+        upper=max(float(high.max()), float(values.max()) + pad),
+    )
+
+    steps = np.linspace(0.0, 1.0, n)
+    points = low[:, None] + (high - low)[:, None] * steps[None, :]
+    densities = _evaluate(grid, density, points)
+    peak = densities.max()
+    return (
+        grouped.select(columns)
+        .gather(np.repeat(np.arange(grouped.height), n))
+        .with_columns(
+            pl.Series(value_column, points.ravel()),
+            pl.Series("density", densities.ravel()),
+            pl.Series("height", densities.ravel() / peak if peak > 0 else densities.ravel()),
+        )
+    )
+
+
+def _bin_edges(
+    lower: float,
+    upper: float,
+    *,
+    bins: int | None = None,
+    binwidth: float | None = None,
+    center: float | None = None,
+    boundary: float | None = None,
+    breaks: Sequence[float] | None = None,
+) -> NDArray:
+    """
+    Histogram bin edges over `[lower, upper]`, placed the way ggplot2 places them.
+
+    `breaks` are used as given. Otherwise the width is `binwidth`, or spans
+    the range in `bins` bins (30 by default) centred on its ends. Edges are
+    aligned to `boundary`, or to `center` minus half a width; `binwidth`
+    alone aligns bin centres to multiples of the width.
+    """
+    if breaks is not None:
+        edges = np.unique(np.asarray(breaks, dtype=np.float64))
+        if len(edges) < 2:
+            msg = f"`breaks` needs at least two distinct edges, got {list(breaks)}"
+            raise ValueError(msg)
+        return edges
+    span = upper - lower
+    if binwidth is not None:
+        if not binwidth > 0:
+            msg = f"`binwidth` must be positive, got {binwidth}"
+            raise ValueError(msg)
+        width = float(binwidth)
+        if center is None and boundary is None:
+            boundary = width / 2
+    else:
+        bins = 30 if bins is None else bins
+        if bins < 1:
+            msg = f"`bins` must be at least 1, got {bins}"
+            raise ValueError(msg)
+        width = span / (bins - 1) if bins > 1 and span > 0 else span or 0.1
+        if center is None and boundary is None:
+            boundary = lower if bins == 1 and span > 0 else lower - width / 2
+    if boundary is None:
+        boundary = center - width / 2
+    origin = boundary + np.floor((lower - boundary) / width) * width
+    count = max(int(np.floor((upper - origin) / width + 1e-8)) + 1, 1)
+    # a bin reaching exactly to `upper` already contains it
+    if count > 1 and np.isclose(origin + (count - 1) * width, upper, rtol=0, atol=width * 1e-8):
+        count -= 1
+    return origin + width * np.arange(count + 1)
+
+
+def _histogram_bars(
+    frame: pl.DataFrame,
+    *,
+    value_column: str,
+    group_columns: Sequence[str],
+    edges: NDArray,
+    position: Literal["stack", "dodge", "identity", "fill"] = "stack",
+) -> pl.DataFrame:
+    """
+    One rectangle per non-empty (group, bin) of `frame`, stacked or dodged.
+
+    Values are counted into the bins of `edges` (closed on the right, the
+    first bin on both sides) per combination of `group_columns`, in one
+    `bincount`. Groups stack in order of appearance, first at the bottom, or
+    are dodged side by side within their bin. Returns the group columns and
+    `bin_start`, `bin_end`, `count`, `count_low`, `count_high`.
+    """
+    if position not in ("stack", "dodge", "identity", "fill"):
+        msg = f"position must be one of 'stack', 'dodge', 'identity', 'fill' (got {position!r})"
+        raise ValueError(msg)
+    columns = list(dict.fromkeys(group_columns))
+    if columns:
+        levels = frame.select(columns).unique(maintain_order=True)
+        codes = (
+            frame.select(columns)
+            .join(
+                levels.with_row_index("_group"),
+                on=columns,
+                how="left",
+                nulls_equal=True,
+                maintain_order="left",
+            )["_group"]
+            .to_numpy()
+            .astype(np.int64)
+        )
+    else:
+        levels = pl.DataFrame({"_all": [0]})
+        codes = np.zeros(frame.height, dtype=np.int64)
+    n_groups, n_bins = levels.height, len(edges) - 1
+
+    values = frame[value_column].cast(pl.Float64).to_numpy()
+    index = np.searchsorted(edges, values, side="left") - 1
+    index[values == edges[0]] = 0
+    inside = (index >= 0) & (index < n_bins)
+    counts = np.bincount(
+        codes[inside] * n_bins + index[inside], minlength=n_groups * n_bins
+    ).reshape(n_groups, n_bins)
+
+    starts = np.broadcast_to(edges[:-1], counts.shape).astype(np.float64)
+    ends = np.broadcast_to(edges[1:], counts.shape).astype(np.float64)
+    low = np.zeros(counts.shape, dtype=np.float64)
+    high = counts.astype(np.float64)
+    if position in ("stack", "fill"):
+        high = np.cumsum(counts, axis=0).astype(np.float64)
+        low = high - counts
+        if position == "fill":
+            with np.errstate(invalid="ignore", divide="ignore"):
+                low, high = np.nan_to_num(low / high[-1]), np.nan_to_num(high / high[-1])
+    elif position == "dodge":
+        share = (ends - starts) / n_groups
+        starts = starts + np.arange(n_groups)[:, None] * share
+        ends = starts + share
+
+    group, bin_index = np.nonzero(counts)
+    bars = levels.gather(group) if columns else pl.DataFrame()
+    return bars.with_columns(
+        pl.Series("bin_start", starts[group, bin_index]),
+        pl.Series("bin_end", ends[group, bin_index]),
+        pl.Series("count", counts[group, bin_index]),
+        pl.Series("count_low", low[group, bin_index]),
+        pl.Series("count_high", high[group, bin_index]),
+    )
@@ -34,6 +34,7 @@ from cellestial.util import (
     _warn,
 )
 from cellestial.util.errors import _unsupported_data_type
+from cellestial.util.operations import _register_plot
 
 if TYPE_CHECKING:
     from lets_plot.plot.core import PlotSpec
@@ -310,16 +311,13 @@ def dimensional(
     # BUILD: scatter plot
     if "size" in mapping.as_dict():
         size = None
-    scttr = (
-        ggplot(data=frame)
-        + geom_point(
-            mapping=aes(x=x, y=y, color=key, **mapping.as_dict()),
-            size=size,
-            tooltips=tooltips,
-            **point_kwargs,
-        )
-        + _THEME_DIMENSION
+    point_layer = geom_point(
+        mapping=aes(x=x, y=y, color=key, **mapping.as_dict()),
+        size=size,
+        tooltips=tooltips,
+        **point_kwargs,
     )
+    scttr = ggplot(data=frame) + point_layer + _THEME_DIMENSION
 
     if key is not None:
         # CASE1 ---------------------- CATEGORICAL DATA ----------------------
@@ -381,4 +379,4 @@ def dimensional(
             msg = f"key `{key}` is not categorical, legend on data will not be added"
             _warn(msg)
 
-    return scttr
+    return _register_plot(scttr, [point_layer])
@@ -40,6 +40,11 @@ def violin(
     observations_name: str = "Barcode",
     variables_name: str = "Variable",
     show_points: bool = True,
+    summary: bool = False,
+    summary_box: bool = False,
+    max_points_per_group: int | None = None,
+    keep_outliers: bool = False,
+    point_seed: int | None = 0,
     interactive: bool = False,
     value_column: str = "value",
     variable_column: str = "variable",
@@ -110,6 +115,33 @@ def violin(
         The name to give to variable index column in the dataframe.
     show_points : bool, default=True
         Whether to show points.
+    summary : bool, default=False
+        Whether to compute the violins in cellestial instead of in the browser.
+        Densities (a binned FFT Gaussian KDE) are computed per group and drawn
+        as polygons, so the plot carries a few hundred numbers per group
+        instead of every observation. The `geom_violin` stat parameters
+        `scale`, `trim`, `tails_cutoff`, `bw`, `adjust`, `n` and `width` are
+        honoured. Points, when shown, still carry every observation unless
+        capped by `max_points_per_group`. The groups sit at integer positions
+        of a continuous x axis labelled with their names, so adjust it with
+        `scale_x_continuous` rather than `scale_x_discrete`. `retrieve` returns
+        the per-observation frame with the position in a `violin_x` column,
+        which is also what `bracket` compares, so its `comparisons` name the
+        groups by position (`0`, `1`, ...).
+    summary_box : bool, default=False
+        With `summary`, draw the quartiles, Tukey whiskers and median of each
+        group over its violin.
+    max_points_per_group : int | None, default=None
+        Draw at most this many points per group (each combination of
+        `group_by`, `fill` and `color`), from a seeded random subsample.
+        Only the point layer is subsampled; the violins are still computed
+        from every observation.
+    keep_outliers : bool, default=False
+        With `max_points_per_group`, always keep the points beyond the
+        whiskers (1.5 IQR past the quartiles of their group); the other
+        points fill the rest of the cap.
+    point_seed : int | None, default=0
+        Seed of the `max_points_per_group` subsample.
     interactive : bool, default=False
         Whether to make the plot interactive.
     variable_column : str, default='variable'
@@ -222,6 +254,24 @@ def violin(
             + ggsize(800, 400)
         )
         violin
+
+    Compute the violins, quartiles and whiskers in cellestial.
+
+    .. jupyter-execute::
+        :emphasize-lines: 6-7
+
+        violin = (
+            cl.violin(
+                data,
+                "CD14",
+                fill="cell_type_lvl1",
+                summary=True,
+                summary_box=True,
+                show_points=False,
+            )
+            + ggsize(800, 400)
+        )
+        violin
     """
     return _distribution(
         data=data,
@@ -248,6 +298,11 @@ def violin(
         observations_name=observations_name,
         variables_name=variables_name,
         show_points=show_points,
+        max_points_per_group=max_points_per_group,
+        keep_outliers=keep_outliers,
+        point_seed=point_seed,
+        summary=summary,
+        summary_box=summary_box,
         interactive=interactive,
         value_column=value_column,
         variable_column=variable_column,
@@ -281,6 +336,9 @@ def boxplot(
     observations_name: str = "Barcode",
     variables_name: str = "Variable",
     show_points: bool = True,
+    max_points_per_group: int | None = None,
+    keep_outliers: bool = False,
+    point_seed: int | None = 0,
     interactive: bool = False,
     value_column: str = "value",
     variable_column: str = "variable",
@@ -351,6 +409,17 @@ def boxplot(
         The name to give to variable index column in the dataframe.
     show_points : bool, default=True
         Whether to show points.
+    max_points_per_group : int | None, default=None
+        Draw at most this many points per group (each combination of
+        `group_by`, `fill` and `color`), from a seeded random subsample.
+        Only the point layer is subsampled; the boxes are still computed
+        from every observation.
+    keep_outliers : bool, default=False
+        With `max_points_per_group`, always keep the points beyond the
+        whiskers (1.5 IQR past the quartiles of their group); the other
+        points fill the rest of the cap.
+    point_seed : int | None, default=0
+        Seed of the `max_points_per_group` subsample.
     interactive : bool, default=False
         Whether to make the plot interactive.
     variable_column : str, default='variable'
@@ -483,6 +552,9 @@ def boxplot(
         observations_name=observations_name,
         variables_name=variables_name,
         show_points=show_points,
+        max_points_per_group=max_points_per_group,
+        keep_outliers=keep_outliers,
+        point_seed=point_seed,
         interactive=interactive,
         value_column=value_column,
         variable_column=variable_column,
@@ -505,6 +577,7 @@ def histogram(
     fill: str | None = None,
     bins: int | None = None,
     binwidth: float | None = None,
+    precompute: bool = False,
     threshold: float | None = None,
     add_keys: Sequence[str] | str | None = None,
     tooltips: Literal["none"] | Sequence[str] | FeatureSpec | None = None,
@@ -556,6 +629,14 @@ def histogram(
         Number of bins. Overridden by `binwidth` if both are provided.
     binwidth : float | None, default=None
         Width of each bin. Takes precedence over `bins`.
+    precompute : bool, default=False
+        Whether to bin the values in cellestial instead of in the browser.
+        Bin edges and counts are computed per `fill`/`color` group and drawn
+        as rectangles, stacked, dodged or filled by `position` (a
+        `geom_histogram` parameter), so the plot carries a few numbers per bin
+        instead of every observation. `bins` centres its bins on the ends of
+        the range; `binwidth`, `center`, `boundary` and `breaks` place them as
+        in `geom_histogram`. `retrieve` still returns the per-observation frame.
     threshold : float | None, default=None
         If provided, filters out rows where the value column is below the threshold.
     add_keys : Sequence[str] | str | None, default=None
@@ -647,6 +728,7 @@ def histogram(
         observations_name=observations_name,
         variables_name=variables_name,
         show_points=False,
+        summary=precompute,
         interactive=interactive,
         value_column=value_column,
         variable_column=variable_column,
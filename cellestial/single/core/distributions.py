@@ -2,10 +2,13 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING, Any, Literal
 
+import numpy as np
+import polars as pl
 from lets_plot import gggrid, ggtb
 from lets_plot.plot.core import FeatureSpec, LayerSpec
 
 from cellestial.frames import build_frame
+from cellestial.single.core._summary import _bin_edges
 from cellestial.single.core.distribution import boxplot, histogram, violin
 from cellestial.util import (
     _collect_aes_columns,
@@ -47,6 +50,11 @@ def violins(
     observations_name: str = "Barcode",
     variables_name: str = "Variable",
     show_points: bool = True,
+    summary: bool = False,
+    summary_box: bool = False,
+    max_points_per_group: int | None = None,
+    keep_outliers: bool = False,
+    point_seed: int | None = 0,
     interactive: bool = False,
     value_column: str = "value",
     variable_column: str = "variable",
@@ -130,6 +138,33 @@ def violins(
         The name to give to variable index column in the dataframe.
     show_points : bool, default=True
         Whether to show points.
+    summary : bool, default=False
+        Whether to compute the violins in cellestial instead of in the browser.
+        Densities (a binned FFT Gaussian KDE) are computed per group and drawn
+        as polygons, so the plot carries a few hundred numbers per group
+        instead of every observation. The `geom_violin` stat parameters
+        `scale`, `trim`, `tails_cutoff`, `bw`, `adjust`, `n` and `width` are
+        honoured. Points, when shown, still carry every observation unless
+        capped by `max_points_per_group`. The groups sit at integer positions
+        of a continuous x axis labelled with their names, so adjust it with
+        `scale_x_continuous` rather than `scale_x_discrete`. `retrieve` returns
+        the per-observation frame with the position in a `violin_x` column,
+        which is also what `bracket` compares, so its `comparisons` name the
+        groups by position (`0`, `1`, ...).
+    summary_box : bool, default=False
+        With `summary`, draw the quartiles, Tukey whiskers and median of each
+        group over its violin.
+    max_points_per_group : int | None, default=None
+        Draw at most this many points per group (each combination of
+        `group_by`, `fill` and `color`), from a seeded random subsample.
+        Only the point layer is subsampled; the violins are still computed
+        from every observation.
+    keep_outliers : bool, default=False
+        With `max_points_per_group`, always keep the points beyond the
+        whiskers (1.5 IQR past the quartiles of their group); the other
+        points fill the rest of the cap.
+    point_seed : int | None, default=0
+        Seed of the `max_points_per_group` subsample.
     interactive : bool, default=False
         Whether to make the plot interactive.
     variable_column : str, default='variable'
@@ -292,6 +327,11 @@ def violins(
             observations_name=observations_name,
             variables_name=variables_name,
             show_points=show_points,
+            max_points_per_group=max_points_per_group,
+            keep_outliers=keep_outliers,
+            point_seed=point_seed,
+            summary=summary,
+            summary_box=summary_box,
             value_column=value_column,
             variable_column=variable_column,
             point_kwargs=point_kwargs,
@@ -353,6 +393,9 @@ def boxplots(
     observations_name: str = "Barcode",
     variables_name: str = "Variable",
     show_points: bool = True,
+    max_points_per_group: int | None = None,
+    keep_outliers: bool = False,
+    point_seed: int | None = 0,
     interactive: bool = False,
     value_column: str = "value",
     variable_column: str = "variable",
@@ -436,6 +479,17 @@ def boxplots(
         The name to give to variable index column in the dataframe.
     show_points : bool, default=True
         Whether to show points.
+    max_points_per_group : int | None, default=None
+        Draw at most this many points per group (each combination of
+        `group_by`, `fill` and `color`), from a seeded random subsample.
+        Only the point layer is subsampled; the boxes are still computed
+        from every observation.
+    keep_outliers : bool, default=False
+        With `max_points_per_group`, always keep the points beyond the
+        whiskers (1.5 IQR past the quartiles of their group); the other
+        points fill the rest of the cap.
+    point_seed : int | None, default=0
+        Seed of the `max_points_per_group` subsample.
     interactive : bool, default=False
         Whether to make the plot interactive.
     variable_column : str, default='variable'
@@ -597,6 +651,9 @@ def boxplots(
             observations_name=observations_name,
             variables_name=variables_name,
             show_points=show_points,
+            max_points_per_group=max_points_per_group,
+            keep_outliers=keep_outliers,
+            point_seed=point_seed,
             value_column=value_column,
             variable_column=variable_column,
             point_kwargs=point_kwargs,
@@ -648,6 +705,8 @@ def histograms(
     fill: str | None = None,
     bins: int | None = None,
     binwidth: float | None = None,
+    precompute: bool = False,
+    shared_bins: bool = False,
     threshold: float | None = None,
     add_keys: Sequence[str] | str | None = None,
     tooltips: Literal["none"] | Sequence[str] | FeatureSpec | None = None,
@@ -711,6 +770,13 @@ def histograms(
         Number of bins. Overridden by `binwidth` if both are provided.
     binwidth : float | None, default=None
         Width of each bin. Takes precedence over `bins`.
+    precompute : bool, default=False
+        Whether to bin the values in cellestial instead of in the browser.
+        `retrieve` still returns the per-observation frame of each panel.
+        See `histogram`.
+    shared_bins : bool, default=False
+        Whether every panel uses the same bin edges, computed once over the
+        values of all keys, so bars line up across panels.
     threshold : float | None, default=None
         If provided, filters out rows where the value column is below the threshold.
     add_keys : Sequence[str] | str | None, default=None
@@ -847,6 +913,27 @@ def histograms(
         metadata_columns=metadata_columns,
     )
 
+    if shared_bins:
+        lower, upper = np.inf, -np.inf
+        for key in keys:
+            values = frame[key].cast(pl.Float64)
+            values = values.filter(values.is_finite())
+            if threshold is not None:
+                values = values.filter(values >= threshold)
+            if not values.is_empty():
+                lower, upper = min(lower, values.min()), max(upper, values.max())
+        if np.isfinite(lower):
+            edges = _bin_edges(
+                lower,
+                upper,
+                bins=bins,
+                binwidth=binwidth,
+                center=geom_kwargs.get("center"),
+                boundary=geom_kwargs.get("boundary"),
+                breaks=geom_kwargs.get("breaks"),
+            )
+            geom_kwargs = {**geom_kwargs, "breaks": edges.tolist()}
+
     plots = []
     for i, key in enumerate(keys):
         plot = histogram(
@@ -862,6 +949,7 @@ def histograms(
             fill=fill,
             bins=bins,
             binwidth=binwidth,
+            precompute=precompute,
             threshold=threshold,
             add_keys=add_keys,
             tooltips=tooltips,
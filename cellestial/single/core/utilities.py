@@ -3,6 +3,7 @@ from __future__ import annotations
 from collections.abc import Sequence
 from typing import TYPE_CHECKING, Any, Literal
 
+import numpy as np
 import polars as pl
 from anndata import AnnData
 from lets_plot import (
@@ -11,17 +12,24 @@ from lets_plot import (
     geom_histogram,
     geom_jitter,
     geom_point,
+    geom_polygon,
+    geom_rect,
+    geom_segment,
     geom_sina,
     geom_violin,
     ggplot,
     ggtb,
+    labs,
     position_dodge,
+    position_jitter,
     position_jitterdodge,
+    scale_x_continuous,
 )
 from lets_plot.plot.core import FeatureSpec, PlotSpec
 from mudata import MuData
 
 from cellestial.frames import build_frame
+from cellestial.single.core._summary import _bin_edges, _histogram_bars, _violin_summary
 from cellestial.themes import _THEME_DIST
 from cellestial.util import (
     _collect_aes_columns,
@@ -33,6 +41,7 @@ from cellestial.util import (
     _warn,
 )
 from cellestial.util.errors import _unsupported_data_type
+from cellestial.util.operations import _register_plot
 
 if TYPE_CHECKING:
     from lets_plot.plot.core import PlotSpec
@@ -68,6 +77,11 @@ def _distribution(
     value_column: str = "value",
     variable_column: str = "variable",
     point_kwargs: dict[str, Any] | None = None,
+    summary: bool = False,
+    summary_box: bool = False,
+    max_points_per_group: int | None = None,
+    keep_outliers: bool = False,
+    point_seed: int | None = 0,
     **geom_kwargs,
 ) -> PlotSpec:
     # Handling Data types
@@ -228,11 +242,40 @@ def _distribution(
     ]
 
     # BUILD: the plot
-    dst = ggplot(data=frame) + _THEME_DIST
+    # summary violins and histograms carry their densities, box statistics or
+    # bin counts on their own layers; the per-observation frame then only
+    # reaches the point layer
+    summary = summary and geom in ("violin", "histogram")
+    dst = ggplot(data=None if summary else frame) + _THEME_DIST
+    summary_layers = None
+    point_x = group_by
 
     # add the geom layer
-    if geom == "violin":
-        dst += geom_violin(
+    if summary and geom == "histogram":
+        geom_layer = _histogram_layers(
+            frame,
+            value_column=value_column,
+            mapping=mapping,
+            geom_fill=geom_fill,
+            geom_color=geom_color,
+            tooltips=tooltips,
+            **geom_kwargs,
+        )
+    elif summary:
+        violin_layers, summary_layers, frame = _violin_summary_layers(
+            frame,
+            group_by=group_by,
+            value_column=value_column,
+            mapping=mapping,
+            geom_fill=geom_fill,
+            geom_color=geom_color,
+            tooltips=tooltips,
+            **geom_kwargs,
+        )
+        geom_layer = violin_layers
+        point_x = "violin_x"
+    elif geom == "violin":
+        geom_layer = geom_violin(
             mapping=aes(
                 x=group_by,
                 y=value_column,
@@ -244,7 +287,7 @@ def _distribution(
             **geom_kwargs,
         )
     elif geom == "boxplot":
-        dst += geom_boxplot(
+        geom_layer = geom_boxplot(
             mapping=aes(
                 x=group_by,
                 y=value_column,
@@ -258,7 +301,7 @@ def _distribution(
     elif geom == "histogram":
         # histogram puts the value on the x-axis; grouping rides `fill` (from
         # mapping), not the x-axis, so `group_by` only filters rows here.
-        dst += geom_histogram(
+        geom_layer = geom_histogram(
             mapping=aes(
                 x=value_column,
                 **mapping.as_dict(),
@@ -268,6 +311,7 @@ def _distribution(
             tooltips=geom_tooltips,
             **geom_kwargs,
         )
+    dst += geom_layer
 
     # handle the points (jitter,point,sina)
     if show_points:
@@ -283,6 +327,9 @@ def _distribution(
                 "point": position_dodge(width=dodge_width),
                 "sina": None,
             }
+            if summary:
+                # summary violins are already placed (and dodged) at `violin_x`
+                positions.update(jitter=position_jitter(width=0.4, height=0), point="identity")
             geom_function = geom_functions.get(point_geom, geom_jitter)
             if "position" not in point_kwargs:
                 position = positions.get(point_geom, position_jitterdodge())
@@ -292,9 +339,26 @@ def _distribution(
             point_kwargs.update(color=point_color, alpha=point_alpha, size=point_size)
             for key in point_mapping.as_dict():
                 point_kwargs.pop(key, None)
+            # the geom keeps its statistics on `frame`; only the points are capped
+            point_frame = frame
+            if max_points_per_group is not None:
+                strata = [
+                    column
+                    for column in (group_by, mapping_fill, mapping_color)
+                    if isinstance(column, str) and not frame[column].dtype.is_float()
+                ]
+                point_frame = _cap_points(
+                    frame,
+                    strata,
+                    value_column,
+                    max_points=max_points_per_group,
+                    keep_outliers=keep_outliers,
+                    seed=point_seed,
+                    coef=geom_kwargs.get("coef", 1.5),
+                )
             dst += geom_function(
-                data=frame,
-                mapping=aes(x=group_by, y=value_column, **point_mapping.as_dict()),
+                data=point_frame,
+                mapping=aes(x=point_x, y=value_column, **point_mapping.as_dict()),
                 tooltips=tooltips,
                 position=position,
                 **point_kwargs,
@@ -303,8 +367,244 @@ def _distribution(
             msg = "point_geom must be one of ['jitter','point','sina']."
             raise ValueError(msg)
 
+    # the box statistics go over the points so they stay readable
+    if summary_layers is not None and summary_box:
+        dst += summary_layers
+
     # handle interactive
     if interactive:
         dst += ggtb(size_zoomin=-1)
 
-    return dst
+    # summary plots have no shared frame; `retrieve` and deferred layers get the
+    # per-observation one (at `violin_x` for summary violins) from the registry
+    return _register_plot(dst, [geom_layer], frame=frame if summary else None)
+
+
+def _violin_summary_layers(
+    frame: pl.DataFrame,
+    *,
+    group_by: str,
+    value_column: str,
+    mapping: FeatureSpec,
+    geom_fill: str | None,
+    geom_color: str | None,
+    tooltips: Literal["none"] | Sequence[str] | FeatureSpec | None,
+    scale: Literal["area", "count", "width"] = "area",
+    trim: bool = True,
+    tails_cutoff: float = 3.0,
+    bw: Literal["nrd0", "nrd"] | float = "nrd0",
+    adjust: float = 1.0,
+    n: int = 512,
+    width: float = 1.0,
+    kernel: str = "gaussian",
+    **geom_kwargs,
+) -> tuple[FeatureSpec, FeatureSpec, pl.DataFrame]:
+    """
+    Identity-stat layers drawing the violins of `frame` from precomputed summaries.
+
+    Densities and box statistics come from `_violin_summary`, with the
+    `geom_violin` stat parameters it understands; the remaining `geom_kwargs`
+    go to the outline polygons. Groups of `group_by` sit at integer x positions
+    labelled with their names, and `fill`/`color` columns of `mapping` dodge
+    them as `geom_violin` would.
+
+    Returns the violin layers (polygons and the x scale), the box layers
+    (whiskers, interquartile bar and median) and `frame` with the `violin_x`
+    position of each observation for the point layer.
+    """
+    if kernel != "gaussian":
+        msg = f"summary violins use a gaussian kernel, got kernel={kernel!r}"
+        raise ValueError(msg)
+    aesthetics = mapping.as_dict()
+    dodge_columns = [
+        column
+        for name in ("fill", "color")
+        if isinstance(column := aesthetics.get(name), str) and column != group_by
+    ]
+    polygons, stats, labels = _violin_summary(
+        frame,
+        value_column=value_column,
+        x_column=group_by,
+        dodge_columns=dodge_columns,
+        scale=scale,
+        trim=trim,
+        tails_cutoff=tails_cutoff,
+        bw=bw,
+        adjust=adjust,
+        n=n,
+        width=width,
+    )
+    columns = list(dict.fromkeys([group_by, *dodge_columns]))
+    # aesthetics mapped to per-observation columns have nothing to map on a summary
+    group_mapping = {
+        name: column
+        for name, column in aesthetics.items()
+        if isinstance(column, str) and column in columns
+    }
+    outline = geom_color if geom_color is not None else None if "color" in group_mapping else "pen"
+    show_tooltips = tooltips != "none"
+
+    violin_layers = geom_polygon(
+        data=polygons,
+        mapping=aes(x="violin_x", y=value_column, group="violin_id", **group_mapping),
+        fill=geom_fill if geom_fill is not None else None if "fill" in group_mapping else "paper",
+        color=outline,
+        tooltips=columns if show_tooltips else "none",
+        **geom_kwargs,
+    )
+    # the padding a discrete axis leaves around its first and last group
+    violin_layers += scale_x_continuous(
+        breaks=list(range(len(labels))),
+        labels=labels,
+        limits=[-0.7, len(labels) - 0.3],
+        expand=[0, 0],
+    )
+    violin_layers += labs(y=value_column)
+    box_color = outline if outline is not None else "pen"
+    summary_layers = geom_segment(
+        data=stats,
+        mapping=aes(x="violin_x", y="lower", xend="violin_x", yend="upper"),
+        color=box_color,
+        size=0.5,
+        tooltips="none",
+    )
+    summary_layers += geom_segment(
+        data=stats,
+        mapping=aes(x="violin_x", y="q1", xend="violin_x", yend="q3"),
+        color=box_color,
+        size=2,
+        tooltips=[*columns, "count", "lower", "q1", "median", "q3", "upper"]
+        if show_tooltips
+        else "none",
+    )
+    summary_layers += geom_point(
+        data=stats,
+        mapping=aes(x="violin_x", y="median"),
+        shape=21,
+        color=box_color,
+        fill="paper",
+        size=1.5,
+        tooltips="none",
+    )
+    positions = stats.select(*columns, "violin_x")
+    frame = frame.join(positions, on=columns, how="left", nulls_equal=True, maintain_order="left")
+    return violin_layers, summary_layers, frame
+
+
+def _cap_points(
+    frame: pl.DataFrame,
+    columns: Sequence[str],
+    value_column: str,
+    *,
+    max_points: int,
+    keep_outliers: bool,
+    seed: int | None,
+    coef: float = 1.5,
+) -> pl.DataFrame:
+    """
+    A seeded stratified subsample of `frame` with at most `max_points` rows per group.
+
+    Groups are the combinations of `columns`. Every row draws a uniform key
+    from `seed`, and the `max_points` smallest keys of each group are kept, so
+    the same frame and seed always keep the same rows. With `keep_outliers`,
+    values beyond `coef` IQRs of their group's quartiles are always kept and the
+    inliers fill the rest of the cap.
+    """
+    if max_points < 1:
+        msg = f"`max_points_per_group` must be at least 1, got {max_points}"
+        raise ValueError(msg)
+    group = list(dict.fromkeys(columns))
+    capped = frame.with_columns(
+        pl.Series("_key", np.random.default_rng(seed).random(frame.height))
+    )
+    rank = pl.col("_key").rank("ordinal")
+
+    def per_group(expression: pl.Expr) -> pl.Expr:
+        # without group columns (e.g. only float aesthetics) the frame is one group
+        return expression.over(group) if group else expression
+
+    if not keep_outliers:
+        return capped.filter(per_group(rank) <= max_points).drop("_key")
+
+    value = pl.col(value_column)
+    q1, q3 = value.quantile(0.25, "linear"), value.quantile(0.75, "linear")
+    outlier = (value < q1 - coef * (q3 - q1)) | (value > q3 + coef * (q3 - q1))
+    capped = capped.with_columns(per_group(outlier).alias("_outlier"))
+    # outliers never compete for the cap; inliers share what the outliers leave
+    room = max_points - per_group(pl.col("_outlier").sum())
+    keep = pl.col("_outlier") | (rank.over([*group, "_outlier"]) <= room)
+    return capped.filter(keep).drop("_key", "_outlier")
+
+
+def _histogram_layers(
+    frame: pl.DataFrame,
+    *,
+    value_column: str,
+    mapping: FeatureSpec,
+    geom_fill: str | None,
+    geom_color: str | None,
+    tooltips: Literal["none"] | Sequence[str] | FeatureSpec | None,
+    bins: int | None = None,
+    binwidth: float | None = None,
+    center: float | None = None,
+    boundary: float | None = None,
+    breaks: Sequence[float] | None = None,
+    position: Literal["stack", "dodge", "identity", "fill"] | FeatureSpec = "stack",
+    **geom_kwargs,
+) -> FeatureSpec:
+    """
+    An identity-stat `geom_rect` histogram of `frame` from precomputed bin counts.
+
+    Edges come from `_bin_edges` with the `geom_histogram` binning parameters,
+    counts from `_histogram_bars` per `fill`/`color` group of `mapping`, stacked
+    or dodged by `position`; the remaining `geom_kwargs` go to the rectangles.
+    """
+    if isinstance(position, FeatureSpec):
+        position = position.as_dict().get("name")
+    aesthetics = mapping.as_dict()
+    group_columns = [
+        column
+        for name in ("fill", "color")
+        if isinstance(column := aesthetics.get(name), str) and not frame[column].dtype.is_float()
+    ]
+    values = frame[value_column]
+    lower = float(values.min()) if values.len() else 0.0
+    upper = float(values.max()) if values.len() else 1.0
+    edges = _bin_edges(
+        lower,
+        upper,
+        bins=bins,
+        binwidth=binwidth,
+        center=center,
+        boundary=boundary,
+        breaks=breaks,
+    )
+    bars = _histogram_bars(
+        frame,
+        value_column=value_column,
+        group_columns=group_columns,
+        edges=edges,
+        position=position,
+    )
+    columns = list(dict.fromkeys(group_columns))
+    # `geom_rect` draws heavier outlines than `geom_histogram` by default
+    geom_kwargs.setdefault("size", 0.5)
+    group_mapping = {
+        name: column
+        for name, column in aesthetics.items()
+        if name in ("fill", "color") and column in columns
+    }
+    return geom_rect(
+        data=bars,
+        mapping=aes(
+            xmin="bin_start", xmax="bin_end", ymin="count_low", ymax="count_high", **group_mapping
+        ),
+        fill=geom_fill if geom_fill is not None else None if "fill" in group_mapping else "brush",
+        color=geom_color
+        if geom_color is not None
+        else None
+        if "color" in group_mapping
+        else "pen",
+        tooltips=[*columns, "bin_start", "bin_end", "count"] if tooltips != "none" else "none",
+        **geom_kwargs,
+    ) + labs(x=value_column, y="count")
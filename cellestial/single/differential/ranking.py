@@ -0,0 +1,340 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Literal
+
+import numpy as np
+import pandas as pd
+from scipy import sparse, stats
+
+if TYPE_CHECKING:
+    from anndata import AnnData
+
+# Methods computed natively; anything else is handed to scanpy.
+_NATIVE_METHODS = ("t-test", "t-test_overestim_var", "wilcoxon")
+
+# `scanpy.tl.rank_genes_groups` options the native engine only supports at
+# their defaults (one-vs-rest over all groups and genes).
+_SCANPY_ONLY_DEFAULTS: dict[str, object] = {
+    "groups": "all",
+    "reference": "rest",
+    "mask_var": None,
+    "pts": False,
+    "copy": False,
+}
+
+# Stored non-zero entries per gene chunk, bounding the memory of one chunk.
+_CHUNK_ENTRIES = 10_000_000
+
+
+def _is_default(value: object, default: object) -> bool:
+    return value is default or (isinstance(value, str) and value == default)
+
+
+def _chunk_statistics(
+    chunk: sparse.csc_matrix,
+    codes: np.ndarray,
+    group_sizes: np.ndarray,
+    *,
+    ranks: bool,
+) -> tuple[np.ndarray, ...]:
+    """
+    Per-group sums, sums of squares and (optionally) rank sums of a gene chunk.
+
+    Every statistic is read off the stored entries of the CSC chunk, so the
+    zeros are never materialised. With `ranks`, each gene is ranked once over
+    all observations: the stored values are sorted within their column, ties
+    get their average rank, and the implicit zeros share one tied block placed
+    after the negative values. Returns `(sums, squares, totals, total_squares,
+    rank_sums, ties)`, where the totals also cover observations outside every
+    group and `ties` holds the per-gene `sum(t**3 - t)` over tied blocks.
+    """
+    chunk.sum_duplicates()
+    chunk.eliminate_zeros()
+    n_obs, n_genes = chunk.shape
+    n_groups = len(group_sizes)
+    stored = np.diff(chunk.indptr)
+    column = np.repeat(np.arange(n_genes), stored)
+    values = chunk.data.astype(np.float64)
+    group = codes[chunk.indices]
+    grouped = group >= 0
+    cell = group[grouped] * n_genes + column[grouped]
+
+    def per_group(weights: np.ndarray) -> np.ndarray:
+        return np.bincount(cell, weights=weights, minlength=n_groups * n_genes).reshape(
+            n_groups, n_genes
+        )
+
+    sums = per_group(values[grouped])
+    squares = per_group(values[grouped] ** 2)
+    totals = np.bincount(column, weights=values, minlength=n_genes)
+    total_squares = np.bincount(column, weights=values**2, minlength=n_genes)
+    if not ranks:
+        return sums, squares, totals, total_squares, None, None
+
+    # RANK: sort stored values within each column, then average tied runs
+    order = np.lexsort((chunk.data, column))
+    sorted_values = chunk.data[order]
+    sorted_column = column[order]
+    starts = np.ones(len(order), dtype=bool)
+    starts[1:] = (sorted_column[1:] != sorted_column[:-1]) | (
+        sorted_values[1:] != sorted_values[:-1]
+    )
+    run_start = np.flatnonzero(starts)
+    run_length = np.diff(np.append(run_start, len(order))).astype(np.float64)
+    run_column = sorted_column[run_start]
+    zeros = (n_obs - stored).astype(np.float64)
+    negatives = np.bincount(sorted_column[sorted_values < 0], minlength=n_genes)
+    # positive values sit after the block of zeros of their column
+    position = run_start - chunk.indptr[run_column]
+    position = position + np.where(sorted_values[run_start] > 0, zeros[run_column], 0.0)
+    rank = np.empty(len(order), dtype=np.float64)
+    rank[order] = np.repeat(position + (run_length + 1) / 2, run_length.astype(np.int64))
+
+    zero_rank = negatives + (zeros + 1) / 2
+    stored_per_group = per_group(np.ones(np.count_nonzero(grouped)))
+    rank_sums = per_group(rank[grouped]) + (group_sizes[:, None] - stored_per_group) * zero_rank
+    ties = np.bincount(run_column, weights=run_length**3 - run_length, minlength=n_genes)
+    ties += zeros**3 - zeros
+    return sums, squares, totals, total_squares, rank_sums, ties
+
+
+def _benjamini_hochberg(pvalues: np.ndarray) -> np.ndarray:
+    """Benjamini-Hochberg adjusted p-values along the last axis."""
+    n_tests = pvalues.shape[-1]
+    order = np.argsort(pvalues, axis=-1, kind="mergesort")
+    ordered = np.take_along_axis(pvalues, order, axis=-1)
+    ordered = ordered * n_tests / np.arange(1, n_tests + 1)
+    ordered = np.minimum.accumulate(ordered[..., ::-1], axis=-1)[..., ::-1]
+    adjusted = np.empty_like(ordered)
+    np.put_along_axis(adjusted, order, np.minimum(ordered, 1.0), axis=-1)
+    return adjusted
+
+
+def _rank_genes_groups(
+    data: AnnData,
+    group_by: str,
+    *,
+    key_added: str = "rank_genes_groups",
+    method: Literal["t-test", "t-test_overestim_var", "wilcoxon", "logreg"] | None = None,
+    corr_method: Literal["benjamini-hochberg", "bonferroni"] = "benjamini-hochberg",
+    use_raw: bool | None = None,
+    layer: str | None = None,
+    n_genes: int | None = None,
+    rankby_abs: bool = False,
+    tie_correct: bool = False,
+    chunk_size: int | None = None,
+    n_jobs: int | None = None,
+    **kwargs,
+) -> None:
+    """
+    Rank genes per group against the rest, writing `data.uns[key_added]`.
+
+    A drop-in for `scanpy.tl.rank_genes_groups` with `reference='rest'`: the
+    one-vs-rest Welch t-test and Wilcoxon rank-sum test are computed for all
+    groups and genes in a single pass over gene chunks of a CSC matrix, with
+    chunks processed in a thread pool. Each gene is ranked once and its tie
+    correction reused by every group. Log fold changes and the p-value
+    correction follow scanpy, and the result uses the same `uns` layout.
+
+    Parameters
+    ----------
+    data : AnnData
+        The single-cell data object to rank and write the result to.
+    group_by : str
+        Observation column defining the groups.
+    key_added : str, default='rank_genes_groups'
+        The `uns` key to write the result under.
+    method : {'t-test', 't-test_overestim_var', 'wilcoxon', 'logreg'} | None, default=None
+        The test to use, `'t-test'` when None.
+    corr_method : {'benjamini-hochberg', 'bonferroni'}, default='benjamini-hochberg'
+        The p-value correction for multiple testing.
+    use_raw : bool | None, default=None
+        Whether to use `data.raw`; None uses it when present.
+    layer : str | None, default=None
+        Layer to test instead of `X`.
+    n_genes : int | None, default=None
+        Number of top genes to store per group; None stores all genes.
+    rankby_abs : bool, default=False
+        Whether to rank genes by the absolute value of their score.
+    tie_correct : bool, default=False
+        Whether to apply the tie correction to the Wilcoxon test.
+    chunk_size : int | None, default=None
+        Genes per chunk; None sizes chunks to about ten million stored values.
+    n_jobs : int | None, default=None
+        Number of worker threads; None lets the thread pool decide.
+    **kwargs
+        Further `scanpy.tl.rank_genes_groups` options.
+
+    Notes
+    -----
+    Other methods (`'logreg'`) and any option the native engine does not
+    implement at a non-default value (`groups`, `reference`, `mask_var`,
+    `pts`, ...) are handed to `scanpy.tl.rank_genes_groups` unchanged. Beyond
+    scanpy's own `params`, the engine records `tie_correct`, `rankby_abs` and
+    `n_genes` so a later call can tell whether the stored result is stale.
+    """
+    if method is None:
+        method = "t-test"
+    if method not in _NATIVE_METHODS or any(
+        name not in _SCANPY_ONLY_DEFAULTS or not _is_default(value, _SCANPY_ONLY_DEFAULTS[name])
+        for name, value in kwargs.items()
+    ):
+        import scanpy as sc
+
+        sc.tl.rank_genes_groups(
+            data,
+            groupby=group_by,
+            key_added=key_added,
+            method=method,
+            corr_method=corr_method,
+            use_raw=use_raw,
+            layer=layer,
+            n_genes=n_genes,
+            rankby_abs=rankby_abs,
+            tie_correct=tie_correct,
+            **kwargs,
+        )
+        return
+
+    # VALIDATE: options, mirroring scanpy's messages
+    if corr_method not in ("benjamini-hochberg", "bonferroni"):
+        msg = "Correction method must be one of {'benjamini-hochberg', 'bonferroni'}."
+        raise ValueError(msg)
+    if chunk_size is not None and chunk_size < 1:
+        msg = f"`chunk_size` must be >= 1, got {chunk_size}."
+        raise ValueError(msg)
+    if use_raw is None:
+        use_raw = data.raw is not None
+    elif use_raw and data.raw is None:
+        msg = "Received `use_raw=True`, but `adata.raw` is empty."
+        raise ValueError(msg)
+    if layer is not None and use_raw:
+        msg = "Cannot specify `layer` and have `use_raw=True`."
+        raise ValueError(msg)
+
+    # SELECT: the matrix to test
+    if layer is not None:
+        matrix, var_names = data.layers[layer], data.var_names
+    elif use_raw:
+        matrix, var_names = data.raw.X, data.raw.var_names
+    else:
+        matrix, var_names = data.X, data.var_names
+    if sparse.issparse(matrix) and matrix.format != "csc":
+        matrix = matrix.tocsc()
+    elif not sparse.issparse(matrix):
+        matrix = np.asarray(matrix)
+
+    # GROUPS: every category, each with at least two observations
+    categorical = data.obs[group_by]
+    if not isinstance(categorical.dtype, pd.CategoricalDtype):
+        categorical = categorical.astype("category")
+    groups = [str(category) for category in categorical.cat.categories]
+    codes = np.asarray(categorical.cat.codes, dtype=np.int64)
+    group_sizes = np.bincount(codes[codes >= 0], minlength=len(groups)).astype(np.float64)
+    invalid = [group for group, size in zip(groups, group_sizes, strict=True) if size < 2]
+    if invalid:
+        msg = (
+            f"Could not calculate statistics for groups {', '.join(invalid)} "
+            "since they only contain one sample."
+        )
+        raise ValueError(msg)
+
+    # COMPUTE: per-chunk statistics, in parallel over gene chunks
+    n_obs, n_var = matrix.shape
+    if chunk_size is None:
+        chunk_size = max(_CHUNK_ENTRIES // max(n_obs, 1), 1)
+    ranks = method == "wilcoxon"
+
+    def process(left: int) -> tuple[np.ndarray, ...]:
+        chunk = sparse.csc_matrix(matrix[:, left : left + chunk_size], copy=True)
+        return _chunk_statistics(chunk, codes, group_sizes, ranks=ranks)
+
+    with ThreadPoolExecutor(max_workers=n_jobs) as executor:
+        results = list(executor.map(process, range(0, n_var, chunk_size)))
+    sums, squares, totals, total_squares = (
+        np.concatenate([result[index] for result in results], axis=-1) for index in range(4)
+    )
+
+    sizes = group_sizes[:, None]
+    rest_sizes = n_obs - sizes
+    means = sums / sizes
+    rest_means = (totals - sums) / rest_sizes
+    # unbiased (ddof=1) variances, as scanpy stores them
+    variances = np.maximum(squares / sizes - means**2, 0) * sizes / (sizes - 1)
+    rest_variances = (
+        np.maximum((total_squares - squares) / rest_sizes - rest_means**2, 0)
+        * rest_sizes
+        / np.maximum(rest_sizes - 1, 1)
+    )
+
+    # TEST: one-vs-rest scores and p-values for every group at once
+    if ranks:
+        rank_sums = np.concatenate([result[4] for result in results], axis=-1)
+        coefficient = 1.0
+        if tie_correct and n_obs >= 2:
+            ties = np.concatenate([result[5] for result in results])
+            coefficient = 1 - ties / (float(n_obs) ** 3 - n_obs)
+        deviation = np.sqrt(coefficient * sizes * rest_sizes * (n_obs + 1) / 12.0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            scores = (rank_sums - sizes * (n_obs + 1) / 2.0) / deviation
+        scores[np.isnan(scores)] = 0
+        pvalues = 2 * stats.norm.sf(np.abs(scores))
+    else:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            scores, pvalues = stats.ttest_ind_from_stats(
+                mean1=means,
+                std1=np.sqrt(variances),
+                nobs1=sizes,
+                mean2=rest_means,
+                std2=np.sqrt(rest_variances),
+                nobs2=rest_sizes if method == "t-test" else sizes,
+                equal_var=False,
+            )
+        scores = np.asarray(scores, dtype=np.float64)
+        pvalues = np.asarray(pvalues, dtype=np.float64)
+        scores[np.isnan(scores)] = 0
+        pvalues[np.isnan(pvalues)] = 1
+
+    cleaned = np.where(np.isnan(pvalues), 1.0, pvalues)
+    if corr_method == "benjamini-hochberg":
+        adjusted = _benjamini_hochberg(cleaned)
+    else:
+        adjusted = np.minimum(cleaned * n_var, 1.0)
+
+    if (base := data.uns.get("log1p", {}).get("base")) is not None:
+        expm1 = lambda values: np.expm1(values * np.log(base))  # noqa: E731
+    else:
+        expm1 = np.expm1
+    logfoldchanges = np.log2((expm1(means) + 1e-9) / (expm1(rest_means) + 1e-9))
+
+    # STORE: the top genes per group, best score first, in scanpy's layout
+    n_top = n_var if n_genes is None or n_genes > n_var else n_genes
+    order = np.argsort(-(np.abs(scores) if rankby_abs else scores), axis=1, kind="stable")
+    order = order[:, :n_top]
+    names = np.asarray(var_names, dtype=object)
+
+    def record(values: np.ndarray, dtype: str) -> np.recarray:
+        return np.rec.fromarrays(
+            [np.asarray(row, dtype=dtype) for row in values],
+            dtype=[(group, dtype) for group in groups],
+        )
+
+    data.uns[key_added] = {
+        "params": {
+            "groupby": group_by,
+            "reference": "rest",
+            "method": method,
+            "use_raw": use_raw,
+            "layer": layer,
+            "corr_method": corr_method,
+            "tie_correct": tie_correct,
+            "rankby_abs": rankby_abs,
+            "n_genes": n_genes,
+        },
+        "names": record(names[order], "O"),
+        "scores": record(np.take_along_axis(scores, order, axis=1), "float32"),
+        "pvals": record(np.take_along_axis(pvalues, order, axis=1), "float64"),
+        "pvals_adj": record(np.take_along_axis(adjusted, order, axis=1), "float64"),
+        "logfoldchanges": record(np.take_along_axis(logfoldchanges, order, axis=1), "float32"),
+    }
@@ -2,12 +2,13 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING
 
-import numpy as np
 import polars as pl
 from anndata import AnnData
 
+from cellestial.single.differential.ranking import _rank_genes_groups
 from cellestial.single.heatmap.utilities import _resolve_rank_genes_groups_key
 from cellestial.util.errors import KeyNotFoundError, _unsupported_data_type
+from cellestial.util.markers import _ranking_frame, _top_ranked
 
 if TYPE_CHECKING:
     from collections.abc import Sequence
@@ -98,11 +99,9 @@ def _build_volcano_frame(
             desired_params = {"groupby": group_by, **(rank_genes_kwargs or {})}
             stale = any(existing_params.get(k) != v for k, v in desired_params.items())
             if key not in data.uns or stale:
-                import scanpy as sc
-
-                sc.tl.rank_genes_groups(
+                _rank_genes_groups(
                     data,
-                    groupby=group_by,
+                    group_by,
                     key_added=key,
                     **(rank_genes_kwargs or {}),
                 )
@@ -121,15 +120,20 @@ def _build_volcano_frame(
             raise KeyError(msg)
         # SELECT: which p-value field to pull
         pvalue_field = "pvals_adj" if use_adjusted_pvalue else "pvals"
-        # EXTRACT: per-group columns from the recarrays
-        frame = pl.DataFrame(
-            {
-                variable_column: list(results["names"][group]),
-                logfoldchange_column: np.asarray(
-                    results["logfoldchanges"][group], dtype=np.float64
-                ),
-                pvalue_column: np.asarray(results[pvalue_field][group], dtype=np.float64),
-            }
+        for field in ("logfoldchanges", pvalue_field):
+            if field not in results:
+                msg = f"`{key}` in `data.uns` has no `{field}` field."
+                raise KeyError(msg)
+        # EXTRACT: the group's rows from the long ranking frame
+        frame = _top_ranked(
+            _ranking_frame(results, key=key),
+            available_groups=available_groups,
+            groups=[group],
+            n_genes=len(results["names"]),
+        ).select(
+            pl.col("gene").alias(variable_column),
+            pl.col("logfoldchanges").alias(logfoldchange_column),
+            pl.col(pvalue_field).alias(pvalue_column),
         )
     else:
         raise _unsupported_data_type(data, AnnData)
@@ -257,7 +261,6 @@ def _build_markers_frame(
             raise KeyNotFoundError(msg)
 
         names = record["names"]
-        scores = record["scores"]
         available_groups = list(names.dtype.names)
 
         if groups is None:
@@ -280,19 +283,17 @@ def _build_markers_frame(
             )
             raise ValueError(msg)
 
-        ranks = np.arange(n_genes)
-        group_frames = [
-            pl.DataFrame(
-                {
-                    group_column: group,
-                    rank_column: ranks,
-                    variable_column: [str(name) for name in names[group][:n_genes]],
-                    score_column: np.asarray(scores[group][:n_genes], dtype=np.float64),
-                }
-            )
-            for group in selected
-        ]
-        frame = pl.concat(group_frames)
+        frame = _top_ranked(
+            _ranking_frame(record, key=uns_key),
+            available_groups=available_groups,
+            groups=selected,
+            n_genes=n_genes,
+        ).select(
+            pl.col("group").alias(group_column),
+            pl.col("rank").alias(rank_column),
+            pl.col("gene").alias(variable_column),
+            pl.col("scores").alias(score_column),
+        )
 
         params = record["params"]
         stored_group_by = params.get("groupby")
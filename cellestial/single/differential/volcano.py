@@ -26,6 +26,7 @@ from cellestial.single.differential.utilities import _build_volcano_frame
 from cellestial.themes import _THEME_SCATTER_BASE
 from cellestial.util import _share_axis, _share_labels
 from cellestial.util.errors import _unsupported_data_type
+from cellestial.util.operations import _register_plot
 from cellestial.util.utilities import _container
 
 # Default volcano palette (matches the conventional EnhancedVolcano-style look):
@@ -196,8 +197,11 @@ def volcano(
     optionally annotated with the top up- and down-regulated genes.
 
     When `group_by` is provided and the ranking under `key` is missing or was
-    computed with different parameters, plot construction calls
-    `scanpy.tl.rank_genes_groups` and writes the result to `data.uns[key]`.
+    computed with different parameters, plot construction ranks the genes
+    with cellestial's own one-vs-rest t-test/Wilcoxon engine (the same numbers
+    and `uns` layout as `scanpy.tl.rank_genes_groups`, which is used instead
+    for options the engine does not cover) and writes the result to
+    `data.uns[key]`.
     This mutates the input `AnnData`. Precompute a matching ranking and omit
     `group_by` to avoid mutation during plotting.
 
@@ -299,13 +303,14 @@ def volcano(
         _mapping.update(mapping.as_dict())
 
     # BUILD: volcano
-    vlcn = ggplot(frame) + geom_point(
+    point_layer = geom_point(
         aes(**_mapping),
         tooltips=tooltips_spec,
         size=size,
         alpha=alpha,
         **point_kwargs,
     )
+    vlcn = ggplot(frame) + point_layer
 
     # ADD: threshold lines
     if show_threshold_lines:
@@ -374,7 +379,7 @@ def volcano(
     if interactive:
         vlcn += ggtb(size_zoomin=-1)
 
-    return vlcn
+    return _register_plot(vlcn, [point_layer])
 
 
 def volcanos(
@@ -563,8 +568,11 @@ def volcanos(
     threshold options behave the same as in :func:`volcano`.
 
     When `group_by` is provided and the ranking under `key` is missing or was
-    computed with different parameters, plot construction calls
-    `scanpy.tl.rank_genes_groups` and writes the result to `data.uns[key]`.
+    computed with different parameters, plot construction ranks the genes
+    with cellestial's own one-vs-rest t-test/Wilcoxon engine (the same numbers
+    and `uns` layout as `scanpy.tl.rank_genes_groups`, which is used instead
+    for options the engine does not cover) and writes the result to
+    `data.uns[key]`.
     This mutates the input `AnnData`. Precompute a matching ranking and omit
     `group_by` to avoid mutation during plotting.
 
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from functools import partial
 from typing import TYPE_CHECKING, Literal
 
 import polars as pl
@@ -22,6 +23,7 @@ from mudata import MuData
 
 from cellestial.frames import build_frame
 from cellestial.single.heatmap.utilities import (
+    _collect_chunked,
     _key_groups_bar_y,
     _key_groups_layers,
     _resolve_key_groups,
@@ -30,10 +32,12 @@ from cellestial.single.heatmap.utilities import (
 )
 from cellestial.themes import _THEME_DOTPLOT
 from cellestial.util import (
+    _cluster_keys,
     _color_gradient,
     _fill_gradient,
     _get_dendrogram,
     _get_dendrogram_path_frame,
+    _get_key_dendrogram_path_frame,
     _resolve_tooltips,
     _validate_tooltips,
     _warn,
@@ -70,6 +74,7 @@ def dotplot(
     mean_key: str = "avg_exp",
     rectangle: bool = True,
     dendrogram: bool = False,
+    cluster_keys: bool = False,
     dendrogram_color: str = "black",
     dendrogram_size: float = 0.5,
     dendrogram_key: str | None = None,
@@ -85,6 +90,7 @@ def dotplot(
     key_labels_width: float = 0.6,
     tooltips: Literal["none"] | Sequence[str] | FeatureSpec | None = None,
     interactive: bool = False,
+    chunk_size: int | None = None,
     **geom_kwargs,
 ) -> PlotSpec:
     """
@@ -142,8 +148,12 @@ def dotplot(
         Whether to add a rectangle border around the data area
     dendrogram : bool, default=False
         Whether to add a dendrogram for the `group_by` axis.
-        Uses `scanpy.tl.dendrogram` if not already computed.
+        Uses the precomputed dendrogram, computing one if not already present.
         When True, group order is determined by the dendrogram.
+    cluster_keys : bool, default=False
+        Whether to order the keys by the similarity of their mean expression
+        across groups and draw a dendrogram for them above the plot. Replaces
+        the key-group brackets when `keys` is a mapping.
     dendrogram_color : str, default='black'
         Color of the dendrogram segments.
     dendrogram_size : float, default=0.5
@@ -178,6 +188,10 @@ def dotplot(
         Use 'none' to disable tooltips.
     interactive : bool, default=False
         Whether to make the plot interactive.
+    chunk_size : int | None, default=None
+        Number of observations aggregated at a time. Bounds peak memory by the
+        chunk rather than the full long-form frame, at some cost in speed.
+        `None` processes all observations at once.
     **geom_kwargs : Any
         Additional keyword arguments for the geom_point layer.
 
@@ -202,9 +216,10 @@ def dotplot(
     Notes
     -----
     When `dendrogram=True` and the requested dendrogram is absent from
-    `data.uns`, plot construction calls `scanpy.tl.dendrogram` and stores the
-    result in `data.uns`. This mutates the input `AnnData`. Precompute the
-    dendrogram under `dendrogram_key` to avoid mutation during plotting.
+    the dataset, plot construction clusters the groups on their mean profile
+    (the principal components when available) and stores the result in the
+    dataset. This mutates the input data. Precompute the dendrogram under
+    `dendrogram_key` to avoid mutation during plotting.
 
     Examples
     --------
@@ -290,18 +305,53 @@ def dotplot(
 
     # RESOLVE: dict ``keys`` into a flat list while preserving mapping order
     keys, key_groups = _resolve_key_groups(keys, key_labels=key_labels)
+    if cluster_keys and key_groups is not None:
+        _warn("`cluster_keys` reorders the keys, so the key-group brackets are not drawn.")
+        key_groups = None
 
-    # BUILD: dataframe. Only `group_by` is needed from the observation metadata;
-    # the cell identifier is unused by the dotplot aggregation.
-    frame = build_frame(
-        data=data,
-        axis=0,
-        variable_keys=keys,
-        observations_name=None,
-        metadata_columns=[group_by],
+    # CRITICAL PARTS: Dataframe Operations
+    # BUILD, per chunk of observations: only `group_by` is needed from the
+    # observation metadata; the cell identifier is unused by the aggregation.
+    # Each chunk is unpivoted and reduced to partial sums and counts, which are
+    # combined below, so the full long-form frame is never materialised.
+    value_name: str = "value"
+    partial_min, partial_sum = "__cellestial_min", "__cellestial_sum"
+    partial_count, partial_above = "__cellestial_count", "__cellestial_above"
+    finite_values = pl.col(value_name).filter(
+        pl.col(value_name).is_not_null() & pl.col(value_name).is_finite()
+    )
+
+    def aggregate_chunk(chunk: pl.LazyFrame) -> pl.LazyFrame:
+        return (
+            chunk.unpivot(
+                on=keys,
+                index=group_by,
+                variable_name=variable_column,
+                value_name=value_name,
+            )
+            .group_by(group_by, variable_column)
+            .agg(
+                pl.col(value_name).min().alias(partial_min),
+                finite_values.sum().alias(partial_sum),
+                finite_values.len().alias(partial_count),
+                (finite_values > threshold).sum().alias(partial_above),
+            )
+        )
+
+    frame = _collect_chunked(
+        data,
+        chunk_size=chunk_size,
+        build=partial(
+            build_frame,
+            axis=0,
+            variable_keys=keys,
+            observations_name=None,
+            metadata_columns=[group_by],
+        ),
+        query=aggregate_chunk,
     )
     # WARN: negative expression makes the percent-expressed (dot size) misleading
-    overall_min = frame.select(pl.min_horizontal(pl.col(keys).min())).item()
+    overall_min = frame[partial_min].min()
     if overall_min is not None and overall_min < 0:
         _warn(
             "Expression matrix contains negative values, which suggests scaled data. "
@@ -310,30 +360,18 @@ def dotplot(
             "log-normalized expression, or set `threshold` explicitly."
         )
     # DROP: rows with null group_by to avoid null labels downstream
-    frame = frame.filter(pl.col(group_by).is_not_null())
-    index_columns = [x for x in frame.columns if x not in keys]
-
-    # CRITICAL PARTS: Dataframe Operations
-    # DataFrame to LazyFrame
-    frame = frame.lazy()
-    # 1. Unpivot frame
-    value_name: str = "value"
-    frame = frame.unpivot(
-        on=keys,
-        index=index_columns,
-        variable_name=variable_column,
-        value_name=value_name,
-    )
-    frame = frame.filter(pl.col(value_name).is_not_null() & pl.col(value_name).is_finite())
-    # 2. Aggregate and compute stats
-    frame = frame.group_by([group_by, variable_column]).agg(
-        [
-            pl.col(value_name).mean().alias(mean_key),
-            (pl.col(value_name) > threshold).mean().mul(100).alias(percentage_key),
-        ]
+    frame = (
+        frame.filter(pl.col(group_by).is_not_null())
+        .group_by([group_by, variable_column])
+        .agg(pl.col(partial_sum, partial_count, partial_above).sum())
+        .filter(pl.col(partial_count) > 0)
+        .select(
+            group_by,
+            variable_column,
+            (pl.col(partial_sum) / pl.col(partial_count)).alias(mean_key),
+            (pl.col(partial_above) / pl.col(partial_count)).mul(100).alias(percentage_key),
+        )
     )
-    # LazyFrame to DataFrame
-    frame = frame.collect()
     # HANDLE: Sorting pseudo-categorical integer labels numerically when possible.
     numeric_group_by = "__cellestial_group_by_numeric"
     frame = frame.with_columns(
@@ -364,6 +402,16 @@ def dotplot(
             frame.select(group_by).unique(maintain_order=True)[group_by].cast(pl.String).to_list()
         )
 
+    # CLUSTER: order keys by their mean expression profile across groups
+    key_paths = None
+    if cluster_keys:
+        profiles = frame.pivot(on=variable_column, index=group_by, values=mean_key)
+        present_keys = [key for key in keys if key in profiles.columns]
+        clustered_keys, key_paths = _cluster_keys(
+            profiles, keys=present_keys, group_by=group_by, aggregation="mean"
+        )
+        keys = clustered_keys + [key for key in keys if key not in present_keys]
+
     # ASSIGN: numeric _x / _y positions
     x_keys = list(keys)
     n_x = len(x_keys)
@@ -445,6 +493,18 @@ def dotplot(
     data_top = n_y - 0.5
     y_max_limit = data_top
     key_groups_total_span: float | None = None
+    if key_paths is not None:
+        key_dendrogram_frame = _get_key_dendrogram_path_frame(
+            key_paths, top=data_top, span=data_top + 0.5
+        )
+        y_max_limit = key_dendrogram_frame["y"].max()
+        dtplt += geom_path(
+            data=key_dendrogram_frame,
+            mapping=aes(x="x", y="y", group="group"),
+            color=dendrogram_color,
+            size=dendrogram_size,
+            **(dendrogram_kwargs or {}),
+        )
     if key_labels and key_groups is not None:
         # Extend the y limit upward to fit the bracket bar plus rotated label.
         data_range = data_top + 0.5
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from functools import partial
 from typing import TYPE_CHECKING, Literal
 
 import polars as pl
@@ -24,6 +25,7 @@ from cellestial.frames import build_frame
 from cellestial.single.heatmap.utilities import (
     _assign_positions,
     _bin_within_groups,
+    _collect_chunked,
     _get_group_bar_frame,
     _get_group_lines_frame,
     _key_groups_bar_y,
@@ -36,9 +38,11 @@ from cellestial.single.heatmap.utilities import (
 )
 from cellestial.themes import _THEME_HEATMAP
 from cellestial.util import (
+    _cluster_keys,
     _fill_gradient,
     _get_dendrogram,
     _get_dendrogram_path_frame,
+    _get_key_dendrogram_path_frame,
     _warn,
 )
 from cellestial.util.errors import _unsupported_data_type
@@ -63,6 +67,7 @@ def heatmap(
     geom: Literal["raster", "tile"] = "raster",
     scale_axis: Literal[0, 1] | None = None,
     dendrogram: bool = False,
+    cluster_keys: bool = False,
     aggregate: bool = False,
     group_bars: bool = True,
     group_bars_size: float = 6,
@@ -93,6 +98,7 @@ def heatmap(
     include_dimensions: bool | int = False,
     interactive: bool = False,
     max_rows: int | None = 1000,
+    chunk_size: int | None = None,
     **geom_kwargs,
 ) -> PlotSpec:
     """
@@ -129,7 +135,11 @@ def heatmap(
         Use 'tile' to enable tooltips.
     dendrogram : bool, default=False
         Whether to add a dendrogram for the `group_by` axis.
-        Uses `scanpy.tl.dendrogram` if not already computed.
+        Uses the precomputed dendrogram, computing one if not already present.
+    cluster_keys : bool, default=False
+        Whether to order the keys by the similarity of their values across
+        rows and draw a dendrogram for them above the heatmap. Replaces the
+        key-group brackets when `keys` is a mapping.
     aggregate : bool, default=False
         If False, plot one row per observation (i.e., cell).
         If True, aggregate values per group by mean so each row is a group.
@@ -206,6 +216,11 @@ def heatmap(
         contiguous observations within each group into virtual bins.
         Bypasses the long-form data payload sent to the renderer when row
         counts exceed display resolution. Set to `None` to disable.
+    chunk_size : int | None, default=None
+        Number of rows of `data` (observations, or variables when `axis=1`)
+        unpivoted and aggregated at a time. Bounds peak memory by the chunk
+        rather than the full long-form frame, at some cost in speed. `None`
+        processes all rows at once.
     **geom_kwargs
         Additional parameters for the heatmap geom layer.
 
@@ -230,9 +245,10 @@ def heatmap(
     Notes
     -----
     When `dendrogram=True` and the requested dendrogram is absent from
-    `data.uns`, plot construction calls `scanpy.tl.dendrogram` and stores the
-    result in `data.uns`. This mutates the input `AnnData`. Precompute the
-    dendrogram under `dendrogram_key` to avoid mutation during plotting.
+    the dataset, plot construction clusters the groups on their mean profile
+    (the principal components when available) and stores the result in the
+    dataset. This mutates the input data. Precompute the dendrogram under
+    `dendrogram_key` to avoid mutation during plotting.
 
     Examples
     --------
@@ -354,6 +370,9 @@ def heatmap(
 
     # RESOLVE: dict ``keys`` into a flat list while preserving mapping order
     keys, key_groups = _resolve_key_groups(keys, key_labels=key_labels)
+    if cluster_keys and key_groups is not None:
+        _warn("`cluster_keys` reorders the keys, so the key-group brackets are not drawn.")
+        key_groups = None
 
     # BUILD: long-form dataframe.
     # `group_by` (and the cell identifier, when not aggregating) are needed from
@@ -363,26 +382,44 @@ def heatmap(
     metadata_columns = [group_by] if group_by is not None else []
     if axis == 1:
         metadata_columns = list(dict.fromkeys([*keys, *metadata_columns]))
-    frame = build_frame(
-        data=data,
-        variable_keys=keys,
-        axis=axis,
-        observations_name=observation_column_name,
-        variables_name=variables_name,
-        include_dimensions=include_dimensions,
-        metadata_columns=metadata_columns,
-    )
     row_identifier = variables_name if axis == 1 else observations_name
     index_columns = [group_by] if aggregate else [row_identifier, group_by]
-    frame = frame.unpivot(
-        on=keys,
-        index=index_columns,
-        variable_name=variable_column,
-        value_name=value_column,
+    partial_sum, partial_count = "__cellestial_sum", "__cellestial_count"
+
+    def unpivot_chunk(chunk: pl.LazyFrame) -> pl.LazyFrame:
+        chunk = chunk.unpivot(
+            on=keys,
+            index=index_columns,
+            variable_name=variable_column,
+            value_name=value_column,
+        )
+        if not aggregate:
+            return chunk
+        # Partial sums and counts of the finite values, combined across chunks.
+        return (
+            chunk.filter(pl.col(value_column).is_finite())
+            .group_by(group_by, variable_column)
+            .agg(pl.col(value_column).sum().alias(partial_sum), pl.len().alias(partial_count))
+        )
+
+    frame = _collect_chunked(
+        data,
+        chunk_size=chunk_size,
+        axis=1 if axis == 1 else 0,
+        build=partial(
+            build_frame,
+            variable_keys=keys,
+            axis=axis,
+            observations_name=observation_column_name,
+            variables_name=variables_name,
+            include_dimensions=include_dimensions,
+            metadata_columns=metadata_columns,
+        ),
+        query=unpivot_chunk,
     )
     if aggregate:
         frame = frame.group_by(group_by, variable_column).agg(
-            pl.col(value_column).filter(pl.col(value_column).is_finite()).mean()
+            (pl.col(partial_sum).sum() / pl.col(partial_count).sum()).alias(value_column)
         )
     frame = frame.drop_nulls()
 
@@ -416,6 +453,23 @@ def heatmap(
             max_rows=max_rows,
         )
 
+    # CLUSTER: order keys by their profile over the plotted rows (groups or bins)
+    key_paths = None
+    if cluster_keys:
+        profiles = frame.pivot(
+            on=variable_column,
+            index=group_by if aggregate else row_identifier,
+            values=value_column,
+        )
+        present_keys = [key for key in keys if key in profiles.columns]
+        clustered_keys, key_paths = _cluster_keys(
+            profiles,
+            keys=present_keys,
+            group_by=group_by,
+            aggregation="mean" if aggregate else "binned",
+        )
+        keys = clustered_keys + [key for key in keys if key not in present_keys]
+
     # ASSIGN: _x / _y positions and layout metadata
     x_keys = list(keys)
     frame, cell_frame, n_x, n_y, group_centers = _assign_positions(
@@ -452,6 +506,12 @@ def heatmap(
         data_top = y_step * max(n_y - 1, 0) + half_step
     y_max_limit = data_top
     key_groups_total_span: float | None = None
+    key_dendrogram_frame = None
+    if key_paths is not None:
+        key_dendrogram_frame = _get_key_dendrogram_path_frame(
+            key_paths, top=data_top, span=data_top - data_bottom
+        )
+        y_max_limit = key_dendrogram_frame["y"].max()
     if key_labels and key_groups is not None:
         data_range = data_top - data_bottom
         key_groups_padding = _resolve_padding(
@@ -526,6 +586,16 @@ def heatmap(
             **(dendrogram_kwargs or {}),
         )
 
+    # KEY DENDROGRAM (above, along x-axis)
+    if key_dendrogram_frame is not None:
+        htmp += geom_path(
+            data=key_dendrogram_frame,
+            mapping=aes(x="x", y="y", group="group"),
+            color=dendrogram_color,
+            size=dendrogram_size,
+            **(dendrogram_kwargs or {}),
+        )
+
     # FILL gradient
     htmp += _fill_gradient(
         frame[value_column],
@@ -569,6 +639,7 @@ def matrixplot(
     geom: Literal["raster", "tile"] = "raster",
     scale_axis: Literal[0, 1] | None = None,
     dendrogram: bool = False,
+    cluster_keys: bool = False,
     group_lines: bool = True,
     group_lines_color: str = "white",
     group_lines_size: float = 0.6,
@@ -594,6 +665,7 @@ def matrixplot(
     variables_name: str = "Variable",
     include_dimensions: bool | int = False,
     interactive: bool = False,
+    chunk_size: int | None = None,
     **geom_kwargs,
 ) -> PlotSpec:
     """
@@ -632,6 +704,10 @@ def matrixplot(
     dendrogram : bool, default=False
         Whether to add a dendrogram for the `group_by` axis.
         Uses the precomputed dendrogram, computing one if not already present.
+    cluster_keys : bool, default=False
+        Whether to order the keys by the similarity of their mean values across
+        groups and draw a dendrogram for them above the plot. Replaces the
+        key-group brackets when `keys` is a mapping.
     group_lines : bool, default=True
         Whether to draw horizontal lines within the plot separating groups.
     group_lines_color : str, default='white'
@@ -685,6 +761,11 @@ def matrixplot(
         Providing an integer will limit the number of dimensions to given number.
     interactive : bool, default=False
         Whether to make the plot interactive.
+    chunk_size : int | None, default=None
+        Number of rows of `data` (observations, or variables when `axis=1`)
+        aggregated at a time. Bounds peak memory by the chunk rather than the
+        full long-form frame, at some cost in speed. `None` processes all rows
+        at once.
     **geom_kwargs
         Additional parameters for the heatmap geom layer.
 
@@ -698,9 +779,10 @@ def matrixplot(
     Equivalent to `heatmap` with `aggregate=True`.
 
     When `dendrogram=True` and the requested dendrogram is absent from
-    `data.uns`, plot construction calls `scanpy.tl.dendrogram` and stores the
-    result in `data.uns`. This mutates the input `AnnData`. Precompute the
-    dendrogram under `dendrogram_key` to avoid mutation during plotting.
+    the dataset, plot construction clusters the groups on their mean profile
+    (the principal components when available) and stores the result in the
+    dataset. This mutates the input data. Precompute the dendrogram under
+    `dendrogram_key` to avoid mutation during plotting.
 
     Examples
     --------
@@ -753,6 +835,7 @@ def matrixplot(
         geom=geom,
         scale_axis=scale_axis,
         dendrogram=dendrogram,
+        cluster_keys=cluster_keys,
         key_labels=key_labels,
         key_labels_text_size=key_labels_text_size,
         key_labels_bracket_size=key_labels_bracket_size,
@@ -779,5 +862,6 @@ def matrixplot(
         variables_name=variables_name,
         include_dimensions=include_dimensions,
         interactive=interactive,
+        chunk_size=chunk_size,
         **geom_kwargs,
     )
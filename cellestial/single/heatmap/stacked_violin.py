@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from functools import partial
 from typing import TYPE_CHECKING, Literal
 
 import polars as pl
@@ -21,6 +22,7 @@ from mudata import MuData
 
 from cellestial.frames import build_frame
 from cellestial.single.heatmap.utilities import (
+    _collect_chunked,
     _compute_violin_polygons,
     _key_groups_bar_y,
     _key_groups_layers,
@@ -30,7 +32,6 @@ from cellestial.single.heatmap.utilities import (
 )
 from cellestial.themes import _THEME_DOTPLOT
 from cellestial.util import (
-    _drop_nonfinite_rows,
     _fill_gradient,
     _get_dendrogram,
     _get_dendrogram_path_frame,
@@ -92,6 +93,7 @@ def stacked_violin(
     variables_name: str = "Variable",
     tooltips: Literal["none"] | Sequence[str] | FeatureSpec | None = None,
     interactive: bool = False,
+    chunk_size: int | None = None,
     **geom_kwargs,
 ) -> PlotSpec:
     """
@@ -166,7 +168,7 @@ def stacked_violin(
         Border color for all violins.
     dendrogram : bool, default=False
         Whether to add a dendrogram for the `group_by` axis.
-        Uses `scanpy.tl.dendrogram` if not already computed.
+        Uses the precomputed dendrogram, computing one if not already present.
         When True, group order is determined by the dendrogram.
     dendrogram_color : str, default='black'
         Color of the dendrogram segments.
@@ -215,6 +217,10 @@ def stacked_violin(
         Use 'none' to disable tooltips.
     interactive : bool, default=False
         Whether to make the plot interactive.
+    chunk_size : int | None, default=None
+        Number of observations unpivoted and filtered at a time. Bounds the
+        intermediate frames by the chunk; the filtered values are still kept
+        for the density estimates. `None` processes all observations at once.
     **geom_kwargs
         Additional parameters for the `geom_polygon` layer.
         For further detail on geom_polygon.
@@ -241,9 +247,10 @@ def stacked_violin(
     Notes
     -----
     When `dendrogram=True` and the requested dendrogram is absent from
-    `data.uns`, plot construction calls `scanpy.tl.dendrogram` and stores the
-    result in `data.uns`. This mutates the input `AnnData`. Precompute the
-    dendrogram under `dendrogram_key` to avoid mutation during plotting.
+    the dataset, plot construction clusters the groups on their mean profile
+    (the principal components when available) and stores the result in the
+    dataset. This mutates the input data. Precompute the dendrogram under
+    `dendrogram_key` to avoid mutation during plotting.
 
     Examples
     --------
@@ -321,31 +328,40 @@ def stacked_violin(
     # RESOLVE: dict ``keys`` into a flat list while preserving mapping order
     keys_list, key_groups = _resolve_key_groups(keys, key_labels=key_labels)
 
-    # BUILD: dataframe. Only `group_by` is needed from the observation metadata
-    # alongside the per-cell identifier used as the unpivot index.
-    frame = build_frame(
-        data=data,
-        axis=0,
-        variable_keys=keys_list,
-        observations_name=observations_name,
-        variables_name=variables_name,
-        metadata_columns=[group_by],
-    )
-    # DROP: rows with null group_by to avoid null labels downstream
-    frame = frame.filter(pl.col(group_by).is_not_null())
-
     # CRITICAL PARTS: Dataframe Operations
-    # 1. Unpivot to long format
-    frame = frame.unpivot(
-        on=keys_list,
-        index=[observations_name, group_by],
-        variable_name=variable_column,
-        value_name=value_column,
+    # BUILD, per chunk of observations: only `group_by` is needed from the
+    # observation metadata alongside the per-cell identifier used as the unpivot
+    # index. Each chunk is unpivoted to long format and filtered before the
+    # next one is built.
+    def unpivot_chunk(chunk: pl.LazyFrame) -> pl.LazyFrame:
+        # DROP: rows with null group_by to avoid null labels downstream
+        chunk = (
+            chunk.filter(pl.col(group_by).is_not_null())
+            .unpivot(
+                on=keys_list,
+                index=[observations_name, group_by],
+                variable_name=variable_column,
+                value_name=value_column,
+            )
+            .filter(pl.col(value_column).is_not_null() & pl.col(value_column).is_finite())
+        )
+        if threshold is not None:
+            chunk = chunk.filter(pl.col(value_column) >= threshold)
+        return chunk
+
+    frame = _collect_chunked(
+        data,
+        chunk_size=chunk_size,
+        build=partial(
+            build_frame,
+            axis=0,
+            variable_keys=keys_list,
+            observations_name=observations_name,
+            variables_name=variables_name,
+            metadata_columns=[group_by],
+        ),
+        query=unpivot_chunk,
     )
-    frame = _drop_nonfinite_rows(frame, [value_column])
-    # 2. Apply threshold filter
-    if threshold is not None:
-        frame = frame.filter(pl.col(value_column) >= threshold)
 
     # DETERMINE: y order of groups (dendrogram or first-seen order)
     if dendrogram:
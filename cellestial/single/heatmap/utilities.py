@@ -11,11 +11,13 @@ from scipy.stats import gaussian_kde
 
 from cellestial.util import _warn
 from cellestial.util.errors import DuplicateKeysError, KeyNotFoundError, _unsupported_data_type
+from cellestial.util.markers import _ranking_frame, _top_ranked
 
 if TYPE_CHECKING:
-    from collections.abc import Sequence
+    from collections.abc import Callable, Iterator, Sequence
 
     from lets_plot.plot.core import FeatureSpec
+    from mudata import MuData
 
 
 # ---------------------------------------------------------------------------
@@ -104,6 +106,47 @@ def _bin_within_groups(
     )
 
 
+def _data_chunks(
+    data: AnnData | MuData, *, chunk_size: int | None, axis: Literal[0, 1] = 0
+) -> Iterator[AnnData | MuData]:
+    """Yield `data` whole, or as views of at most `chunk_size` rows along `axis`."""
+    n_rows = data.n_obs if axis == 0 else data.n_vars
+    if chunk_size is None or chunk_size >= n_rows:
+        yield data
+        return
+    for start in range(0, n_rows, chunk_size):
+        rows = slice(start, start + chunk_size)
+        yield data[rows] if axis == 0 else data[:, rows]
+
+
+def _collect_chunked(
+    data: AnnData | MuData,
+    *,
+    chunk_size: int | None,
+    build: Callable[[AnnData | MuData], pl.DataFrame],
+    query: Callable[[pl.LazyFrame], pl.LazyFrame],
+    axis: Literal[0, 1] = 0,
+) -> pl.DataFrame:
+    """
+    Run `query` over the frame built from each chunk of `data` and stack the results.
+
+    Each chunk is built, run through the streaming engine and released before the
+    next one is built, so peak memory follows `chunk_size` rather than the size
+    of the full long-form frame. `query` must either be row-wise or produce
+    partial aggregates that the caller combines across chunks.
+    """
+    if chunk_size is not None and chunk_size < 1:
+        msg = f"`chunk_size` must be a positive integer or None, got {chunk_size}."
+        raise ValueError(msg)
+    return pl.concat(
+        [
+            query(build(chunk).lazy()).collect(engine="streaming")
+            for chunk in _data_chunks(data, chunk_size=chunk_size, axis=axis)
+        ],
+        how="vertical_relaxed",
+    )
+
+
 def _scale_values(frame: pl.DataFrame, *, value_column: str, partition_key: str) -> pl.DataFrame:
     """Min-max scale `value_column` within partitions defined by `partition_key`."""
     value = pl.col(value_column)
@@ -652,26 +695,32 @@ def _extract_rank_genes_groups(
             )
             raise ValueError(msg)
 
-        keys: dict[str, list[str]] = {}
-        seen: dict[str, str] = {}
-        dropped: list[tuple[str, str, str]] = []
-        for group in selected:
-            group_keys: list[str] = []
-            for gene in names[group][:n_genes]:
-                gene_name = str(gene)
-                if gene_name in seen:
-                    dropped.append((gene_name, seen[gene_name], group))
-                    continue
-                seen[gene_name] = group
-                group_keys.append(gene_name)
-            keys[group] = group_keys
-
-        if dropped:
+        # Keep each gene at its first occurrence in group order; later
+        # occurrences are dropped (and reported) so keys stay unique.
+        top = _top_ranked(
+            _ranking_frame(record, key=uns_key),
+            available_groups=available_groups,
+            groups=selected,
+            n_genes=n_genes,
+        ).select("group", "gene")
+        first = pl.col("gene").is_first_distinct()
+        kept = top.filter(first)
+        keys: dict[str, list[str]] = {group: [] for group in selected}
+        for group, genes in kept.group_by("group", maintain_order=True).agg("gene").iter_rows():
+            keys[group] = genes
+        dropped = top.filter(~first)
+
+        if dropped.height:
             examples = ", ".join(
                 f"{gene!r} (kept in {first!r}, dropped from {later!r})"
-                for gene, first, later in dropped[:3]
+                for gene, first, later in dropped.head(3)
+                .join(
+                    kept.rename({"group": "first"}), on="gene", how="left", maintain_order="left"
+                )
+                .select("gene", "first", "group")
+                .iter_rows()
             )
-            suffix = f" and {len(dropped) - 3} more" if len(dropped) > 3 else ""
+            suffix = f" and {dropped.height - 3} more" if dropped.height > 3 else ""
             _warn(
                 "Some genes ranked highly in multiple groups; "
                 "keeping the first occurrence and dropping the rest "
@@ -16,6 +16,7 @@ from lets_plot.plot.core import FeatureSpec, LayerSpec
 from mudata import MuData
 
 from cellestial.frames import build_frame
+from cellestial.single.core._summary import _ridge_densities
 from cellestial.util import (
     _collect_aes_columns,
     _determine_axis,
@@ -42,6 +43,7 @@ def ridge(
     *,
     frame: DataFrame | None = None,
     scale: float = 2.0,
+    precompute: bool = False,
     mapping: FeatureSpec | None = None,
     axis: Literal[0, 1] | None = None,
     threshold: float | None = None,
@@ -72,6 +74,14 @@ def ridge(
         building from `data` is skipped. Must contain the `key` and `group_by` columns.
     scale : float, default=2.0
         Scaling factor for the height of the ridges.
+    precompute : bool, default=False
+        Whether to compute the ridge densities in cellestial instead of in the plot.
+        Every group's Gaussian density is evaluated on a shared grid in one pass
+        and only those curves are drawn, with `stat='identity'`, so the plot
+        carries `n` points per group instead of every observation. `trim`,
+        `tails_cutoff`, `bw`, `adjust` and `n` in `**geom_kwargs` keep their
+        `geom_area_ridges` meaning; other kernels and quantile lines are not
+        available.
     mapping : FeatureSpec | None, default=None
         Additional aesthetic mappings for the plot, the result of `aes()`.
     axis : {0,1} | None, default=None
@@ -233,19 +243,29 @@ def ridge(
     _validate_tooltips(tooltips, frame)
 
     # BUILD: the plot
-    rdg = ggplot(data=frame)
-
-    rdg += geom_area_ridges(
-        mapping=aes(
-            x=key,
-            y=group_by,
-            fill=group_by,
-            **mapping.as_dict(),
-        ),
-        scale=scale,
-        tooltips=tooltips,
-        **geom_kwargs,
-    )
+    if precompute:
+        rdg = ggplot() + _ridge_density_layer(
+            frame,
+            key=key,
+            group_by=group_by,
+            mapping=mapping,
+            scale=scale,
+            tooltips=tooltips,
+            **geom_kwargs,
+        )
+    else:
+        rdg = ggplot(data=frame)
+        rdg += geom_area_ridges(
+            mapping=aes(
+                x=key,
+                y=group_by,
+                fill=group_by,
+                **mapping.as_dict(),
+            ),
+            scale=scale,
+            tooltips=tooltips,
+            **geom_kwargs,
+        )
 
     # handle interactive
     if interactive:
@@ -254,12 +274,76 @@ def ridge(
     return rdg + scale_fill_hue()
 
 
+def _ridge_density_layer(
+    frame: DataFrame,
+    *,
+    key: str,
+    group_by: str,
+    mapping: FeatureSpec,
+    scale: float,
+    tooltips: Literal["none"] | Sequence[str] | FeatureSpec | None,
+    trim: bool = False,
+    tails_cutoff: float | None = None,
+    bw: Literal["nrd0", "nrd"] | float = "nrd0",
+    adjust: float = 1.0,
+    n: int = 512,
+    kernel: str = "gaussian",
+    **geom_kwargs,
+) -> LayerSpec:
+    """
+    An identity-stat `geom_area_ridges` layer drawing precomputed densities of `frame`.
+
+    Densities come from `_ridge_densities` per `group_by` value, split further
+    by the `fill`/`color` columns of `mapping`, with the `densityridges` stat
+    parameters it understands; the remaining `geom_kwargs` go to the layer.
+    """
+    if kernel != "gaussian":
+        msg = f"precomputed ridges use a gaussian kernel, got kernel={kernel!r}"
+        raise ValueError(msg)
+    aesthetics = {"fill": group_by, **mapping.as_dict()}
+    group_columns = [
+        group_by,
+        *(
+            column
+            for name in ("fill", "color")
+            if isinstance(column := aesthetics.get(name), str)
+            and column in frame.columns
+            and not frame[column].dtype.is_float()
+        ),
+    ]
+    densities = _ridge_densities(
+        frame,
+        value_column=key,
+        group_columns=group_columns,
+        trim=trim,
+        tails_cutoff=tails_cutoff,
+        bw=bw,
+        adjust=adjust,
+        n=n,
+    )
+    # aesthetics mapped to per-observation columns have nothing to map on a density
+    group_mapping = {
+        name: column
+        for name, column in aesthetics.items()
+        if isinstance(column, str) and column in group_columns
+    }
+    return geom_area_ridges(
+        data=densities,
+        mapping=aes(x=key, y=group_by, height="height", **group_mapping),
+        stat="identity",
+        scale=scale,
+        tooltips=[*dict.fromkeys(group_columns), key, "density"] if tooltips != "none" else "none",
+        **geom_kwargs,
+    )
+
+
 def ridges(
     data: AnnData | MuData,
     keys: Sequence[str],
     group_by: str,
     *,
     scale: float = 2.0,
+    precompute: bool = False,
     mapping: FeatureSpec | None = None,
     axis: Literal[0, 1] | None = None,
     threshold: float | None = None,
@@ -300,6 +384,14 @@ def ridges(
         e.g., 'cell_type' or 'leiden'.
     scale : float, default=2.0
         Scaling factor for the height of the ridges.
+    precompute : bool, default=False
+        Whether to compute the ridge densities in cellestial instead of in the plot.
+        Every group's Gaussian density is evaluated on a shared grid in one pass
+        and only those curves are drawn, with `stat='identity'`, so the plot
+        carries `n` points per group instead of every observation. `trim`,
+        `tails_cutoff`, `bw`, `adjust` and `n` in `**geom_kwargs` keep their
+        `geom_area_ridges` meaning; other kernels and quantile lines are not
+        available.
     mapping : FeatureSpec | None, default=None
         Additional aesthetic mappings for the plot, the result of `aes()`.
     axis : {0,1} | None, default=None
@@ -444,6 +536,7 @@ def ridges(
             drop=drop,
             frame=frame,
             scale=scale,
+            precompute=precompute,
             mapping=mapping,
             axis=axis,
             threshold=threshold,
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import re
+from typing import TYPE_CHECKING
+
+import numpy as np
+import pandas as pd
+from anndata import AnnData
+from scipy import sparse
+
+if TYPE_CHECKING:
+    from typing import Literal
+
+    from numpy.typing import NDArray
+
+# Visium HD grid coordinates of each bin, as written by Space Ranger.
+_GRID_COLUMNS = ("array_row", "array_col")
+# Space Ranger HD barcodes carry their bin size, e.g. `s_002um_00123_00456-1`.
+_BARCODE_BIN_SIZE = re.compile(r"^s_(\d+)um_")
+# Aggregated bins drawn along the longer side per output pixel with `bin_size='auto'`.
+_BINS_PER_PIXEL = 1 / 4
+
+
+def _bin_size_um(table: AnnData) -> float:
+    """
+    The bin size, in µm, of a Visium HD table.
+
+    Read from the `bin_size_um` scale factor of its library, else from the
+    size prefix of its barcodes.
+    """
+    for library in table.uns.get("spatial", {}).values():
+        size = library.get("scalefactors", {}).get("bin_size_um")
+        if size is not None:
+            return float(size)
+    if table.n_obs and (match := _BARCODE_BIN_SIZE.match(str(table.obs_names[0]))):
+        return float(match.group(1))
+    msg = (
+        "cannot tell the bin size of the table: expected a `bin_size_um` scale "
+        "factor or Visium HD barcodes such as `s_002um_00000_00000-1`"
+    )
+    raise ValueError(msg)
+
+
+def _bin_factor(
+    grid: NDArray,
+    *,
+    bin_size: float | Literal["auto"],
+    base_size: float,
+    resolution: int,
+) -> int:
+    """
+    How many bins along each side make one aggregated bin.
+
+    `'auto'` keeps about `_BINS_PER_PIXEL` aggregated bins per output pixel
+    along the longer side of the grid, rounded up to a power of two times the
+    base bin.
+    """
+    if bin_size == "auto":
+        span = int((grid.max(axis=0) - grid.min(axis=0)).max()) + 1 if len(grid) else 1
+        target = max(int(resolution * _BINS_PER_PIXEL), 1)
+        return 1 << max(int(np.ceil(np.log2(max(span / target, 1)))), 0)
+    factor = bin_size / base_size
+    if factor < 1 or not float(factor).is_integer():
+        msg = f"`bin_size` must be a multiple of the {base_size:g} µm bins, got {bin_size}"
+        raise ValueError(msg)
+    return int(factor)
+
+
+def _aggregate_bins(
+    table: AnnData,
+    spot_coordinates: NDArray | None,
+    *,
+    bin_size: float | Literal["auto"],
+    aggregate: Literal["sum", "mean"],
+    resolution: int,
+) -> tuple[AnnData, NDArray, float]:
+    """
+    Merge Visium HD bins into coarser square bins.
+
+    Bins are grouped by integer-dividing their grid coordinates, and a sparse
+    `(n_groups, n_obs)` aggregation matrix sums or averages `X` in one
+    product. Numeric obs columns are averaged, categorical ones take their most
+    frequent category, spot coordinates are averaged; other columns, layers and
+    obsm entries are dropped. Returns the aggregated table, its spot
+    coordinates and the aggregated bin size in µm.
+    """
+    if spot_coordinates is None:
+        msg = "`bin_size` aggregates spot coordinates; it cannot be used with `polygon=True`"
+        raise ValueError(msg)
+    if aggregate not in ("sum", "mean"):
+        msg = f"`bin_aggregate` must be 'sum' or 'mean', got {aggregate!r}"
+        raise ValueError(msg)
+    missing = [column for column in _GRID_COLUMNS if column not in table.obs.columns]
+    if missing:
+        msg = f"`bin_size` needs the Visium HD grid columns {missing} in obs"
+        raise ValueError(msg)
+    base_size = _bin_size_um(table)
+    grid = table.obs[list(_GRID_COLUMNS)].to_numpy(dtype=np.int64)
+    factor = _bin_factor(grid, bin_size=bin_size, base_size=base_size, resolution=resolution)
+    if factor == 1:
+        return table, spot_coordinates, base_size
+
+    cells, group = np.unique(grid // factor, axis=0, return_inverse=True)
+    group = group.ravel()
+    n_groups, n_obs = len(cells), table.n_obs
+    summing = sparse.csr_matrix(
+        (np.ones(n_obs), (group, np.arange(n_obs))), shape=(n_groups, n_obs)
+    )
+    averaging = sparse.diags(1 / np.bincount(group, minlength=n_groups)) @ summing
+
+    matrix = table.X
+    aggregated = (summing if aggregate == "sum" else averaging) @ matrix
+    if sparse.issparse(matrix):
+        aggregated = sparse.csr_matrix(aggregated)
+
+    size = base_size * factor
+    columns = {
+        _GRID_COLUMNS[0]: cells[:, 0],
+        _GRID_COLUMNS[1]: cells[:, 1],
+    }
+    # instance ids name single bins; they do not survive aggregation
+    instance_key = table.uns.get("spatialdata_attrs", {}).get("instance_key")
+    for name, values in table.obs.items():
+        if name in _GRID_COLUMNS or name == instance_key:
+            continue
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            codes = values.cat.codes.to_numpy()
+            known = codes >= 0
+            votes = sparse.csr_matrix(
+                (np.ones(known.sum()), (group[known], codes[known])),
+                shape=(n_groups, max(len(values.cat.categories), 1)),
+            )
+            winners = np.asarray(votes.argmax(axis=1)).ravel()
+            winners[np.asarray(votes.sum(axis=1)).ravel() == 0] = -1
+            columns[name] = pd.Categorical.from_codes(winners, dtype=values.dtype)
+        elif pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+            columns[name] = averaging @ values.to_numpy(dtype=np.float64)
+    index = [f"s_{size:03g}um_{row:05d}_{col:05d}" for row, col in cells]
+    binned = AnnData(
+        X=aggregated,
+        obs=pd.DataFrame(columns, index=pd.Index(index)),
+        var=table.var.copy(),
+        uns={key: value for key, value in table.uns.items() if key != "spatialdata_attrs"},
+    )
+    return binned, averaging @ np.asarray(spot_coordinates, dtype=np.float64), size
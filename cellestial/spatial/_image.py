@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    from numpy.typing import NDArray
+
+# Input pixels read per tile; bounds the working memory of one tile.
+_TILE_PIXELS = 1 << 20
+# Rec.709 luminance weights, and the same in 16-bit fixed point (summing to 2**16).
+_LUMA = (0.2126, 0.7152, 0.0722)
+_LUMA_FIXED = (13933, 46871, 4732)
+
+
+def _has_tables(dtype: np.dtype) -> bool:
+    """Whether every value of `dtype` can index a lookup table (uint8 and uint16)."""
+    return dtype.kind == "u" and dtype.itemsize <= 2
+
+
+def _select_channels(
+    image: NDArray, channels: int | Sequence[int] | None
+) -> list[int] | int | None:
+    """Validate `channels` against `image`; an int selects one channel, a sequence 3 or 4."""
+    if channels is None:
+        return None
+    if image.ndim != 3:
+        msg = "`image_channels` needs an image with a channel axis"
+        raise ValueError(msg)
+    selected = [channels] if isinstance(channels, int) else list(channels)
+    if not isinstance(channels, int) and len(selected) not in (3, 4):
+        msg = f"`image_channels` selects one channel, or 3 (RGB) or 4 (RGBA), got {len(selected)}"
+        raise ValueError(msg)
+    n_channels = image.shape[-1]
+    if any(not -n_channels <= channel < n_channels for channel in selected):
+        msg = f"`image_channels` {selected} out of range for an image with {n_channels} channels"
+        raise ValueError(msg)
+    return channels if isinstance(channels, int) else selected
+
+
+def _downscale_factor(height: int, width: int, resolution: int) -> int:
+    """Largest integer factor that keeps the longer side at least `resolution` pixels."""
+    return max(max(height, width) // resolution, 1)
+
+
+def _block_mean(tile: NDArray, factor: int) -> NDArray:
+    """
+    Mean of every `factor` x `factor` block of `tile`, in the dtype of `tile`.
+
+    Blocks at the bottom and right edges average the pixels they have. Integer
+    tiles are summed in uint64 and rounded, floats are summed in float64.
+    """
+    if factor == 1:
+        return tile
+    integer = tile.dtype.kind in "ui"
+    rows = np.arange(0, tile.shape[0], factor)
+    columns = np.arange(0, tile.shape[1], factor)
+    sums = np.add.reduceat(tile, rows, axis=0, dtype=np.uint64 if integer else np.float64)
+    sums = np.add.reduceat(sums, columns, axis=1)
+    counts = np.outer(
+        np.diff(np.r_[rows, tile.shape[0]]), np.diff(np.r_[columns, tile.shape[1]])
+    ).astype(sums.dtype)
+    if sums.ndim == 3:
+        counts = counts[..., None]
+    if integer:
+        return ((sums + counts // 2) // counts).astype(tile.dtype)
+    return (sums / counts).astype(tile.dtype)
+
+
+def _luminance(tile: NDArray, tables: NDArray | None) -> NDArray:
+    """Rec.709 luminance of the first three channels, through `tables` when given."""
+    if tables is not None:
+        total = tables[0][tile[..., 0]] + tables[1][tile[..., 1]] + tables[2][tile[..., 2]]
+        return ((total + (1 << 15)) >> 16).astype(tile.dtype)
+    weights = np.array(_LUMA, dtype=tile.dtype if tile.dtype.kind == "f" else np.float64)
+    luminance = tile[..., :3] @ weights
+    if tile.dtype.kind in "ui":
+        luminance = np.rint(luminance)
+    return luminance.astype(tile.dtype)
+
+
+def _percentile_range(image: NDArray, percentiles: Sequence[float]) -> tuple[float, float]:
+    """
+    The `percentiles` of all values of `image`, channels pooled.
+
+    uint8/uint16 images are counted into a histogram a tile at a time and the
+    percentiles read off its cumulative counts, without sorting any pixel.
+    """
+    if not _has_tables(image.dtype):
+        low, high = np.nanpercentile(image, percentiles)
+        return float(low), float(high)
+    counts = np.zeros(np.iinfo(image.dtype).max + 1, dtype=np.int64)
+    values = image.reshape(-1)
+    for start in range(0, len(values), _TILE_PIXELS):
+        counts += np.bincount(values[start : start + _TILE_PIXELS], minlength=len(counts))
+    cumulative = np.cumsum(counts)
+    # the smallest value whose cumulative count reaches the percentile (inverted CDF)
+    counted = np.maximum(np.asarray(percentiles, dtype=np.float64) / 100 * cumulative[-1], 1)
+    low, high = np.searchsorted(cumulative, counted)
+    return float(low), float(high)
+
+
+def _stretch(image: NDArray, low: float, high: float) -> NDArray:
+    """
+    Scale `image` linearly from `[low, high]` to uint8 `[0, 255]`, clipping outside.
+
+    uint8/uint16 images go through a lookup table of every value; others are
+    scaled a tile at a time, with NaN mapped to 0.
+    """
+    scale = 255 / (high - low) if high > low else 0.0
+    if _has_tables(image.dtype):
+        values = np.arange(np.iinfo(image.dtype).max + 1, dtype=np.float64)
+        table = np.clip(np.rint((values - low) * scale), 0, 255).astype(np.uint8)
+        return table[image]
+    stretched = np.empty(image.shape, dtype=np.uint8)
+    rows = max(_TILE_PIXELS // max(image[0].size, 1), 1)
+    for start in range(0, image.shape[0], rows):
+        tile = (image[start : start + rows].astype(np.float64) - low) * scale
+        stretched[start : start + rows] = np.clip(np.rint(np.nan_to_num(tile)), 0, 255)
+    return stretched
+
+
+def _prepare_image(
+    image: NDArray,
+    extent: list[float] | None,
+    *,
+    channels: int | Sequence[int] | None,
+    greyscale: bool,
+    percentiles: Sequence[float] | None,
+    vmin: float | None,
+    vmax: float | None,
+    resolution: int,
+) -> tuple[NDArray, list[float] | None, bool]:
+    """
+    Bring a tissue image to its display resolution in one tiled pass.
+
+    Selects `channels`, block-averages by the largest integer factor that keeps
+    the longer side at least `resolution` pixels, and converts to greyscale,
+    band by band of input rows, into an output allocated once at display size.
+    uint8/uint16 greyscale goes through fixed-point lookup tables of the
+    Rec.709 weights. With `percentiles`, the output is then stretched to uint8
+    between those percentiles (or `vmin`/`vmax` when given).
+
+    Returns the image, its `geom_imshow` extent (widened to whole blocks when
+    downscaled, None when it was None and nothing was downscaled) and whether
+    the image was stretched. An image that needs none of these is returned as
+    is, without a copy.
+
+    Notes
+    -----
+    Working memory is the output plus one band of about `_TILE_PIXELS` input
+    pixels, instead of full-resolution float64 copies of the image.
+    """
+    selected = _select_channels(image, channels)
+    if percentiles is not None and (
+        len(percentiles) != 2 or not 0 <= percentiles[0] < percentiles[1] <= 100
+    ):
+        msg = f"`image_percentiles` must be (low, high) with 0 <= low < high <= 100, got {percentiles}"
+        raise ValueError(msg)
+    height, width = image.shape[:2]
+    factor = _downscale_factor(height, width, resolution)
+    to_grey = greyscale and image.ndim == 3 and not isinstance(selected, int)
+
+    if selected is not None or factor > 1 or to_grey:
+        out_height, out_width = -(-height // factor), -(-width // factor)
+        if image.ndim == 2 or isinstance(selected, int) or to_grey:
+            shape = (out_height, out_width)
+        else:
+            shape = (out_height, out_width, image.shape[2] if selected is None else len(selected))
+        prepared = np.empty(shape, dtype=image.dtype)
+        tables = None
+        if to_grey and _has_tables(image.dtype):
+            levels = np.arange(np.iinfo(image.dtype).max + 1, dtype=np.uint64)
+            tables = np.outer(np.array(_LUMA_FIXED, dtype=np.uint64), levels)
+        band = max(_TILE_PIXELS // max(image[0].size * factor, 1), 1) * factor
+        for start in range(0, height, band):
+            tile = image[start : start + band]
+            if selected is not None:
+                tile = tile[..., selected]
+            tile = _block_mean(tile, factor)
+            if to_grey:
+                tile = _luminance(tile, tables)
+            prepared[start // factor : start // factor + len(tile)] = tile
+        if factor > 1:
+            left, right, top, bottom = (
+                [-0.5, width - 0.5, -0.5, height - 0.5] if extent is None else extent
+            )
+            extent = [
+                left,
+                left + (right - left) / width * out_width * factor,
+                top,
+                top + (bottom - top) / height * out_height * factor,
+            ]
+        image = prepared
+
+    if percentiles is None:
+        return image, extent, False
+    low, high = _percentile_range(image, percentiles)
+    low = low if vmin is None else vmin
+    high = high if vmax is None else vmax
+    return _stretch(image, low, high), extent, True
@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+from lets_plot import geom_imshow, labs
+
+from cellestial.spatial.utilities import (
+    _IMAGE_RESOLUTION,
+    _affine_matrix,
+    _apply_affine,
+    _target_coordinate_system,
+    _validate_region,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    from lets_plot.plot.core import FeatureSpec
+    from numpy.typing import NDArray
+    from spatialdata import SpatialData
+
+
+def _points_bounds(points, matrix: NDArray) -> tuple[float, float, float, float]:
+    """Bounds of a points element in the target system, from one pass over `x` and `y`."""
+    import dask
+
+    x_min, x_max, y_min, y_max = dask.compute(
+        points["x"].min(), points["x"].max(), points["y"].min(), points["y"].max()
+    )
+    corners = matrix @ np.array(
+        [[x_min, x_max, x_max, x_min], [y_min, y_min, y_max, y_max], [1, 1, 1, 1]]
+    )
+    return (
+        float(corners[0].min()),
+        float(corners[1].min()),
+        float(corners[0].max()),
+        float(corners[1].max()),
+    )
+
+
+def _points_density(
+    points,
+    *,
+    matrix: NDArray,
+    genes: Sequence[str] | None,
+    feature_key: str | None,
+    bounds: tuple[float, float, float, float],
+    resolution: int,
+) -> tuple[NDArray, list[float]]:
+    """
+    Count the points of a dask points element into a grid, a partition at a time.
+
+    `matrix` maps the element's `x`, `y` into the target system; the grid covers
+    `bounds` there with `resolution` pixels along its longer side. Points whose
+    `feature_key` value is not in `genes` are dropped before they are
+    transformed. Returns the `(h, w)` counts and their `geom_imshow` extent.
+
+    Only one partition, reduced to the columns needed, is in memory at a time.
+    """
+    x0, y0, x1, y1 = bounds
+    pixel = max(x1 - x0, y1 - y0) / resolution or 1.0
+    width = max(int(np.ceil((x1 - x0) / pixel)), 1)
+    height = max(int(np.ceil((y1 - y0) / pixel)), 1)
+    extent = [x0, x0 + width * pixel, y0, y0 + height * pixel]
+    counts = np.zeros(height * width, dtype=np.int64)
+
+    columns = ["x", "y"] if genes is None else ["x", "y", feature_key]
+    wanted = None if genes is None else list(genes)
+    for partition in points[columns].to_delayed():
+        frame = partition.compute()
+        if wanted is not None:
+            frame = frame[frame[feature_key].isin(wanted).to_numpy()]
+        xy = _apply_affine(np.column_stack([frame["x"].to_numpy(), frame["y"].to_numpy()]), matrix)
+        column = np.floor((xy[:, 0] - x0) / pixel).astype(np.int64)
+        row = np.floor((xy[:, 1] - y0) / pixel).astype(np.int64)
+        # points on the far edge of the bounds belong to the last pixel
+        column[xy[:, 0] == x0 + width * pixel] = width - 1
+        row[xy[:, 1] == y0 + height * pixel] = height - 1
+        inside = (column >= 0) & (column < width) & (row >= 0) & (row < height)
+        counts += np.bincount(row[inside] * width + column[inside], minlength=len(counts))
+    return counts.reshape(height, width), extent
+
+
+def _points_layer(
+    data: SpatialData,
+    *,
+    points_name: str,
+    genes: Sequence[str] | str | None,
+    cmap: str | list,
+    table_name: str | None,
+    shapes_name: str | None,
+    image_name: str | None,
+    coordinate_system: str | None,
+    image: bool,
+    region: Sequence[float] | None,
+    image_resolution: int | None,
+) -> FeatureSpec:
+    """
+    Draw the density of a SpatialData points element as a `geom_imshow` layer.
+
+    Points (transcripts) are counted per output pixel over `region`, or over
+    the element's bounds, in the coordinate system the other components are
+    resolved in, and drawn with `cmap` and a colourbar; pixels without points
+    stay transparent so the tissue image shows through.
+    """
+    from spatialdata import SpatialData
+
+    if not isinstance(data, SpatialData):
+        msg = "`points_name` needs a SpatialData object"
+        raise TypeError(msg)
+    if points_name not in data.points:
+        msg = f"points element `{points_name}` not found. Available: {list(data.points)}"
+        raise KeyError(msg)
+    points = data.points[points_name]
+    if isinstance(genes, str):
+        genes = [genes]
+    feature_key = points.attrs.get("spatialdata_attrs", {}).get("feature_key")
+    if genes is not None and feature_key is None:
+        msg = f"points element `{points_name}` has no feature key; `genes` cannot be selected"
+        raise ValueError(msg)
+
+    target_cs = _target_coordinate_system(
+        data,
+        table_name=table_name,
+        shapes_name=shapes_name,
+        image_name=image_name,
+        coordinate_system=coordinate_system,
+        image=image,
+    )
+    matrix = _affine_matrix(points, target_cs)
+    region = _validate_region(region)
+    counts, extent = _points_density(
+        points,
+        matrix=matrix,
+        genes=genes,
+        feature_key=feature_key,
+        bounds=region if region is not None else _points_bounds(points, matrix),
+        resolution=_IMAGE_RESOLUTION if image_resolution is None else image_resolution,
+    )
+    density = counts.astype(np.float64)
+    density[counts == 0] = np.nan
+    return geom_imshow(
+        image_data=density,
+        extent=extent,
+        cmap=cmap,
+        show_legend=True,
+        color_by="paint_c",
+    ) + labs(paint_c=points_name if genes is None else ", ".join(genes))
@@ -0,0 +1,270 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+import polars as pl
+from lets_plot import (
+    aes,
+    geom_imshow,
+    geom_point,
+    guide_legend,
+    guides,
+    scale_fill_gradientn,
+    scale_fill_manual,
+)
+
+from cellestial.util.utilities import _resolve_midpoint
+
+if TYPE_CHECKING:
+    from typing import Literal
+
+    from lets_plot.plot.core import FeatureSpec
+    from numpy.typing import NDArray
+
+# ColorBrewer Set2, the palette of the vector polygon and point layers.
+_SET2 = ("#66c2a5", "#fc8d62", "#8da0cb", "#e78ac3", "#a6d854", "#ffd92f", "#e5c494", "#b3b3b3")
+_NA_COLOR = "#c0c0c0"
+# Colours sampled along a continuous fill for the colourbar of a raster layer.
+_GRADIENT_STOPS = 65
+
+
+def _hex_to_rgb(colors) -> NDArray:
+    """`(n, 3)` float RGB array of `#rrggbb` colours."""
+    return np.array(
+        [[int(color[index : index + 2], 16) for index in (1, 3, 5)] for color in colors],
+        dtype=np.float64,
+    )
+
+
+def _rgb_to_hex(rgb: NDArray) -> list[str]:
+    """`#rrggbb` colours of an `(n, 3)` RGB array."""
+    return ["#{:02x}{:02x}{:02x}".format(*row) for row in np.rint(rgb).clip(0, 255).astype(int)]
+
+
+def _gradient_rgb(
+    values: NDArray,
+    *,
+    low: float,
+    high: float,
+    mid: float | None,
+    color_low: str,
+    color_mid: str | None,
+    color_high: str,
+) -> NDArray:
+    """
+    RGB colours of `values` along a linear `color_low` to `color_high` gradient.
+
+    With `color_mid`, the gradient runs through it at data value `mid`. Values
+    outside `[low, high]` are clamped.
+    """
+    if color_mid is None or mid is None:
+        stops = np.array([low, high])
+        palette = _hex_to_rgb([color_low, color_high])
+    else:
+        stops = np.array([low, mid, high])
+        palette = _hex_to_rgb([color_low, color_mid, color_high])
+    if stops[-1] == stops[0]:
+        return np.broadcast_to(palette[0], (len(values), 3)).copy()
+    values = np.clip(values, stops[0], stops[-1])
+    return np.column_stack([np.interp(values, stops, palette[:, band]) for band in range(3)])
+
+
+def _polygon_fill(
+    series: pl.Series,
+    *,
+    color_low: str,
+    color_mid: str | None,
+    color_high: str,
+    midpoint: Literal["mean", "median", "mid"] | float,
+) -> tuple[NDArray, FeatureSpec | None, pl.Series | None]:
+    """
+    Colour every value of `series` the way the fill scale will show it.
+
+    Returns the `(n, 3)` RGB colours, the fill scale for the legend, and the
+    values the invisible legend proxy has to carry for that scale: each
+    category once, or the range of a continuous key. Categorical keys use
+    Set2 in category order; numeric keys the gradient of `_fill_gradient`.
+    """
+    if series.dtype.is_numeric():
+        values = series.cast(pl.Float64)
+        finite = values.filter(values.is_not_null() & values.is_finite())
+        if finite.is_empty():
+            rgb = np.broadcast_to(_hex_to_rgb([_NA_COLOR])[0], (len(series), 3)).copy()
+            return rgb, None, None
+        low, high = float(finite.min()), float(finite.max())
+        mid = None if color_mid is None else _resolve_midpoint(values, midpoint)
+        gradient = {
+            "low": low,
+            "high": high,
+            "mid": mid,
+            "color_low": color_low,
+            "color_mid": color_mid,
+            "color_high": color_high,
+        }
+        array = values.fill_null(np.nan).to_numpy()
+        rgb = _gradient_rgb(np.nan_to_num(array, nan=low), **gradient)
+        rgb[~np.isfinite(array)] = _hex_to_rgb([_NA_COLOR])[0]
+        stops = _gradient_rgb(np.linspace(low, high, _GRADIENT_STOPS), **gradient)
+        scale = scale_fill_gradientn(
+            colors=_rgb_to_hex(stops), limits=[low, high], na_value=_NA_COLOR
+        )
+        return rgb, scale, pl.Series(series.name, [low, high])
+
+    if series.dtype == pl.Categorical:
+        present = set(series.drop_nulls().unique().to_list())
+        levels = [level for level in series.cat.get_categories().to_list() if level in present]
+    else:
+        levels = series.drop_nulls().unique().sort().to_list()
+    colors = [_SET2[index % len(_SET2)] for index in range(len(levels))]
+    codes = series.replace_strict(levels, range(len(levels)), default=len(levels)).to_numpy()
+    palette = _hex_to_rgb([*colors, _NA_COLOR])
+    scale = scale_fill_manual(
+        values=dict(zip(levels, colors, strict=True)), limits=levels, na_value=_NA_COLOR
+    )
+    return palette[codes], scale, pl.Series(series.name, levels, dtype=series.dtype)
+
+
+def _scanline_fill(
+    x: NDArray,
+    y: NDArray,
+    polygon: NDArray,
+    *,
+    bounds: tuple[float, float, float, float],
+    resolution: int,
+) -> tuple[NDArray, list[float]]:
+    """
+    Rasterise polygons into a label image by even-odd scanline filling.
+
+    `x`, `y` hold the ring vertices of every polygon, grouped by the
+    consecutive codes in `polygon` (`0..n-1`, rings closed, holes following
+    their exterior). The grid covers `bounds` with `resolution` pixels along
+    its longer side. Returns the `(h, w)` label image, holding the polygon
+    code drawn last over each pixel centre or -1, and its `geom_imshow`
+    extent.
+
+    Every edge is intersected with the pixel rows it spans in one vectorised
+    pass; sorted by polygon, row and x, the crossings pair up into filled
+    spans. Consecutive vertices of a polygon form its edges, plus one edge from
+    its last vertex back to the first, which cancels the jumps between its
+    rings under the even-odd rule.
+    """
+    x0, y0, x1, y1 = bounds
+    pixel = max(x1 - x0, y1 - y0) / resolution or 1.0
+    width = max(int(np.ceil((x1 - x0) / pixel)), 1)
+    height = max(int(np.ceil((y1 - y0) / pixel)), 1)
+    extent = [x0, x0 + width * pixel, y0, y0 + height * pixel]
+    label = np.full((height, width), -1, dtype=np.int64)
+    if len(x) == 0:
+        return label, extent
+
+    following = np.flatnonzero(polygon[1:] == polygon[:-1])
+    firsts = np.flatnonzero(np.r_[True, polygon[1:] != polygon[:-1]])
+    lasts = np.r_[firsts[1:] - 1, len(polygon) - 1]
+    start = np.concatenate([following, lasts])
+    end = np.concatenate([following + 1, firsts])
+    ax, ay, bx, by = x[start], y[start], x[end], y[end]
+    codes = polygon[start]
+    sloped = ay != by
+    ax, ay, bx, by, codes = ax[sloped], ay[sloped], bx[sloped], by[sloped], codes[sloped]
+
+    # pixel rows whose centre lies in [min(y), max(y)) of each edge
+    first_row = np.clip(np.ceil((np.minimum(ay, by) - y0) / pixel - 0.5), 0, height)
+    stop_row = np.clip(np.ceil((np.maximum(ay, by) - y0) / pixel - 0.5), 0, height)
+    counts = (stop_row - first_row).astype(np.int64).clip(0)
+    edge = np.repeat(np.arange(len(counts)), counts)
+    offsets = np.cumsum(counts) - counts
+    rows = first_row.astype(np.int64)[edge] + np.arange(len(edge)) - offsets[edge]
+    centre = y0 + (rows + 0.5) * pixel
+    crossing = ax[edge] + (centre - ay[edge]) / (by[edge] - ay[edge]) * (bx[edge] - ax[edge])
+
+    order = np.lexsort((crossing, rows, codes[edge]))
+    crossing, rows, span_codes = crossing[order], rows[order], codes[edge][order]
+    enter, leave = crossing[0::2], crossing[1::2]
+    rows, span_codes = rows[0::2], span_codes[0::2]
+
+    # pixel columns whose centre lies in [enter, leave)
+    first_column = np.clip(np.ceil((enter - x0) / pixel - 0.5), 0, width).astype(np.int64)
+    stop_column = np.clip(np.ceil((leave - x0) / pixel - 0.5), 0, width).astype(np.int64)
+    lengths = (stop_column - first_column).clip(0)
+    span = np.repeat(np.arange(len(lengths)), lengths)
+    offsets = np.cumsum(lengths) - lengths
+    columns = first_column[span] + np.arange(len(span)) - offsets[span]
+    label.ravel()[rows[span] * width + columns] = span_codes[span]
+    return label, extent
+
+
+def _polygon_raster(
+    frame: pl.DataFrame,
+    key: str | None,
+    *,
+    bounds: tuple[float, float, float, float] | None,
+    resolution: int,
+    alpha: float,
+    color_low: str,
+    color_mid: str | None,
+    color_high: str,
+    midpoint: Literal["mean", "median", "mid"] | float,
+) -> FeatureSpec | None:
+    """
+    Draw the polygons of a vertex frame as one RGBA `geom_imshow` layer.
+
+    Each polygon is filled with the colour of its `key` value over `bounds`
+    (the vertices' bounding box when None), transparent elsewhere, so it
+    composites over the tissue image. An invisible point layer carrying the
+    key values and the matching fill scale keep the legend or colourbar.
+    """
+    if frame.is_empty():
+        return None
+    if bounds is None:
+        bounds = (
+            float(frame["polygon_x"].min()),
+            float(frame["polygon_y"].min()),
+            float(frame["polygon_x"].max()),
+            float(frame["polygon_y"].max()),
+        )
+    polygon = frame["instance_id"].rle_id().to_numpy()
+    label, extent = _scanline_fill(
+        frame["polygon_x"].to_numpy(),
+        frame["polygon_y"].to_numpy(),
+        polygon,
+        bounds=bounds,
+        resolution=resolution,
+    )
+
+    firsts = np.flatnonzero(np.r_[True, polygon[1:] != polygon[:-1]])
+    if key is None:
+        rgb = np.broadcast_to(_hex_to_rgb([_NA_COLOR])[0], (len(firsts), 3))
+        scale = proxy_values = None
+    else:
+        rgb, scale, proxy_values = _polygon_fill(
+            frame[key].gather(firsts),
+            color_low=color_low,
+            color_mid=color_mid,
+            color_high=color_high,
+            midpoint=midpoint,
+        )
+    filled = label >= 0
+    image = np.zeros((*label.shape, 4), dtype=np.uint8)
+    image[filled, :3] = np.rint(rgb[label[filled]]).astype(np.uint8)
+    image[filled, 3] = round(alpha * 255)
+    layers = geom_imshow(image_data=image, extent=extent, show_legend=False)
+
+    if scale is not None and proxy_values is not None:
+        proxy = pl.DataFrame(
+            {
+                "polygon_x": [bounds[0]] * len(proxy_values),
+                "polygon_y": [bounds[1]] * len(proxy_values),
+            }
+        ).with_columns(proxy_values)
+        layers += geom_point(
+            data=proxy,
+            mapping=aes(x="polygon_x", y="polygon_y", fill=key),
+            shape=21,
+            alpha=0,
+            tooltips="none",
+        )
+        layers += scale
+        if not proxy_values.dtype.is_numeric():
+            layers += guides(fill=guide_legend(override_aes={"alpha": 1, "size": 5}))
+    return layers
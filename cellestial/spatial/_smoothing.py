@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from hashlib import blake2b
+from typing import TYPE_CHECKING
+
+import numpy as np
+import polars as pl
+from scipy import sparse
+from scipy.spatial import cKDTree
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    from numpy.typing import NDArray
+
+# Neighbourhood weights are cached by (radius, k) plus a digest of the spot
+# coordinates they were computed from, so a stale entry never matches.
+_SMOOTHING_CACHE: OrderedDict[tuple, sparse.csr_matrix] = OrderedDict()
+_SMOOTHING_CACHE_SIZE = 8
+
+
+def _neighbourhood_weights(
+    coordinates: NDArray, *, radius: float | None, k: int | None
+) -> sparse.csr_matrix:
+    """
+    Row-stochastic `(n, n)` weights averaging each spot with its neighbours, cached.
+
+    Neighbours are the spots within `radius` of it, or its `k` nearest, itself
+    included, found with one `cKDTree` query over `coordinates`.
+    """
+    coordinates = np.ascontiguousarray(coordinates, dtype=np.float64)
+    digest = blake2b(coordinates.tobytes(), digest_size=16).hexdigest()
+    cache_key = (radius, k, coordinates.shape, digest)
+    cached = _SMOOTHING_CACHE.get(cache_key)
+    if cached is not None:
+        _SMOOTHING_CACHE.move_to_end(cache_key)
+        return cached
+
+    n = len(coordinates)
+    tree = cKDTree(coordinates)
+    if radius is not None:
+        pairs = tree.sparse_distance_matrix(tree, radius, output_type="ndarray")
+        rows, columns = pairs["i"], pairs["j"]
+    else:
+        n_neighbours = min(k, n)
+        _, neighbours = tree.query(coordinates, k=n_neighbours)
+        neighbours = np.asarray(neighbours).reshape(n, n_neighbours)
+        rows, columns = np.repeat(np.arange(n), n_neighbours), neighbours.ravel()
+    counts = np.bincount(rows, minlength=n).astype(np.float64)
+    weights = sparse.csr_matrix(
+        (1.0 / counts[rows], (rows, columns)), shape=(n, n), dtype=np.float64
+    )
+
+    _SMOOTHING_CACHE[cache_key] = weights
+    if len(_SMOOTHING_CACHE) > _SMOOTHING_CACHE_SIZE:
+        _SMOOTHING_CACHE.popitem(last=False)
+    return weights
+
+
+def _smooth_columns(
+    frame: pl.DataFrame,
+    columns: Sequence[str],
+    coordinates: NDArray | None,
+    *,
+    radius: float | None,
+    k: int | None,
+) -> pl.DataFrame:
+    """
+    Replace the numeric `columns` of `frame` by their neighbourhood means.
+
+    Rows of `frame` line up with `coordinates`. All columns go through one
+    sparse product with `_neighbourhood_weights`, next to their finite masks,
+    so missing values are left out of each mean instead of spreading.
+    """
+    if radius is not None and k is not None:
+        msg = "pass either `smooth_radius` or `smooth_k`, not both"
+        raise ValueError(msg)
+    if radius is None and k is None:
+        return frame
+    if radius is not None and not radius > 0:
+        msg = f"`smooth_radius` must be positive, got {radius}"
+        raise ValueError(msg)
+    if k is not None and k < 1:
+        msg = f"`smooth_k` must be at least 1, got {k}"
+        raise ValueError(msg)
+    if coordinates is None:
+        msg = "smoothing needs spot coordinates; it cannot be used with `polygon=True`"
+        raise ValueError(msg)
+
+    numeric = [
+        column
+        for column in dict.fromkeys(columns)
+        if column in frame.columns and frame[column].dtype.is_numeric()
+    ]
+    if not numeric or frame.is_empty():
+        return frame
+    values = frame.select(pl.col(numeric).cast(pl.Float64)).to_numpy(writable=True)
+    # spots without finite coordinates are dropped from the plot; leave them out
+    placed = np.flatnonzero(np.isfinite(coordinates).all(axis=1))
+    finite = np.isfinite(values[placed])
+    weights = _neighbourhood_weights(coordinates[placed], radius=radius, k=k)
+    sums = weights @ np.hstack([np.where(finite, values[placed], 0.0), finite.astype(np.float64)])
+    with np.errstate(invalid="ignore", divide="ignore"):
+        values[placed] = sums[:, : len(numeric)] / sums[:, len(numeric) :]
+    return frame.with_columns(
+        pl.Series(column, values[:, index]) for index, column in enumerate(numeric)
+    )
@@ -13,15 +13,26 @@ from lets_plot import (
     geom_polygon,
     ggplot,
     ggtb,
+    labs,
     scale_color_brewer,
     scale_fill_brewer,
     scale_y_reverse,
 )
-from lets_plot.plot.core import FeatureSpec, PlotSpec
+from lets_plot.plot.core import FeatureSpec, LayerSpec, PlotSpec
 from mudata import MuData
 
 from cellestial.frames import build_frame
-from cellestial.spatial.utilities import _resolve_instance_key, _spatial_components
+from cellestial.spatial._bins import _aggregate_bins
+from cellestial.spatial._image import _prepare_image
+from cellestial.spatial._points import _points_layer
+from cellestial.spatial._raster import _polygon_raster
+from cellestial.spatial._smoothing import _smooth_columns
+from cellestial.spatial.utilities import (
+    _IMAGE_RESOLUTION,
+    _resolve_instance_key,
+    _resolve_table,
+    _spatial_components,
+)
 from cellestial.themes import _THEME_SPATIAL
 from cellestial.util import (
     _collect_aes_columns,
@@ -34,11 +45,13 @@ from cellestial.util import (
     _warn,
 )
 from cellestial.util.errors import UnsupportedDataTypeError, _unsupported_data_type
+from cellestial.util.operations import _register_plot
 
 if TYPE_CHECKING:
     from typing import Literal
 
     from lets_plot.plot.core import PlotSpec
+    from numpy.typing import NDArray
     from polars import DataFrame
     from spatialdata import SpatialData
 
@@ -49,9 +62,13 @@ def spatial(
     *,
     frame: DataFrame | None = None,
     library_id: str | None = None,
+    library_key: str | None = "library_id",
     image: bool = True,
     image_key: Literal["hires", "lowres"] | str = "lowres",
+    image_resolution: int | None = None,
     greyscale: bool = False,
+    image_channels: int | Sequence[int] | None = None,
+    image_percentiles: Sequence[float] | None = None,
     image_alpha: float | None = None,
     cmap: str | list | None = None,
     norm: bool | None = None,
@@ -63,7 +80,17 @@ def spatial(
     image_name: str | None = None,
     shapes_name: str | None = None,
     coordinate_system: str | None = None,
+    points_name: str | None = None,
+    genes: Sequence[str] | str | None = None,
+    points_cmap: str | list = "viridis",
     polygon: bool = False,
+    simplify: bool | float = False,
+    render: Literal["vector", "raster"] = "vector",
+    bin_size: float | Literal["auto"] | None = None,
+    bin_aggregate: Literal["sum", "mean"] = "sum",
+    smooth_radius: float | None = None,
+    smooth_k: int | None = None,
+    region: Sequence[float] | None = None,
     crop: Sequence[int] | None = None,
     mapping: FeatureSpec | None = None,
     size: float | None = 1.5,
@@ -95,20 +122,39 @@ def spatial(
         The key (cell feature or gene name) to color the spots by.
     frame : DataFrame | None, default=None
         A prebuilt frame to plot from. If provided, the frame is used directly and
-        building from `data` is skipped. Must contain the `key` column.
+        building from `data` is skipped. Must contain the `key` column and hold
+        one row per observation, either of the whole table or of the plotted
+        library and `region` only; a whole-table frame is narrowed to them.
     library_id : str | None, default=None
         The library identifier. If None and only one library is present, it is
         auto-selected; if multiple libraries are present, this must be provided.
         Leave as None when no library metadata is present (generic spatial data).
         Ignored for SpatialData inputs.
+    library_key : str | None, default='library_id'
+        The obs column naming the library of each observation. When present,
+        only the observations of the selected library are plotted. AnnData
+        inputs only.
     image : bool, default=True
         Whether to render the tissue image as a background layer.
     image_key : str, default='lowres'
         Which image variant to render. Visium ships with 'hires' and 'lowres'.
         Falls back to 'hires', then to any available variant, when the requested
         one is missing. Ignored for SpatialData inputs.
+    image_resolution : int | None, default=None
+        Target size, in pixels, of the longer side of the drawn image. For
+        multiscale SpatialData images the coarsest pyramid level at least this
+        large is loaded; any image is then block-averaged by the largest integer
+        factor that keeps it at least this large. If None, a size fit for the
+        default figure size (1200 px) is used.
     greyscale : bool, default=False
         Whether to convert an RGB(A) image to greyscale (Rec.709 luminance).
+    image_channels : int | Sequence[int] | None, default=None
+        Channels of the image to draw: one index for a single channel, drawn as
+        a greyscale image, or 3 (RGB) or 4 (RGBA) indices. If None, all of them.
+    image_percentiles : Sequence[float] | None, default=None
+        Stretch the image contrast linearly between these two percentiles of its
+        values, e.g. `(1, 99)`. `vmin` and `vmax`, when given, replace the
+        corresponding percentile. Applies to RGB(A) images too.
     image_alpha : float | None, default=None
         Alpha (transparency) of the tissue image.
         Distinct from `alpha`, which controls spot transparency.
@@ -146,10 +192,56 @@ def spatial(
         system before plotting. If None, the single available system is used,
         falling back to 'global' when multiple are defined. SpatialData
         inputs only.
+    points_name : str | None, default=None
+        Name of a points element (e.g. Xenium or MERSCOPE transcripts) to draw
+        as a density image over the tissue image: points are counted per
+        output pixel (`image_resolution` along the longer side) over `region`,
+        or over the element's bounds. The element is read a partition at a
+        time, so transcripts are never all in memory. SpatialData inputs only.
+    genes : Sequence[str] | str | None, default=None
+        Count only the points of these genes (values of the element's feature
+        key). If None, all points are counted.
+    points_cmap : str | list, default='viridis'
+        Colormap name or list of colors of the points density.
     polygon : bool, default=False
         Render polygon-shaped geometries as filled polygons. When False
         (default), polygon geometries are reduced to their centroids and
         rendered as points. SpatialData inputs only.
+    simplify : bool | float, default=False
+        Simplify polygon outlines, preserving topology. True uses a tolerance
+        of one output pixel, the longer side of the view over
+        `image_resolution`; a number sets the tolerance in coordinate-system
+        units. Polygons smaller than the tolerance are drawn as points at
+        their centroids. Only used with `polygon=True`.
+    render : {'vector', 'raster'}, default='vector'
+        How polygons are drawn. 'raster' fills them, coloured by `key`, into
+        an RGBA image of `image_resolution` pixels drawn over the tissue image,
+        with an invisible layer keeping the legend; polygon tooltips are not
+        shown. Only used with `polygon=True`.
+    bin_size : float | {'auto'} | None, default=None
+        Merge Visium HD bins into square bins of this size, in µm, a multiple
+        of the table's own bin size (e.g. 8 or 16 for a 2 µm table). 'auto'
+        picks a power of two times the table's bins from `image_resolution`,
+        about one merged bin per 4 output pixels. The merged size is given in
+        the plot caption. Needs the `array_row` and `array_col` obs columns and
+        point geometries.
+    bin_aggregate : {'sum', 'mean'}, default='sum'
+        How expression of the merged bins is combined. Numeric obs columns are
+        averaged, categorical ones take the most frequent category.
+    smooth_radius : float | None, default=None
+        Colour by the mean of numeric keys over the spots within this distance
+        of each spot (itself included), in plot coordinates. The neighbourhood
+        weights come from one `cKDTree` query and are cached for the
+        coordinates, so smoothing many keys costs about as much as one.
+        Spot geometries only.
+    smooth_k : int | None, default=None
+        Like `smooth_radius`, over each spot's `smooth_k` nearest spots
+        (itself included). Pass at most one of the two.
+    region : Sequence[float] | None, default=None
+        Window `(x0, y0, x1, y1)` to plot, in the target coordinate system
+        (image pixels for AnnData inputs). Only the spots, polygons and image
+        pixels inside it are read, and the view is limited to it unless
+        `crop` is given.
     crop : Sequence[int] | None, default=None
         Crop the plot to a region given as `(left, right, top, bottom)`.
     mapping : FeatureSpec | None, default=None
@@ -214,6 +306,21 @@ def spatial(
     If no tissue image metadata is present, the plot falls back to a plain
     spatial scatter using the raw coordinates.
 
+    Multiscale SpatialData images are read at the coarsest pyramid level that
+    meets `image_resolution`, stretched over the extent of the full-resolution
+    image, so loading time and plot size follow the figure rather than the
+    slide. With `region`, only the window is read: the image level is chosen
+    for and cut to the window, spots and polygons are looked up in the shapes
+    element's spatial index, and values are extracted for the observations
+    inside it alone.
+
+    Segmentation outlines can hold tens of vertices per cell. `simplify=True`
+    thins them to what one output pixel can show and draws cells smaller than
+    a pixel as points, which keeps the plot of a whole section small.
+    `render='raster'` goes further and fills the polygons into one image by
+    scanline filling, so drawing cost no longer grows with the number of
+    cells.
+
     Examples
     --------
     An example interactive spatial plot with a categorical key.
@@ -288,9 +395,10 @@ def spatial(
 
     _reject_sequence_key(key, singular="spatial", plural="spatials")
 
-    image_array, spot_coordinates, polygon_frame, data = _spatial_components(
+    image_array, image_extent, spot_coordinates, polygon_frame, table = _spatial_components(
         data,
         library_id=library_id,
+        library_key=library_key,
         image_key=image_key,
         image=image,
         spatial_key=spatial_key,
@@ -299,8 +407,206 @@ def spatial(
         shapes_name=shapes_name,
         coordinate_system=coordinate_system,
         polygon=polygon,
+        image_resolution=image_resolution,
+        region=region,
+        simplify=simplify,
+    )
+    if frame is not None and frame.height != table.n_obs:
+        frame = _narrow_frame(frame, data, table, table_name=table_name)
+
+    caption = None
+    if bin_size is not None:
+        if frame is not None:
+            msg = "`frame` rows are observations; they cannot be merged by `bin_size`"
+            raise ValueError(msg)
+        table, spot_coordinates, merged_size = _aggregate_bins(
+            table,
+            spot_coordinates,
+            bin_size=bin_size,
+            aggregate=bin_aggregate,
+            resolution=_IMAGE_RESOLUTION if image_resolution is None else image_resolution,
+        )
+        caption = f"{merged_size:g} µm bins"
+
+    points_layer = None
+    if points_name is not None:
+        points_layer = _points_layer(
+            data,
+            points_name=points_name,
+            genes=genes,
+            cmap=points_cmap,
+            table_name=table_name,
+            shapes_name=shapes_name,
+            image_name=image_name,
+            coordinate_system=coordinate_system,
+            image=image,
+            region=region,
+            image_resolution=image_resolution,
+        )
+
+    return _spatial(
+        table,
+        key,
+        frame=frame,
+        image_layer=_image_layer(
+            image_array,
+            image_extent,
+            greyscale=greyscale,
+            channels=image_channels,
+            percentiles=image_percentiles,
+            resolution=_IMAGE_RESOLUTION if image_resolution is None else image_resolution,
+            image_alpha=image_alpha,
+            cmap=cmap,
+            norm=norm,
+            vmin=vmin,
+            vmax=vmax,
+        ),
+        points_layer=points_layer,
+        caption=caption,
+        spot_coordinates=spot_coordinates,
+        polygon_frame=polygon_frame,
+        render=render,
+        smooth_radius=smooth_radius,
+        smooth_k=smooth_k,
+        image_resolution=image_resolution,
+        scale_axis=scale_axis,
+        region=region,
+        crop=crop,
+        mapping=mapping,
+        size=size,
+        alpha=alpha,
+        groups=groups,
+        drop=drop,
+        variable_keys=variable_keys,
+        add_keys=add_keys,
+        include_dimensions=include_dimensions,
+        tooltips=tooltips,
+        interactive=interactive,
+        observations_name=observations_name,
+        color_low=color_low,
+        color_mid=color_mid,
+        color_high=color_high,
+        midpoint=midpoint,
+        **point_kwargs,
     )
 
+
+def _image_layer(
+    image_array: NDArray | None,
+    image_extent: list[float] | None,
+    *,
+    greyscale: bool,
+    channels: int | Sequence[int] | None,
+    percentiles: Sequence[float] | None,
+    resolution: int,
+    image_alpha: float | None,
+    cmap: str | list | None,
+    norm: bool | None,
+    vmin: float | None,
+    vmax: float | None,
+) -> LayerSpec | None:
+    """
+    Encode the background image as a `geom_imshow` layer, or None without one.
+
+    The image is first brought to its display resolution by `_prepare_image`.
+    It is encoded once per layer, so `spatials` builds it once and adds the
+    same layer to every subplot.
+    """
+    if image_array is None:
+        return None
+    image_array, image_extent, stretched = _prepare_image(
+        image_array,
+        image_extent,
+        channels=channels,
+        greyscale=greyscale,
+        percentiles=percentiles,
+        vmin=vmin,
+        vmax=vmax,
+        resolution=resolution,
+    )
+    if stretched:
+        # already scaled to [0, 255]; keep lets-plot from rescaling it again
+        norm, vmin, vmax = True, 0, 255
+    return geom_imshow(
+        image_data=image_array,
+        extent=image_extent,
+        cmap=cmap,
+        norm=norm,
+        alpha=image_alpha,
+        vmin=vmin,
+        vmax=vmax,
+        show_legend=False,
+    )
+
+
+def _narrow_frame(
+    frame: DataFrame,
+    data: AnnData | SpatialData,
+    table: AnnData,
+    *,
+    table_name: str | None,
+) -> DataFrame:
+    """
+    Take the rows of the plotted observations `table` from a `frame` built for all of `data`.
+
+    The library and `region` selections subset the table after the caller
+    built `frame`; its rows are matched to the kept observations by position.
+    """
+    source = data if isinstance(data, AnnData) else _resolve_table(data, table_name)
+    if frame.height != source.n_obs or not source.obs_names.is_unique:
+        msg = (
+            f"`frame` has {frame.height} rows, but {table.n_obs} observations are plotted "
+            f"out of {source.n_obs}; pass a frame with one row per observation"
+        )
+        raise ValueError(msg)
+    return frame[source.obs_names.get_indexer(table.obs_names)]
+
+
+def _spatial(
+    data: AnnData,
+    key: str | None,
+    *,
+    frame: DataFrame | None,
+    image_layer: LayerSpec | None,
+    points_layer: FeatureSpec | None,
+    caption: str | None,
+    spot_coordinates: NDArray | None,
+    polygon_frame: DataFrame | None,
+    render: Literal["vector", "raster"],
+    smooth_radius: float | None,
+    smooth_k: int | None,
+    image_resolution: int | None,
+    scale_axis: Literal[0, 1] | None,
+    region: Sequence[float] | None,
+    crop: Sequence[int] | None,
+    mapping: FeatureSpec | None,
+    size: float | None,
+    alpha: float,
+    groups: Sequence[str] | str | None,
+    drop: Sequence[str] | str | None,
+    variable_keys: Sequence[str] | str | None,
+    add_keys: Sequence[str] | str | None,
+    include_dimensions: bool | int,
+    tooltips: Literal["none"] | Sequence[str] | FeatureSpec | None,
+    interactive: bool,
+    observations_name: str,
+    color_low: str,
+    color_mid: str | None,
+    color_high: str,
+    midpoint: Literal["mean", "median", "mid"] | float,
+    **point_kwargs,
+) -> PlotSpec:
+    """
+    Build a spatial plot from resolved spatial components.
+
+    `data` is the annotation table the components were resolved for; the
+    image and the points density arrive as ready `geom_imshow` layers (see
+    `_image_layer` and `_points_layer`).
+    """
+    if render not in ("vector", "raster"):
+        msg = f"`render` must be 'vector' or 'raster', got {render!r}"
+        raise ValueError(msg)
+
     # HANDLE: mapping
     mapping = mapping or aes()
 
@@ -354,6 +660,11 @@ def spatial(
             metadata_columns=metadata_columns,
         )
 
+    # Smooth the observations' values while the frame still lines up with the spots.
+    frame = _smooth_columns(
+        frame, [] if key is None else [key], spot_coordinates, radius=smooth_radius, k=smooth_k
+    )
+
     is_polygon = polygon_frame is not None
     if is_polygon:
         # Long-format vertices joined to the table on instance_key.
@@ -364,7 +675,11 @@ def spatial(
             )
             raise ValueError(msg)
         frame = polygon_frame.join(
-            frame, left_on="instance_id", right_on=instance_key, how="inner"
+            frame,
+            left_on="instance_id",
+            right_on=instance_key,
+            how="inner",
+            maintain_order="left",
         )
     else:
         frame = frame.with_columns(
@@ -419,38 +734,66 @@ def spatial(
         )
 
     # BUILD: plot
-    sptl = ggplot(data=frame)
-
-    if image_array is not None:
-        if greyscale and image_array.ndim == 3:
-            # Rec.709 luminance; slice the first 3 channels so RGBA inputs work too.
-            image_array = (image_array[..., :3] @ [0.2126, 0.7152, 0.0722]).astype(
-                image_array.dtype,
-            )
-        sptl += geom_imshow(
-            image_data=image_array,
-            cmap=cmap,
-            norm=norm,
-            alpha=image_alpha,
-            vmin=vmin,
-            vmax=vmax,
-            show_legend=False,
-        )
+    centroid_frame = None
+    outline_frame = frame
+    if is_polygon and "centroid" in frame.columns:
+        # Polygons that `simplify` reduced to their centroid are drawn as points.
+        centroid_frame = frame.filter(pl.col("centroid"))
+        outline_frame = frame.filter(~pl.col("centroid"))
+    # Rasterised outlines are drawn as an image, so the plot carries no vertices.
+    raster = is_polygon and render == "raster"
+    sptl = ggplot() if raster else ggplot(data=outline_frame)
+
+    if image_layer is not None:
+        sptl += image_layer
+    if points_layer is not None:
+        sptl += points_layer
 
     if "size" in mapping.as_dict():
         size = None
 
     if is_polygon:
-        sptl += geom_polygon(
-            mapping=aes(
-                x="polygon_x", y="polygon_y", group="instance_id", fill=key, **mapping.as_dict()
-            ),
-            size=size,
-            alpha=alpha,
-            tooltips=tooltips,
-            **point_kwargs,
-        )
-        if key is not None:
+        if raster:
+            outlines = _polygon_raster(
+                outline_frame,
+                key,
+                bounds=None if region is None else tuple(region),
+                resolution=_IMAGE_RESOLUTION if image_resolution is None else image_resolution,
+                alpha=alpha,
+                color_low=color_low,
+                color_mid=color_mid,
+                color_high=color_high,
+                midpoint=midpoint,
+            )
+            if outlines is not None:
+                sptl += outlines
+            geom_layer = outlines
+        else:
+            geom_layer = geom_polygon(
+                mapping=aes(
+                    x="polygon_x",
+                    y="polygon_y",
+                    group="instance_id",
+                    fill=key,
+                    **mapping.as_dict(),
+                ),
+                size=size,
+                alpha=alpha,
+                tooltips=tooltips,
+                **point_kwargs,
+            )
+            sptl += geom_layer
+        if centroid_frame is not None and centroid_frame.height:
+            sptl += geom_point(
+                data=centroid_frame,
+                mapping=aes(x="polygon_x", y="polygon_y", fill=key, **mapping.as_dict()),
+                shape=21,
+                stroke=0,
+                size=size,
+                alpha=alpha,
+                tooltips=tooltips,
+            )
+        if key is not None and not raster:
             if frame[key].dtype == pl.Categorical:
                 sptl += scale_fill_brewer(palette="Set2")
             elif frame[key].dtype.is_numeric():
@@ -462,13 +805,14 @@ def spatial(
                     midpoint=midpoint,
                 )
     else:
-        sptl += geom_point(
+        geom_layer = geom_point(
             mapping=aes(x="spatial_x", y="spatial_y", color=key, **mapping.as_dict()),
             size=size,
             alpha=alpha,
             tooltips=tooltips,
             **point_kwargs,
         )
+        sptl += geom_layer
         if key is not None:
             if frame[key].dtype == pl.Categorical:
                 sptl += scale_color_brewer(palette="Set2")
@@ -488,11 +832,16 @@ def spatial(
             raise ValueError(msg)
         left, right, top, bottom = crop
         coord = coord_fixed(xlim=[left, right], ylim=[top, bottom])
+    elif region is not None:
+        x0, y0, x1, y1 = region
+        coord = coord_fixed(xlim=[x0, x1], ylim=[y0, y1])
     else:
         coord = coord_fixed()
     sptl += scale_y_reverse() + coord + _THEME_SPATIAL
+    if caption is not None:
+        sptl += labs(caption=caption)
 
     if interactive:
         sptl += ggtb(size_zoomin=-1)
 
-    return sptl
+    return _register_plot(sptl, [image_layer, points_layer, geom_layer])
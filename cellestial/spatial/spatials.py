@@ -3,14 +3,22 @@ from __future__ import annotations
 from collections.abc import Sequence
 from typing import TYPE_CHECKING, Literal
 
+import numpy as np
 from anndata import AnnData
-from lets_plot import gggrid, ggtb
+from lets_plot import gggrid, ggtb, ggtitle
 from lets_plot.plot.core import FeatureSpec, LayerSpec
 from mudata import MuData
 
 from cellestial.frames import build_frame
-from cellestial.spatial.spatial import spatial
-from cellestial.spatial.utilities import _resolve_instance_key, _spatial_components
+from cellestial.spatial._bins import _aggregate_bins
+from cellestial.spatial._points import _points_layer
+from cellestial.spatial._smoothing import _smooth_columns
+from cellestial.spatial.spatial import _image_layer, _spatial
+from cellestial.spatial.utilities import (
+    _IMAGE_RESOLUTION,
+    _resolve_instance_key,
+    _spatial_components,
+)
 from cellestial.util import (
     _collect_aes_columns,
     _is_variable_key,
@@ -29,9 +37,14 @@ def spatials(
     keys: Sequence[str],
     *,
     library_id: str | None = None,
+    library_key: str | None = "library_id",
+    library_ids: Sequence[str] | Literal["all"] | None = None,
     image: bool = True,
     image_key: Literal["hires", "lowres"] | str = "lowres",
+    image_resolution: int | None = None,
     greyscale: bool = False,
+    image_channels: int | Sequence[int] | None = None,
+    image_percentiles: Sequence[float] | None = None,
     image_alpha: float | None = None,
     cmap: str | list | None = None,
     norm: bool | None = None,
@@ -43,7 +56,17 @@ def spatials(
     image_name: str | None = None,
     shapes_name: str | None = None,
     coordinate_system: str | None = None,
+    points_name: str | None = None,
+    genes: Sequence[str] | str | None = None,
+    points_cmap: str | list = "viridis",
     polygon: bool = False,
+    simplify: bool | float = False,
+    render: Literal["vector", "raster"] = "vector",
+    bin_size: float | Literal["auto"] | None = None,
+    bin_aggregate: Literal["sum", "mean"] = "sum",
+    smooth_radius: float | None = None,
+    smooth_k: int | None = None,
+    region: Sequence[float] | None = None,
     crop: Sequence[int] | None = None,
     mapping: FeatureSpec | None = None,
     size: float | None = 1.5,
@@ -92,14 +115,35 @@ def spatials(
         auto-selected; if multiple libraries are present, this must be provided.
         Leave as None when no library metadata is present (generic spatial data).
         Ignored for SpatialData inputs.
+    library_key : str | None, default='library_id'
+        The obs column naming the library of each observation. When present,
+        each panel plots only the observations of its library. AnnData inputs
+        only.
+    library_ids : Sequence[str] | {'all'} | None, default=None
+        Plot one panel per library for each key, each over its own image,
+        instead of a single library. 'all' selects every library. The frame is
+        built once for the observations of all of them. AnnData inputs only.
     image : bool, default=True
         Whether to render the tissue image as a background layer.
     image_key : str, default='lowres'
         Which image variant to render. Visium ships with 'hires' and 'lowres'.
         Falls back to 'hires', then to any available variant, when the requested
         one is missing. Ignored for SpatialData inputs.
+    image_resolution : int | None, default=None
+        Target size, in pixels, of the longer side of the drawn image. For
+        multiscale SpatialData images the coarsest pyramid level at least this
+        large is loaded; any image is then block-averaged by the largest integer
+        factor that keeps it at least this large. If None, a size fit for the
+        default figure size (1200 px) is used.
     greyscale : bool, default=False
         Whether to convert an RGB(A) image to greyscale (Rec.709 luminance).
+    image_channels : int | Sequence[int] | None, default=None
+        Channels of the image to draw: one index for a single channel, drawn as
+        a greyscale image, or 3 (RGB) or 4 (RGBA) indices. If None, all of them.
+    image_percentiles : Sequence[float] | None, default=None
+        Stretch the image contrast linearly between these two percentiles of its
+        values, e.g. `(1, 99)`. `vmin` and `vmax`, when given, replace the
+        corresponding percentile. Applies to RGB(A) images too.
     image_alpha : float | None, default=None
         Alpha (transparency) of the tissue image.
         Distinct from `alpha`, which controls spot transparency.
@@ -136,10 +180,56 @@ def spatials(
         system before plotting. If None, the single available system is used,
         falling back to 'global' when multiple are defined. SpatialData
         inputs only.
+    points_name : str | None, default=None
+        Name of a points element (e.g. Xenium or MERSCOPE transcripts) to draw
+        as a density image over the tissue image: points are counted per
+        output pixel (`image_resolution` along the longer side) over `region`,
+        or over the element's bounds. The element is read a partition at a
+        time, so transcripts are never all in memory. SpatialData inputs only.
+    genes : Sequence[str] | str | None, default=None
+        Count only the points of these genes (values of the element's feature
+        key). If None, all points are counted.
+    points_cmap : str | list, default='viridis'
+        Colormap name or list of colors of the points density.
     polygon : bool, default=False
         Render polygon-shaped geometries as filled polygons. When False
         (default), polygon geometries are reduced to their centroids and
         rendered as points. SpatialData inputs only.
+    simplify : bool | float, default=False
+        Simplify polygon outlines, preserving topology. True uses a tolerance
+        of one output pixel, the longer side of the view over
+        `image_resolution`; a number sets the tolerance in coordinate-system
+        units. Polygons smaller than the tolerance are drawn as points at
+        their centroids. Only used with `polygon=True`.
+    render : {'vector', 'raster'}, default='vector'
+        How polygons are drawn. 'raster' fills them, coloured by `key`, into
+        an RGBA image of `image_resolution` pixels drawn over the tissue image,
+        with an invisible layer keeping the legend; polygon tooltips are not
+        shown. Only used with `polygon=True`.
+    bin_size : float | {'auto'} | None, default=None
+        Merge Visium HD bins into square bins of this size, in µm, a multiple
+        of the table's own bin size (e.g. 8 or 16 for a 2 µm table). 'auto'
+        picks a power of two times the table's bins from `image_resolution`,
+        about one merged bin per 4 output pixels. The merged size is given in
+        the plot caption. Needs the `array_row` and `array_col` obs columns and
+        point geometries.
+    bin_aggregate : {'sum', 'mean'}, default='sum'
+        How expression of the merged bins is combined. Numeric obs columns are
+        averaged, categorical ones take the most frequent category.
+    smooth_radius : float | None, default=None
+        Colour by the mean of numeric keys over the spots within this distance
+        of each spot (itself included), in plot coordinates. The neighbourhood
+        weights come from one `cKDTree` query and are cached for the
+        coordinates, so smoothing many keys costs about as much as one.
+        Spot geometries only.
+    smooth_k : int | None, default=None
+        Like `smooth_radius`, over each spot's `smooth_k` nearest spots
+        (itself included). Pass at most one of the two.
+    region : Sequence[float] | None, default=None
+        Window `(x0, y0, x1, y1)` to plot, in the target coordinate system
+        (image pixels for AnnData inputs). Only the spots, polygons and image
+        pixels inside it are read, and the view is limited to it unless
+        `crop` is given.
     crop : Sequence[int] | None, default=None
         Crop the plot to a region given as `(left, right, top, bottom)`.
     mapping : FeatureSpec | None, default=None
@@ -201,7 +291,8 @@ def spatials(
     Returns
     -------
     SupPlotsSpec
-        Grid of spatial plots, one per key.
+        Grid of spatial plots, one per key (per library and key with
+        `library_ids`, one row per key).
 
     Notes
     -----
@@ -255,24 +346,99 @@ def spatials(
         )
         raise UnsupportedDataTypeError(msg)
 
-    # Resolve the annotation table once (mirrors `spatial`); SpatialData needs extraction
-    # for the variable-key check below, while `build_frame` accepts either type.
-    if isinstance(data, AnnData):
-        table = data
+    # Resolve the spatial components once per library: the shapes transform,
+    # the polygon vertex frame and the encoded image are shared by its subplots.
+    if library_ids is None:
+        libraries = [library_id]
+    elif not isinstance(data, AnnData):
+        msg = "`library_ids` needs an AnnData object with Visium library metadata"
+        raise TypeError(msg)
     else:
-        _, _, _, table = _spatial_components(
+        spatial_uns = data.uns.get("spatial", {})
+        libraries = list(spatial_uns) if library_ids == "all" else list(library_ids)
+        if not libraries:
+            msg = "`library_ids` selects no spatial library"
+            raise ValueError(msg)
+
+    if bin_size is not None and len(libraries) > 1:
+        msg = "`bin_size` merges the bins of one library; it cannot be used with `library_ids`"
+        raise ValueError(msg)
+
+    caption = None
+    panels = []
+    for library in libraries:
+        image_array, image_extent, spot_coordinates, polygon_frame, panel_table = (
+            _spatial_components(
+                data,
+                library_id=library,
+                library_key=library_key,
+                image_key=image_key,
+                image=image,
+                spatial_key=spatial_key,
+                table_name=table_name,
+                image_name=image_name,
+                shapes_name=shapes_name,
+                coordinate_system=coordinate_system,
+                polygon=polygon,
+                image_resolution=image_resolution,
+                region=region,
+                simplify=simplify,
+            )
+        )
+        image_layer = _image_layer(
+            image_array,
+            image_extent,
+            greyscale=greyscale,
+            channels=image_channels,
+            percentiles=image_percentiles,
+            resolution=_IMAGE_RESOLUTION if image_resolution is None else image_resolution,
+            image_alpha=image_alpha,
+            cmap=cmap,
+            norm=norm,
+            vmin=vmin,
+            vmax=vmax,
+        )
+        if bin_size is not None:
+            panel_table, spot_coordinates, merged_size = _aggregate_bins(
+                panel_table,
+                spot_coordinates,
+                bin_size=bin_size,
+                aggregate=bin_aggregate,
+                resolution=_IMAGE_RESOLUTION if image_resolution is None else image_resolution,
+            )
+            caption = f"{merged_size:g} µm bins"
+        panels.append((library, image_layer, spot_coordinates, polygon_frame, panel_table))
+
+    points_layer = None
+    if points_name is not None:
+        points_layer = _points_layer(
             data,
-            library_id=library_id,
-            image_key=image_key,
-            image=image,
-            spatial_key=spatial_key,
+            points_name=points_name,
+            genes=genes,
+            cmap=points_cmap,
             table_name=table_name,
-            image_name=image_name,
             shapes_name=shapes_name,
+            image_name=image_name,
             coordinate_system=coordinate_system,
-            polygon=polygon,
+            image=image,
+            region=region,
+            image_resolution=image_resolution,
         )
 
+    # Per-library panels share one frame, built for all their observations at
+    # once; each panel takes its rows from it by position.
+    if len(panels) == 1:
+        table = panels[0][-1]
+        positions = [None]
+    else:
+        if not data.obs_names.is_unique:
+            msg = "library panels need unique obs names; call `data.obs_names_make_unique()`"
+            raise ValueError(msg)
+        rows = [data.obs_names.get_indexer(panel[-1].obs_names) for panel in panels]
+        union = np.unique(np.concatenate(rows))
+        table = data[union]
+        positions = [np.searchsorted(union, panel_rows) for panel_rows in rows]
+
     # BUILD: one shared frame for all keys, instead of rebuilding per key.
     # spatial is always observations-axis; only gene keys are pulled from X.
     if variable_keys is None:
@@ -318,28 +484,42 @@ def spatials(
         metadata_columns=metadata_columns,
     )
 
+    if library_ids is not None and ncol is None:
+        ncol = len(panels)
+    # Smooth every numeric key of a panel in one product, before the per-key plots.
+    panel_frames = [
+        _smooth_columns(
+            frame if position is None else frame[position],
+            keys,
+            panel[2],
+            radius=smooth_radius,
+            k=smooth_k,
+        )
+        for panel, position in zip(panels, positions, strict=True)
+    ]
+    panel_keys = [
+        (key, panel, panel_frame)
+        for key in keys
+        for panel, panel_frame in zip(panels, panel_frames, strict=True)
+    ]
     plots = []
-    for i, key in enumerate(keys):
-        plot = spatial(
-            data=data,
-            key=key,
-            frame=frame,
-            library_id=library_id,
-            image=image,
-            image_key=image_key,
-            greyscale=greyscale,
-            image_alpha=image_alpha,
-            cmap=cmap,
-            norm=norm,
-            vmin=vmin,
-            vmax=vmax,
+    for i, (key, panel, panel_frame) in enumerate(panel_keys):
+        library, image_layer, spot_coordinates, polygon_frame, panel_table = panel
+        plot = _spatial(
+            panel_table,
+            key,
+            frame=panel_frame,
+            image_layer=image_layer,
+            points_layer=points_layer,
+            caption=caption,
+            spot_coordinates=spot_coordinates,
+            polygon_frame=polygon_frame,
+            render=render,
+            smooth_radius=None,
+            smooth_k=None,
+            image_resolution=image_resolution,
             scale_axis=scale_axis,
-            spatial_key=spatial_key,
-            table_name=table_name,
-            image_name=image_name,
-            shapes_name=shapes_name,
-            coordinate_system=coordinate_system,
-            polygon=polygon,
+            region=region,
             crop=crop,
             mapping=mapping,
             size=size,
@@ -350,6 +530,7 @@ def spatials(
             add_keys=add_keys,
             include_dimensions=include_dimensions,
             tooltips=tooltips,
+            interactive=False,
             observations_name=observations_name,
             color_low=color_low,
             color_mid=color_mid,
@@ -357,6 +538,8 @@ def spatials(
             midpoint=midpoint,
             **point_kwargs,
         )
+        if library_ids is not None:
+            plot += ggtitle(str(library))
 
         if layers is not None:
             if isinstance(layers, (FeatureSpec, LayerSpec)):
@@ -364,7 +547,7 @@ def spatials(
             for layer in layers:
                 plot += layer
         if share_labels:
-            plot = _share_labels(plot, i, keys, ncol)
+            plot = _share_labels(plot, i, panel_keys, ncol)
 
         plots.append(plot)
 
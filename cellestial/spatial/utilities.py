@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-import warnings
 from typing import TYPE_CHECKING
 
 import numpy as np
@@ -11,8 +10,15 @@ from cellestial.util import _warn
 from cellestial.util.errors import _unsupported_data_type
 
 if TYPE_CHECKING:
+    from collections.abc import Sequence
+
     from numpy.typing import NDArray
     from spatialdata import SpatialData
+    from xarray import DataArray
+
+# Longer side, in pixels, of the pyramid level loaded when no `image_resolution`
+# is given: the default 600 px wide figure at twice the pixel density.
+_IMAGE_RESOLUTION = 1200
 
 
 def _select_one(name: str | None, available: list[str], kind: str) -> str:
@@ -162,11 +168,140 @@ def _resolve_table(data: SpatialData, table_name: str | None) -> AnnData:
     return data.tables[name]
 
 
+def _target_coordinate_system(
+    data: SpatialData,
+    *,
+    table_name: str | None,
+    shapes_name: str | None,
+    image_name: str | None,
+    coordinate_system: str | None,
+    image: bool,
+) -> str:
+    """The coordinate system `_spatialdata_components` resolves for the same arguments."""
+    table = _resolve_table(data, table_name)
+    return _resolve_coordinate_system(
+        data,
+        coordinate_system,
+        shapes_name=_resolve_shapes_name(data, shapes_name, table),
+        image_name=image_name,
+        want_image=image,
+    )
+
+
+def _validate_region(region) -> tuple[float, float, float, float] | None:
+    """Check `region` is an `(x0, y0, x1, y1)` window with `x0 < x1` and `y0 < y1`."""
+    if region is None:
+        return None
+    if len(region) != 4:
+        msg = "region must be a sequence of 4 numbers (x0, y0, x1, y1)"
+        raise ValueError(msg)
+    x0, y0, x1, y1 = (float(value) for value in region)
+    if not (x0 < x1 and y0 < y1):
+        msg = f"region must satisfy x0 < x1 and y0 < y1, got {tuple(region)}"
+        raise ValueError(msg)
+    return x0, y0, x1, y1
+
+
+def _affine_matrix(element, coordinate_system: str) -> NDArray:
+    """The 3x3 affine matrix mapping `element`'s `(x, y)` into `coordinate_system`."""
+    from spatialdata.transformations import get_transformation
+
+    axes = ("x", "y")
+    return get_transformation(element, to_coordinate_system=coordinate_system).to_affine_matrix(
+        input_axes=axes, output_axes=axes
+    )
+
+
+def _apply_affine(xy: NDArray, matrix: NDArray) -> NDArray:
+    """Map `(n, 2)` coordinates through a 3x3 affine matrix in one matmul."""
+    if np.array_equal(matrix, np.eye(3)):
+        return xy
+    return xy @ matrix[:2, :2].T + matrix[:2, 2]
+
+
+def _axis_aligned(matrix: NDArray) -> bool:
+    """Whether an affine matrix only scales (by positive factors) and translates."""
+    return matrix[0, 1] == 0 and matrix[1, 0] == 0 and matrix[0, 0] > 0 and matrix[1, 1] > 0
+
+
+def _image_levels(elem) -> list[DataArray]:
+    """The levels of an image element, finest first; a `DataArray` is its only level."""
+    from xarray import DataArray
+
+    if isinstance(elem, DataArray):
+        return [elem]
+    levels = [next(iter(elem[name].data_vars.values())) for name in elem.children]
+    levels.sort(key=lambda level: level.sizes["y"] * level.sizes["x"], reverse=True)
+    return levels
+
+
+def _pixel_window(
+    matrix: NDArray, *, width: int, height: int, region: tuple[float, ...] | None
+) -> tuple[int, int, int, int]:
+    """
+    Pixel bounds `(left, right, top, bottom)` of an image covering `region`.
+
+    `matrix` maps the image's `(x, y)` pixel coordinates to the coordinates
+    `region` is given in. The bounds are clipped to the image and may be empty.
+    """
+    if region is None:
+        return 0, width, 0, height
+    x0, y0, x1, y1 = region
+    corners = np.linalg.inv(matrix) @ np.array([[x0, x1, x0, x1], [y0, y0, y1, y1], [1, 1, 1, 1]])
+    left, top = np.clip(np.floor(corners[:2].min(axis=1)), 0, [width, height]).astype(int)
+    right, bottom = np.clip(np.ceil(corners[:2].max(axis=1)), 0, [width, height]).astype(int)
+    return int(left), int(right), int(top), int(bottom)
+
+
+def _image_level(
+    elem,
+    *,
+    resolution: int,
+    coordinate_system: str,
+    region: tuple[float, ...] | None = None,
+) -> tuple[DataArray, list[float] | None]:
+    """
+    Pick the level of an image element to load, and the extent it covers.
+
+    A multiscale `DataTree` yields its coarsest level whose window (the part
+    covering `region`, or all of it) is at least `resolution` pixels along its
+    longer side, or its finest level when none is. The affine transformation
+    of the level to `coordinate_system` is folded into the extent, which is
+    None when the finest level is drawn whole at its own pixel size. The window
+    is sliced lazily, before any pixel is loaded.
+    """
+    levels = _image_levels(elem)
+    finest = levels[0]
+
+    windows = []
+    for level in levels:
+        matrix = _affine_matrix(level, coordinate_system)
+        window = _pixel_window(
+            matrix, width=level.sizes["x"], height=level.sizes["y"], region=region
+        )
+        windows.append((level, matrix, window))
+    large_enough = [
+        entry
+        for entry in windows
+        if max(entry[2][1] - entry[2][0], entry[2][3] - entry[2][2]) >= resolution
+    ]
+    chosen, matrix, (left, right, top, bottom) = large_enough[-1] if large_enough else windows[0]
+    if chosen is finest and region is None and np.array_equal(matrix, np.eye(3)):
+        return finest, None
+
+    chosen = chosen.isel(x=slice(left, right), y=slice(top, bottom))
+    corners = matrix @ np.array([[left, right], [top, bottom], [1, 1]])
+    # geom_imshow centres pixels on integers; keep the finest level's half-pixel offset.
+    (x_left, x_right), (y_top, y_bottom) = corners[:2] - 0.5
+    return chosen, [float(x_left), float(x_right), float(y_top), float(y_bottom)]
+
+
 def _image_to_yxc(elem) -> NDArray:
     """
     Convert a SpatialData image element to a (y, x[, c]) NumPy array.
 
-    Accepts either an `xarray.DataArray` or a multiscale `DataTree`.
+    Accepts either an `xarray.DataArray` or a multiscale `DataTree`, whose
+    first (full-resolution) level is loaded.
     """
     from xarray import DataArray
 
@@ -188,27 +323,63 @@ def _image_to_yxc(elem) -> NDArray:
     return array
 
 
-def _polygon_vertex_frame(shapes_geo) -> pl.DataFrame:
+def _simplify_tolerance(
+    *,
+    simplify: bool | float,
+    bounds: tuple[float, float, float, float],
+    resolution: int,
+) -> float | None:
+    """
+    Polygon simplification tolerance for `simplify`, in coordinate-system units.
+
+    `True` uses one output pixel: the longer side of `bounds`, the
+    `(x0, y0, x1, y1)` area on view, divided by `resolution`.
+    """
+    if simplify is False or simplify is None:
+        return None
+    if simplify is True:
+        x0, y0, x1, y1 = bounds
+        return max(x1 - x0, y1 - y0) / resolution
+    if not simplify > 0:
+        msg = f"`simplify` must be a bool or a positive tolerance, got {simplify!r}"
+        raise ValueError(msg)
+    return float(simplify)
+
+
+def _polygon_vertex_frame(shapes_geo, *, tolerance: float | None = None) -> pl.DataFrame:
     """
     Long-format vertex frame for `geom_polygon`.
 
-    Columns: `instance_id`, `polygon_x`, `polygon_y`.
+    Columns: `instance_id`, `polygon_x`, `polygon_y`. With a `tolerance`,
+    outlines are simplified to it (preserving topology), and polygons that fit
+    within it are reduced to one row at their centroid, flagged in an extra
+    boolean `centroid` column.
     """
     import shapely
 
-    geoms = shapes_geo.geometry.values
-    coords = shapely.get_coordinates(geoms)
-    per_geom_counts = np.fromiter(
-        (shapely.count_coordinates(g) for g in geoms),
-        dtype=np.int64,
-        count=len(geoms),
-    )
-    instance_ids = np.repeat(np.asarray(shapes_geo.index), per_geom_counts)
+    geoms = np.asarray(shapes_geo.geometry.values)
+    instance_ids = np.asarray(shapes_geo.index)
+    if tolerance is None:
+        coords, index = shapely.get_coordinates(geoms, return_index=True)
+        return pl.DataFrame(
+            {
+                "instance_id": instance_ids[index],
+                "polygon_x": coords[:, 0],
+                "polygon_y": coords[:, 1],
+            }
+        )
+
+    bounds = shapely.bounds(geoms)
+    small = np.maximum(bounds[:, 2] - bounds[:, 0], bounds[:, 3] - bounds[:, 1]) < tolerance
+    outlines = shapely.simplify(geoms[~small], tolerance, preserve_topology=True)
+    coords, index = shapely.get_coordinates(outlines, return_index=True)
+    centroids = shapely.get_coordinates(shapely.centroid(geoms[small]))
     return pl.DataFrame(
         {
-            "instance_id": instance_ids,
-            "polygon_x": coords[:, 0],
-            "polygon_y": coords[:, 1],
+            "instance_id": np.concatenate([instance_ids[~small][index], instance_ids[small]]),
+            "polygon_x": np.concatenate([coords[:, 0], centroids[:, 0]]),
+            "polygon_y": np.concatenate([coords[:, 1], centroids[:, 1]]),
+            "centroid": np.repeat([False, True], [len(coords), len(centroids)]),
         }
     )
 
@@ -222,7 +393,10 @@ def _spatialdata_components(
     coordinate_system: str | None,
     image: bool,
     polygon: bool = False,
-) -> tuple[NDArray | None, NDArray | None, pl.DataFrame | None, AnnData]:
+    image_resolution: int | None = None,
+    region: tuple[float, ...] | None = None,
+    simplify: bool | float = False,
+) -> tuple[NDArray | None, list[float] | None, NDArray | None, pl.DataFrame | None, AnnData]:
     """
     Resolve image, geometry, and the annotation table.
 
@@ -232,14 +406,19 @@ def _spatialdata_components(
         The chosen image transformed into the target coordinate system,
         in `(y, x[, c])` order, or None when `image=False` or no image
         element exists.
+    image_extent : list[float] | None
+        The `geom_imshow` extent of `image_array` when a coarser pyramid
+        level was loaded, None when it is drawn at its own pixel size.
     spot_coordinates : NDArray | None
         Shape `(n, 2)` array of `(x, y)` per spot. None when polygon
         rendering is requested.
     polygon_frame : polars.DataFrame | None
         Long-format vertex frame, populated only when `polygon=True` and
-        the chosen shapes element holds Polygons.
+        the chosen shapes element holds Polygons. Simplified outlines carry
+        a `centroid` column flagging polygons reduced to their centroid.
     table : AnnData
-        The chosen annotation table.
+        The chosen annotation table, a view of the observations inside
+        `region` when one is given.
 
     Notes
     -----
@@ -247,7 +426,28 @@ def _spatialdata_components(
     a long-format vertex frame for `geom_polygon`. `polygon=False`
     (the default) reduces them to centroids and returns point coordinates
     instead.
+
+    Each element's transformation to the target system is resolved to a 3x3
+    affine matrix once. Shape coordinates go through it in one matmul, and an
+    axis-aligned image (scaled and translated) is placed by folding it into
+    the `geom_imshow` extent, without resampling. Only rotated or sheared
+    images are resampled into the system, lazily.
+
+    Of a multiscale image, only the coarsest level whose longer side is at
+    least `image_resolution` pixels (`_IMAGE_RESOLUTION` when None) is
+    loaded.
+
+    A `region` window is mapped back into the intrinsic coordinates of the
+    shapes element and looked up in its spatial index, which geopandas builds
+    once per element, so only the geometries inside it are placed. Only
+    the matching window of the image level is sliced and loaded.
+
+    `simplify` thins polygon outlines with a tolerance of one output pixel
+    (`True`: the longer side of `region`, or of the shapes' bounds, over
+    `image_resolution`) or the given tolerance.
     """
+    import geopandas as gpd
+    import shapely
     from spatialdata import SpatialData
 
     if not isinstance(data, SpatialData):
@@ -267,30 +467,43 @@ def _spatialdata_components(
         _resolve_image_name(data, image_name, coordinate_system=target_cs) if image else None
     )
 
-    # spatialdata's transform mutates the underlying GeoDataFrame via chained
-    # assignment, which trips a geopandas FutureWarning we don't control.
-    with warnings.catch_warnings():
-        warnings.filterwarnings(
-            "ignore",
-            message=r".*ChainedAssignmentError.*",
-            category=FutureWarning,
-            module=r"geopandas\..*",
+    # Shapes are placed with one affine matmul on their coordinates, instead of
+    # a transformed copy of the whole GeoDataFrame.
+    shapes_element = data.shapes[chosen_shapes_name]
+    matrix = _affine_matrix(shapes_element, target_cs)
+    selected = None
+    if region is not None:
+        x0, y0, x1, y1 = region
+        corners = np.linalg.inv(matrix) @ np.array(
+            [[x0, x1, x1, x0], [y0, y0, y1, y1], [1, 1, 1, 1]]
         )
-        shapes_geo = data.transform_element_to_coordinate_system(chosen_shapes_name, target_cs)
+        window = shapely.Polygon(corners[:2].T)
+        selected = np.sort(shapes_element.sindex.query(window, predicate="intersects"))
+        shapes_element = shapes_element.iloc[selected]
 
-    geom_types = set(shapes_geo.geometry.geom_type.unique())
+    geoms = np.asarray(shapes_element.geometry.values)
+    geom_types = set(shapes_element.geometry.geom_type.unique())
     spot_coordinates: NDArray | None = None
     polygon_frame: pl.DataFrame | None = None
     if geom_types.issubset({"Point"}):
-        spot_coordinates = np.column_stack(
-            [shapes_geo.geometry.x.to_numpy(), shapes_geo.geometry.y.to_numpy()]
-        )
+        spot_coordinates = _apply_affine(shapely.get_coordinates(geoms), matrix)
     elif geom_types.issubset({"Polygon"}):
         if polygon:
-            polygon_frame = _polygon_vertex_frame(shapes_geo)
+            outlines = gpd.GeoSeries(
+                shapely.transform(geoms, lambda xy: _apply_affine(xy, matrix)),
+                index=shapes_element.index,
+            )
+            tolerance = _simplify_tolerance(
+                simplify=simplify,
+                bounds=region if region is not None else tuple(outlines.total_bounds),
+                resolution=_IMAGE_RESOLUTION if image_resolution is None else image_resolution,
+            )
+            polygon_frame = _polygon_vertex_frame(outlines, tolerance=tolerance)
         else:
-            centroids = shapes_geo.geometry.centroid
-            spot_coordinates = np.column_stack([centroids.x.to_numpy(), centroids.y.to_numpy()])
+            # an affine map carries centroids to centroids
+            spot_coordinates = _apply_affine(
+                shapely.get_coordinates(shapely.centroid(geoms)), matrix
+            )
     else:
         msg = (
             f"Shapes element `{chosen_shapes_name}` contains "
@@ -298,12 +511,74 @@ def _spatialdata_components(
         )
         raise NotImplementedError(msg)
 
+    if selected is not None:
+        # Point coordinates line up with the table by position; polygons are
+        # joined back to it on the instance key, or by position when the
+        # table is indexed like the shapes.
+        instance_key = _resolve_instance_key(table)
+        shapes_index = data.shapes[chosen_shapes_name].index
+        if polygon_frame is None:
+            table = table[selected]
+        elif instance_key is not None:
+            table = table[np.isin(table.obs[instance_key].to_numpy(), shapes_element.index)]
+        elif table.obs_names.equals(shapes_index.astype(str)):
+            table = table[selected]
+        else:
+            _warn(
+                f"table has no `instance_key` and is not indexed like shapes "
+                f"`{chosen_shapes_name}`; `region` is not applied to the table"
+            )
+
     image_array = None
+    image_extent = None
     if image and chosen_image_name is not None:
-        image_elem = data.transform_element_to_coordinate_system(chosen_image_name, target_cs)
-        image_array = _image_to_yxc(image_elem)
+        image_elem = data.images[chosen_image_name]
+        if not _axis_aligned(_affine_matrix(_image_levels(image_elem)[0], target_cs)):
+            # Rotated or sheared images cannot be placed by an extent; resample them.
+            image_elem = data.transform_element_to_coordinate_system(chosen_image_name, target_cs)
+        level, image_extent = _image_level(
+            image_elem,
+            resolution=_IMAGE_RESOLUTION if image_resolution is None else image_resolution,
+            coordinate_system=target_cs,
+            region=region,
+        )
+        if level.sizes["x"] and level.sizes["y"]:
+            image_array = _image_to_yxc(level)
+        else:
+            image_extent = None
+
+    return image_array, image_extent, spot_coordinates, polygon_frame, table
+
 
-    return image_array, spot_coordinates, polygon_frame, table
+def _anndata_window(
+    image_array: NDArray | None,
+    spot_coordinates: NDArray,
+    data: AnnData,
+    *,
+    region: tuple[float, ...] | None,
+) -> tuple[NDArray | None, list[float] | None, NDArray, None, AnnData]:
+    """Cut AnnData spatial components to `region`, given in image pixels."""
+    if region is None:
+        return image_array, None, spot_coordinates, None, data
+    spot_coordinates = np.asarray(spot_coordinates)
+    x0, y0, x1, y1 = region
+    inside = np.flatnonzero(
+        (spot_coordinates[:, 0] >= x0)
+        & (spot_coordinates[:, 0] <= x1)
+        & (spot_coordinates[:, 1] >= y0)
+        & (spot_coordinates[:, 1] <= y1)
+    )
+    image_extent = None
+    if image_array is not None:
+        left, right, top, bottom = _pixel_window(
+            np.eye(3), width=image_array.shape[1], height=image_array.shape[0], region=region
+        )
+        if right > left and bottom > top:
+            image_array = image_array[top:bottom, left:right]
+            image_extent = [left - 0.5, right - 0.5, top - 0.5, bottom - 0.5]
+        else:
+            image_array = None
+    return image_array, image_extent, spot_coordinates[inside], None, data[inside]
 
 
 def _spatial_components(
@@ -318,16 +593,27 @@ def _spatial_components(
     shapes_name: str | None = None,
     coordinate_system: str | None = None,
     polygon: bool = False,
-) -> tuple[NDArray | None, NDArray | None, pl.DataFrame | None, AnnData]:
+    image_resolution: int | None = None,
+    region: Sequence[float] | None = None,
+    simplify: bool | float = False,
+    library_key: str | None = "library_id",
+) -> tuple[NDArray | None, list[float] | None, NDArray | None, pl.DataFrame | None, AnnData]:
     """
     Extract image, geometry, and the annotation table.
 
-    Returns `(image, point_coords, polygon_frame, table)`. Exactly one of
-    `point_coords` and `polygon_frame` is non-None. For AnnData input
-    the table is the input itself; for SpatialData it is the resolved table.
+    Returns `(image, image_extent, point_coords, polygon_frame, table)`.
+    Exactly one of `point_coords` and `polygon_frame` is non-None, and
+    `image_extent` is only set when the image is not drawn whole at its own
+    pixel size (a coarser pyramid level, or a `region` window). For AnnData
+    input the table is the input itself; for SpatialData it is the resolved
+    table. With a `region`, the table is a view of the observations inside it
+    and the image is cut to the window. For Visium AnnData input holding a
+    `library_key` obs column, the table is a view of the chosen library's
+    observations.
     """
     from spatialdata import SpatialData
 
+    region = _validate_region(region)
     if isinstance(data, SpatialData):
         return _spatialdata_components(
             data,
@@ -337,6 +623,9 @@ def _spatial_components(
             coordinate_system=coordinate_system,
             image=image,
             polygon=polygon,
+            image_resolution=image_resolution,
+            region=region,
+            simplify=simplify,
         )
 
     if isinstance(data, AnnData):
@@ -354,7 +643,7 @@ def _spatial_components(
                     "library metadata is present"
                 )
                 raise KeyError(msg)
-            return None, data.obsm[spatial_key], None, data
+            return _anndata_window(None, data.obsm[spatial_key], data, region=region)
 
         # Visium mode.
         if library_id is None:
@@ -395,13 +684,23 @@ def _spatial_components(
             if image:
                 _warn(f"Scale factor `{scalef_key}` missing; spots may not align with the image.")
             scale_factor = 1.0
-        spot_coordinates = data.obsm[spatial_key] * scale_factor
+        spot_coordinates = data.obsm[spatial_key]
+
+        # Concatenated objects hold several libraries; keep only the chosen
+        # library's observations, before any frame is built from them.
+        if library_key is not None and library_key in data.obs.columns:
+            in_library = np.asarray(data.obs[library_key]) == library_id
+            if not in_library.all():
+                observations = np.flatnonzero(in_library)
+                spot_coordinates = np.asarray(spot_coordinates)[observations]
+                data = data[observations]
+        spot_coordinates = spot_coordinates * scale_factor
 
         image_array = None
         if image:
             image_array = images.get(resolved_image_key)
             if image_array is None:
                 _warn(f"no images found for library `{library_id}`")
-        return image_array, spot_coordinates, None, data
+        return _anndata_window(image_array, spot_coordinates, data, region=region)
 
     raise _unsupported_data_type(data, AnnData, SpatialData)
@@ -1,6 +1,8 @@
 from cellestial.util.dendrogram import (  # noqa: F401
+    _cluster_keys,
     _get_dendrogram,
     _get_dendrogram_path_frame,
+    _get_key_dendrogram_path_frame,
 )
 from cellestial.util.markers import marker_genes, marker_genes_dict
 from cellestial.util.operations import get_figure, get_figures, get_mapping, layout, retrieve
@@ -1,11 +1,185 @@
 from __future__ import annotations
 
+from collections import OrderedDict
+from hashlib import blake2b
+from typing import Literal
+
 import numpy as np
+import pandas as pd
 import polars as pl
 from anndata import AnnData
+from scipy import sparse
+from scipy.cluster.hierarchy import dendrogram, linkage
+from scipy.spatial.distance import squareform
 
 from cellestial.util.errors import KeyNotFoundError
 
+# Key (variable) linkages are cached by (keys, group_by, aggregation) plus a
+# digest of the profiles they were computed from, so a stale entry never matches.
+_KEY_LINKAGE_CACHE: OrderedDict[tuple, np.ndarray] = OrderedDict()
+_KEY_LINKAGE_CACHE_SIZE = 32
+
+
+def _group_means(matrix, codes: np.ndarray, n_groups: int) -> np.ndarray:
+    """Mean of the rows of `matrix` per group code, in one sparse product."""
+    observed = codes >= 0
+    counts = np.bincount(codes[observed], minlength=n_groups).astype(np.float64)
+    indicator = sparse.csr_matrix(
+        (
+            1.0 / counts[codes[observed]],
+            (codes[observed], np.flatnonzero(observed)),
+        ),
+        shape=(n_groups, len(codes)),
+    )
+    means = indicator @ matrix
+    if sparse.issparse(means):
+        means = means.toarray()
+    return np.asarray(means, dtype=np.float64)
+
+
+def _compute_dendrogram(
+    data: AnnData,
+    group_by: str,
+    *,
+    representation: str | None = None,
+    linkage_method: Literal[
+        "single", "complete", "average", "weighted", "centroid", "median", "ward"
+    ] = "complete",
+    optimal_ordering: bool = False,
+) -> dict:
+    """
+    Cluster the groups of `group_by` on their mean profile.
+
+    Group means are taken over `representation` (an `obsm` key, or `"X"`),
+    defaulting to `X_pca` when present and `X` otherwise. Groups are linked on
+    the Pearson correlation distance between their means, and the result uses
+    the same layout as `scanpy.tl.dendrogram` so either can be read back.
+    """
+    if representation is None:
+        representation = "X_pca" if "X_pca" in data.obsm else "X"
+    matrix = data.X if representation == "X" else data.obsm[representation]
+    if isinstance(matrix, pd.DataFrame):
+        matrix = matrix.to_numpy()
+
+    categorical = data.obs[group_by]
+    if not isinstance(categorical.dtype, pd.CategoricalDtype):
+        categorical = categorical.astype("category")
+    codes = np.asarray(categorical.cat.codes, dtype=np.int64)
+
+    # Only observed categories take part, in their categorical order.
+    observed_codes = np.unique(codes[codes >= 0])
+    remap = np.full(len(categorical.cat.categories), -1, dtype=np.int64)
+    remap[observed_codes] = np.arange(len(observed_codes))
+    codes = np.where(codes >= 0, remap[codes], -1)
+    categories = [str(category) for category in categorical.cat.categories[observed_codes]]
+
+    means = _group_means(matrix, codes, len(categories))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        correlation = np.corrcoef(means)
+    correlation = np.nan_to_num(np.atleast_2d(correlation), nan=0.0).clip(-1, 1)
+    np.fill_diagonal(correlation, 1.0)
+    distances = squareform(1 - correlation, checks=False)
+    linkage_matrix = linkage(distances, method=linkage_method, optimal_ordering=optimal_ordering)
+    dendrogram_info = dendrogram(linkage_matrix, labels=categories, no_plot=True)
+
+    return {
+        "linkage": linkage_matrix,
+        "groupby": [group_by],
+        "use_rep": representation,
+        "cor_method": "pearson",
+        "linkage_method": linkage_method,
+        "categories_ordered": dendrogram_info["ivl"],
+        "categories_idx_ordered": dendrogram_info["leaves"],
+        "dendrogram_info": dendrogram_info,
+        "correlation_matrix": correlation,
+    }
+
+
+def _dendrogram_paths(dendrogram_info: dict) -> pl.DataFrame:
+    """Normalize scipy dendrogram coordinates to leaves at 0, 1, 2, ... and height 0-1."""
+    icoord = np.array(dendrogram_info["icoord"], dtype=np.float64)
+    dcoord = np.array(dendrogram_info["dcoord"], dtype=np.float64)
+
+    # scipy places leaves at 5, 15, 25, ... → normalize to 0, 1, 2, ...
+    icoord = (icoord - 5) / 10
+
+    max_height = dcoord.max()
+    if max_height > 0:
+        dcoord = dcoord / max_height
+
+    return pl.DataFrame(
+        {
+            "x": icoord.ravel(),
+            "y": dcoord.ravel(),
+            "group": np.repeat(np.arange(len(icoord)), icoord.shape[1]),
+        }
+    )
+
+
+def _key_linkage(
+    profiles: np.ndarray,
+    *,
+    keys: tuple[str, ...],
+    group_by: str | None,
+    aggregation: str,
+    optimal_ordering: bool,
+) -> np.ndarray:
+    """Correlation-distance linkage of `profiles` (one row per key), cached."""
+    digest = blake2b(np.ascontiguousarray(profiles).tobytes(), digest_size=16).hexdigest()
+    cache_key = (keys, group_by, aggregation, optimal_ordering, profiles.shape, digest)
+    cached = _KEY_LINKAGE_CACHE.get(cache_key)
+    if cached is not None:
+        _KEY_LINKAGE_CACHE.move_to_end(cache_key)
+        return cached
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        correlation = np.corrcoef(profiles)
+    correlation = np.nan_to_num(correlation, nan=0.0).clip(-1, 1)
+    np.fill_diagonal(correlation, 1.0)
+    distances = squareform(1 - correlation, checks=False)
+    linkage_matrix = linkage(distances, method="complete", optimal_ordering=optimal_ordering)
+
+    _KEY_LINKAGE_CACHE[cache_key] = linkage_matrix
+    if len(_KEY_LINKAGE_CACHE) > _KEY_LINKAGE_CACHE_SIZE:
+        _KEY_LINKAGE_CACHE.popitem(last=False)
+    return linkage_matrix
+
+
+def _cluster_keys(
+    frame: pl.DataFrame,
+    *,
+    keys: list[str],
+    group_by: str | None,
+    aggregation: str,
+    optimal_ordering: bool = False,
+) -> tuple[list[str], pl.DataFrame | None]:
+    """
+    Order `keys` by the similarity of their profiles and extract dendrogram paths.
+
+    `frame` is wide: one column per key and one row per profile position (a
+    group, or a bin of observations). `aggregation` names how those rows were
+    formed and is part of the cache key. Missing values are filled with the
+    key's mean. Returns the keys unchanged and no paths when fewer than two
+    keys are given.
+    """
+    if len(keys) < 2:
+        return list(keys), None
+    profiles = (
+        frame.select(pl.col(key).cast(pl.Float64).fill_nan(None) for key in keys)
+        .with_columns(pl.all().fill_null(pl.all().mean()).fill_null(0.0))
+        .to_numpy()
+        .T
+    )
+    linkage_matrix = _key_linkage(
+        profiles,
+        keys=tuple(keys),
+        group_by=group_by,
+        aggregation=aggregation,
+        optimal_ordering=optimal_ordering,
+    )
+    dendrogram_info = dendrogram(linkage_matrix, labels=list(keys), no_plot=True)
+    return list(dendrogram_info["ivl"]), _dendrogram_paths(dendrogram_info)
+
 
 def _get_dendrogram(
     data: AnnData,
@@ -26,31 +200,11 @@ def _get_dendrogram(
                     "Precompute the dendrogram, or group by a column that data carries."
                 )
                 raise KeyNotFoundError(msg)
-            import scanpy as sc
-
-            sc.tl.dendrogram(data, groupby=group_by, key_added=key)
+            data.uns[key] = _compute_dendrogram(data, group_by)
 
         dendro = data.uns[key]
         categories_ordered = list(dendro["categories_ordered"])
-        dendro_info = dendro["dendrogram_info"]
-
-        icoord = np.array(dendro_info["icoord"])
-        dcoord = np.array(dendro_info["dcoord"])
-
-        # scipy places leaves at 5, 15, 25, ... → normalize to 0, 1, 2, ...
-        icoord = (icoord - 5) / 10
-
-        max_height = dcoord.max()
-        if max_height > 0:
-            dcoord = dcoord / max_height
-
-        path_x, path_y, path_group = [], [], []
-        for i in range(len(icoord)):
-            for j in range(icoord.shape[1]):
-                path_x.append(float(icoord[i][j]))
-                path_y.append(float(dcoord[i][j]))
-                path_group.append(i)
-        paths = pl.DataFrame({"x": path_x, "y": path_y, "group": path_group})
+        paths = _dendrogram_paths(dendro["dendrogram_info"])
     else:
         msg = f"Unsupported data type: `{type(data)}`"
         raise TypeError(msg)
@@ -77,3 +231,20 @@ def _get_dendrogram_path_frame(
             "group": paths["group"],
         }
     )
+
+
+def _get_key_dendrogram_path_frame(
+    paths: pl.DataFrame,
+    *,
+    top: float,
+    span: float,
+    dendrogram_ratio: float = 0.15,
+) -> pl.DataFrame:
+    """Map normalized key dendrogram paths into plot coordinates (above, along x-axis)."""
+    return pl.DataFrame(
+        {
+            "x": paths["x"],
+            "y": top + paths["y"].to_numpy() * span * dendrogram_ratio,
+            "group": paths["group"],
+        }
+    )
@@ -1,13 +1,103 @@
 from __future__ import annotations
 
+import weakref
+from collections import OrderedDict
 from collections.abc import Sequence
+from typing import TYPE_CHECKING
 
+import numpy as np
+import polars as pl
 from anndata import AnnData
 from mudata import MuData
 
 from cellestial.util.errors import KeyNotFoundError, _unsupported_data_type
 from cellestial.util.utilities import _container
 
+if TYPE_CHECKING:
+    from collections.abc import Mapping
+
+# Per-group statistics a ranking may hold next to `names`, read when present.
+_RANKING_FIELDS = ("scores", "logfoldchanges", "pvals", "pvals_adj")
+
+# Long ranking frames cached per `uns` key. An entry is only reused while it
+# was built from the very same recarrays, so rerunning the ranking (which
+# stores new arrays) invalidates it; edit the arrays in place at your own risk.
+_RANKING_CACHE: OrderedDict[str, tuple[tuple[weakref.ref, ...], pl.DataFrame]] = OrderedDict()
+_RANKING_CACHE_SIZE = 8
+
+
+def _ranking_frame(record: Mapping, *, key: str) -> pl.DataFrame:
+    """
+    Read a stored ranking into one long frame, cached per `uns` key.
+
+    The frame holds one row per (group, rank), group-major in stored group
+    order, with columns `group`, `rank`, `gene` and every field of
+    `_RANKING_FIELDS` present in `record` (as Float64). Each recarray field is
+    concatenated once, so no per-gene Python work is done.
+    """
+    names = record["names"]
+    fields = [field for field in _RANKING_FIELDS if field in record]
+    arrays = [names, *(record[field] for field in fields)]
+
+    cached = _RANKING_CACHE.get(key)
+    if cached is not None:
+        references, frame = cached
+        if len(references) == len(arrays) and all(
+            reference() is array for reference, array in zip(references, arrays, strict=True)
+        ):
+            _RANKING_CACHE.move_to_end(key)
+            return frame
+
+    groups = list(names.dtype.names)
+    n_ranked = len(names)
+    genes = np.concatenate([np.asarray(names[group]) for group in groups])
+    try:
+        gene_column = pl.Series(genes, dtype=pl.String)
+    except pl.exceptions.PolarsError:
+        # Mixed or non-string objects: fall back to their string form.
+        gene_column = pl.Series(genes.astype(str))
+
+    frame = pl.DataFrame(
+        {
+            "group": pl.Series(groups, dtype=pl.String).gather(
+                np.repeat(np.arange(len(groups)), n_ranked)
+            ),
+            "rank": np.tile(np.arange(n_ranked, dtype=np.int64), len(groups)),
+            "gene": gene_column,
+            **{
+                field: np.concatenate(
+                    [np.asarray(record[field][group], dtype=np.float64) for group in groups]
+                )
+                for field in fields
+            },
+        }
+    )
+
+    try:
+        references = tuple(weakref.ref(array) for array in arrays)
+    except TypeError:
+        # Arrays that cannot be weakly referenced are never cached.
+        return frame
+    _RANKING_CACHE[key] = (references, frame)
+    _RANKING_CACHE.move_to_end(key)
+    if len(_RANKING_CACHE) > _RANKING_CACHE_SIZE:
+        _RANKING_CACHE.popitem(last=False)
+    return frame
+
+
+def _top_ranked(
+    frame: pl.DataFrame,
+    *,
+    available_groups: Sequence[str],
+    groups: Sequence[str],
+    n_genes: int,
+) -> pl.DataFrame:
+    """Slice the top-`n_genes` rows of each of `groups`, in `groups` then rank order."""
+    n_ranked = frame.height // max(len(available_groups), 1)
+    positions = {group: index for index, group in enumerate(available_groups)}
+    starts = np.asarray([positions[group] for group in groups], dtype=np.int64) * n_ranked
+    return frame[(starts[:, None] + np.arange(n_genes, dtype=np.int64)).ravel()]
+
 
 def _marker_names_per_group(
     data: AnnData,
@@ -71,7 +161,17 @@ def _marker_names_per_group(
             )
             raise ValueError(msg)
 
-        markers = {group: [str(gene) for gene in names[group][:n_genes]] for group in selected}
+        top = _top_ranked(
+            _ranking_frame(record, key=key),
+            available_groups=available_groups,
+            groups=selected,
+            n_genes=n_genes,
+        )
+        genes = top["gene"].to_list()
+        markers = {
+            group: genes[index * n_genes : (index + 1) * n_genes]
+            for index, group in enumerate(selected)
+        }
     else:
         raise _unsupported_data_type(data, AnnData)
 
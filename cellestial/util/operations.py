@@ -1,16 +1,90 @@
 from __future__ import annotations
 
+from collections import OrderedDict
 from collections.abc import Sequence
 from typing import TYPE_CHECKING, cast
 
 from lets_plot import gggrid
-from lets_plot.plot.core import PlotSpec
-from lets_plot.plot.subplots import SupPlotsSpec
+from lets_plot.plot.core import FeatureSpecArray, PlotSpec
+from lets_plot.plot.subplots import SupPlotsLayoutSpec, SupPlotsSpec
 
 if TYPE_CHECKING:
+    from lets_plot.plot.core import FeatureSpec
     from polars import DataFrame
 
 
+# Frame and mappings of plots built by cellestial, keyed by the identity of the
+# plot's `data_meta` dict: lets-plot creates it once per `ggplot()` call and `+`
+# carries it over unchanged, so every plot derived from a registered one finds
+# the same entry. The entry keeps the dict alive, so its `id` is never reused.
+_PLOT_HANDLES: OrderedDict[int, tuple[dict, tuple[dict, tuple[dict, ...]], DataFrame | None]] = (
+    OrderedDict()
+)
+_PLOT_HANDLES_SIZE = 64
+
+
+def _layer_mappings(features: Sequence[FeatureSpec | None]) -> list[dict]:
+    """Mappings of the layers among `features`, in order, read from their `aes`."""
+    mappings = []
+    for feature in features:
+        if isinstance(feature, FeatureSpecArray):
+            mappings.extend(_layer_mappings(feature.elements()))
+        elif feature is not None and feature.kind == "layer":
+            mapping = feature.props().get("mapping")
+            mappings.append(mapping.as_dict() if mapping is not None else {})
+    return mappings
+
+
+def _register_plot(
+    plot: PlotSpec,
+    layers: Sequence[FeatureSpec | None] = (),
+    frame: DataFrame | None = None,
+) -> PlotSpec:
+    """
+    Record the mappings of a freshly built cellestial plot and return it.
+
+    `layers` are the leading layers the builder added, in order, with `None`
+    for the ones it skipped; their mappings come from the `aes` they were
+    built with, so nothing is serialised here. Deferred layers read the frame
+    and mappings of the plot they are added to through `retrieve` and
+    `get_mapping`; for registered plots (and everything derived from them with
+    `+`) those skip serialising the spec.
+
+    `frame` is the per-observation frame of plots that draw precomputed
+    layers without shared data; `retrieve` hands it out in place of the
+    (missing) shared data.
+    """
+    data_meta = plot.props().get("data_meta")
+    if not isinstance(data_meta, dict):
+        return plot
+    mapping = plot.props().get("mapping")
+    handle = (
+        mapping.as_dict() if mapping is not None else {},
+        tuple(_layer_mappings(layers)),
+    )
+    _PLOT_HANDLES[id(data_meta)] = (data_meta, handle, frame)
+    _PLOT_HANDLES.move_to_end(id(data_meta))
+    if len(_PLOT_HANDLES) > _PLOT_HANDLES_SIZE:
+        _PLOT_HANDLES.popitem(last=False)
+    return plot
+
+
+def _plot_entry(plot: PlotSpec) -> tuple[dict, tuple[dict, ...], DataFrame | None] | None:
+    """Return `(mapping, layer_mappings, frame)` of a registered plot, `None` for foreign ones."""
+    data_meta = plot.props().get("data_meta")
+    entry = _PLOT_HANDLES.get(id(data_meta))
+    if entry is None or entry[0] is not data_meta:
+        return None
+    _PLOT_HANDLES.move_to_end(id(data_meta))
+    return (*entry[1], entry[2])
+
+
+def _plot_handle(plot: PlotSpec) -> tuple[dict, tuple[dict, ...]] | None:
+    """Return `(mapping, layer_mappings)` of a registered plot, `None` for foreign ones."""
+    entry = _plot_entry(plot)
+    return None if entry is None else entry[:2]
+
+
 def _grid_figures(grid: SupPlotsSpec) -> list[PlotSpec]:
     # Lets-Plot does not expose the underlying PlotSpec list on SupPlotsSpec;
     # `.as_dict()["figures"]` returns serialized dicts that `gggrid` cannot consume.
@@ -18,6 +92,25 @@ def _grid_figures(grid: SupPlotsSpec) -> list[PlotSpec]:
     return vars(grid)["_SupPlotsSpec__figures"]
 
 
+def _regrid(grid: SupPlotsSpec, figures: list[PlotSpec | None]) -> SupPlotsSpec:
+    """
+    A copy of `grid` holding `figures` instead of its own panels.
+
+    The layout is rebuilt from the grid's public spec; a spec without one
+    falls back to the default `gggrid` layout.
+    """
+    layout = grid.as_dict().get("layout")
+    if layout is None:
+        regridded = gggrid(figures)
+    else:
+        layout = dict(layout)
+        regridded = SupPlotsSpec(
+            figures=figures, layout=SupPlotsLayoutSpec(layout.pop("name", "grid"), **layout)
+        )
+    regridded.props().update(grid.props())
+    return regridded
+
+
 def _normalize_widths(
     plots: Sequence[Sequence[PlotSpec | SupPlotsSpec]],
     widths: Sequence[float] | Sequence[Sequence[float]] | None,
@@ -322,6 +415,11 @@ def get_mapping(plot: PlotSpec, *, index: int = 0) -> dict:
 
         cl.get_mapping(umap)
     """
+    handle = _plot_handle(plot)
+    if handle is not None:
+        mapping, layer_mappings = handle
+        if 0 <= index < len(layer_mappings):
+            return {**mapping, **layer_mappings[index]}
     return {
         **plot.as_dict().get("mapping"),  # from the global mapping,
         **plot.as_dict().get("layers")[index].get("mapping"),  # from a layer.
@@ -367,8 +465,19 @@ def retrieve(plot: PlotSpec | SupPlotsSpec, index: int = 0) -> DataFrame:
         cl.retrieve(umap).head()
     """
     if isinstance(plot, PlotSpec):
-        frame = plot.as_dict().get("data")
+        entry = _plot_entry(plot)
+        if entry is None:
+            frame = plot.as_dict().get("data")
+        elif entry[2] is not None:
+            # precomputed plots keep their per-observation frame in the registry
+            frame = entry[2]
+        else:
+            # cellestial plots hold their polars frame as-is
+            frame = plot.get_plot_shared_data()
     elif isinstance(plot, SupPlotsSpec):
+        figure = _grid_figures(plot)[index]
+        if isinstance(figure, PlotSpec):
+            return retrieve(figure)
         frame = plot.as_dict().get("figures")[index].get("data")
     else:
         msg = f"Plot MUST be a `PlotSpec` or `SupPlotsSpec` object, type={type(plot)}"
@@ -196,6 +196,21 @@ def test_annotated_heatmap_transpose_moves_dendrogram_above_heatmap(adata, marke
     assert spec["figures"][1]["layers"][0]["geom"] == "raster"
 
 
+def test_annotated_heatmap_cluster_keys_adds_key_dendrogram_panel(adata, markers, group_key):
+    spec = cl.annotated_heatmap(
+        adata,
+        keys=markers,
+        group_by=group_key,
+        cluster_keys=True,
+        max_rows=20,
+    ).as_dict()
+
+    assert spec["layout"]["ncol"] == 1
+    assert spec["layout"]["nrow"] == 2
+    assert spec["figures"][0]["layers"][0]["geom"] == "path"
+    assert spec["figures"][1]["layers"][0]["geom"] == "raster"
+
+
 def test_annotated_heatmap_layers_and_layers_all_have_distinct_scope(
     adata, markers, group_key, cluster_key
 ):
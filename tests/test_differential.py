@@ -4,8 +4,10 @@ from anndata import AnnData
 from lets_plot import aes, geom_point, layer_tooltips
 from lets_plot.plot.core import PlotSpec
 from lets_plot.plot.subplots import SupPlotsSpec
+from scipy import sparse
 
 import cellestial as cl
+from cellestial.single.differential.ranking import _benjamini_hochberg, _rank_genes_groups
 from cellestial.single.differential.utilities import _build_markers_frame, _build_volcano_frame
 from cellestial.single.heatmap.utilities import (
     _extract_rank_genes_groups,
@@ -13,6 +15,7 @@ from cellestial.single.heatmap.utilities import (
     _resolve_rank_genes_groups_key,
 )
 from cellestial.util.errors import KeyNotFoundError, UnsupportedDataTypeError
+from cellestial.util.markers import _ranking_frame
 
 
 @pytest.fixture
@@ -337,11 +340,13 @@ def test_build_volcano_frame_recomputes_missing_or_stale_ranking(ranked_adata, m
     original_record = ranked_adata.uns.pop("rank_genes_groups")
     calls = []
 
-    def fake_rank_genes_groups(data, *, groupby, key_added, **kwargs):
-        calls.append((groupby, key_added, kwargs))
+    def fake_rank_genes_groups(data, group_by, *, key_added, **kwargs):
+        calls.append((group_by, key_added, kwargs))
         data.uns[key_added] = original_record
 
-    monkeypatch.setattr("scanpy.tl.rank_genes_groups", fake_rank_genes_groups)
+    monkeypatch.setattr(
+        "cellestial.single.differential.utilities._rank_genes_groups", fake_rank_genes_groups
+    )
 
     frame = _build_volcano_frame(
         ranked_adata,
@@ -370,7 +375,9 @@ def test_build_volcano_frame_reuses_matching_ranking(ranked_adata, monkeypatch):
     def unexpected_recompute(*args, **kwargs):
         pytest.fail("matching differential-expression results should be reused")
 
-    monkeypatch.setattr("scanpy.tl.rank_genes_groups", unexpected_recompute)
+    monkeypatch.setattr(
+        "cellestial.single.differential.utilities._rank_genes_groups", unexpected_recompute
+    )
 
     frame = _build_volcano_frame(ranked_adata, "A", group_by="cluster")
 
@@ -443,3 +450,165 @@ def test_volcanos_rejects_empty_groups(ranked_adata):
 def test_volcanos_rejects_non_string_groups(ranked_adata):
     with pytest.raises(KeyError, match="Group"):
         cl.volcanos(ranked_adata, [1])
+
+
+def test_ranking_frame_is_long_and_cached(ranked_adata):
+    record = ranked_adata.uns["rank_genes_groups"]
+    frame = _ranking_frame(record, key="rank_genes_groups")
+
+    assert frame.columns == [
+        "group",
+        "rank",
+        "gene",
+        "scores",
+        "logfoldchanges",
+        "pvals",
+        "pvals_adj",
+    ]
+    assert frame["group"].to_list() == ["A"] * 4 + ["B"] * 4
+    assert frame["rank"].to_list() == [0, 1, 2, 3] * 2
+    assert frame["gene"].to_list()[4:] == ["gene_b", "shared", "gene_e", "gene_f"]
+    assert _ranking_frame(record, key="rank_genes_groups") is frame
+
+
+def test_ranking_frame_cache_follows_stored_arrays(ranked_adata):
+    record = ranked_adata.uns["rank_genes_groups"]
+    frame = _ranking_frame(record, key="rank_genes_groups")
+
+    record["scores"] = np.rec.fromarrays(
+        [[9.0, 8.0, 7.0, 6.0], [5.0, 4.0, 3.0, 2.0]], names=["A", "B"]
+    )
+    replaced = _ranking_frame(record, key="rank_genes_groups")
+    assert replaced is not frame
+    assert replaced["scores"].to_list() == [9.0, 8.0, 7.0, 6.0, 5.0, 4.0, 3.0, 2.0]
+
+
+@pytest.fixture
+def expression_adata():
+    rng = np.random.default_rng(0)
+    counts = rng.poisson(rng.uniform(0.05, 3.0, size=40), size=(120, 40)).astype(np.float32)
+    counts[:30, :5] += rng.poisson(4.0, size=(30, 5))
+    data = AnnData(X=sparse.csr_matrix(np.log1p(counts)))
+    data.var_names = [f"gene_{index}" for index in range(40)]
+    data.obs["cluster"] = np.repeat(["A", "B", "C", "D"], 30)
+    data.obs["cluster"] = data.obs["cluster"].astype("category")
+    return data
+
+
+def _aligned(record, reference, group, field):
+    positions = {name: index for index, name in enumerate(reference["names"][group])}
+    order = [positions[name] for name in record["names"][group]]
+    return np.asarray(reference[field][group], dtype=float)[order]
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        {"method": "t-test"},
+        {"method": "t-test_overestim_var", "corr_method": "bonferroni"},
+        {"method": "wilcoxon"},
+        {"method": "wilcoxon", "tie_correct": True},
+    ],
+)
+@pytest.mark.parametrize("dense", [False, True])
+def test_rank_genes_groups_matches_scanpy(expression_adata, options, dense):
+    sc = pytest.importorskip("scanpy")
+    if dense:
+        expression_adata.X = expression_adata.X.toarray()
+
+    sc.tl.rank_genes_groups(expression_adata, "cluster", key_added="scanpy", **options)
+    _rank_genes_groups(expression_adata, "cluster", key_added="native", **options)
+
+    reference = expression_adata.uns["scanpy"]
+    record = expression_adata.uns["native"]
+    assert record["names"].dtype.names == reference["names"].dtype.names
+    assert {key: record["params"][key] for key in reference["params"]} == reference["params"]
+    for field, dtype in [
+        ("scores", np.float32),
+        ("logfoldchanges", np.float32),
+        ("pvals", np.float64),
+        ("pvals_adj", np.float64),
+    ]:
+        assert record[field].dtype[0] == dtype
+        for group in reference["names"].dtype.names:
+            np.testing.assert_allclose(
+                np.asarray(record[field][group], dtype=float),
+                _aligned(record, reference, group, field),
+                rtol=1e-5,
+                atol=1e-6,
+            )
+    scores = np.asarray(record["scores"]["A"])
+    assert np.all(np.diff(scores) <= 0)
+
+
+def test_rank_genes_groups_chunks_and_threads_agree(expression_adata):
+    _rank_genes_groups(expression_adata, "cluster", key_added="whole", method="wilcoxon")
+    _rank_genes_groups(
+        expression_adata,
+        "cluster",
+        key_added="chunked",
+        method="wilcoxon",
+        tie_correct=True,
+        chunk_size=7,
+        n_jobs=3,
+    )
+    _rank_genes_groups(
+        expression_adata, "cluster", key_added="whole_tied", method="wilcoxon", tie_correct=True
+    )
+
+    chunked = expression_adata.uns["chunked"]
+    whole = expression_adata.uns["whole_tied"]
+    for group in whole["names"].dtype.names:
+        assert list(chunked["names"][group]) == list(whole["names"][group])
+        np.testing.assert_allclose(chunked["scores"][group], whole["scores"][group])
+    # the tie correction only ever widens the scores
+    assert np.all(
+        np.abs(_aligned(whole, expression_adata.uns["whole"], "A", "scores"))
+        <= np.abs(np.asarray(whole["scores"]["A"])) + 1e-5
+    )
+
+
+def test_rank_genes_groups_n_genes_and_rankby_abs(expression_adata):
+    _rank_genes_groups(expression_adata, "cluster", n_genes=5, rankby_abs=True)
+
+    record = expression_adata.uns["rank_genes_groups"]
+    assert len(record["names"]) == 5
+    assert np.all(np.diff(np.abs(np.asarray(record["scores"]["B"]))) <= 0)
+    assert record["params"]["n_genes"] == 5
+
+
+def test_rank_genes_groups_validation(expression_adata):
+    singleton = expression_adata.copy()
+    singleton.obs["cluster"] = ["A"] + ["B"] * 119
+    with pytest.raises(ValueError, match="only contain one sample"):
+        _rank_genes_groups(singleton, "cluster")
+    with pytest.raises(ValueError, match="Correction method"):
+        _rank_genes_groups(expression_adata, "cluster", corr_method="holm")
+    with pytest.raises(ValueError, match=r"`adata\.raw` is empty"):
+        _rank_genes_groups(expression_adata, "cluster", use_raw=True)
+    with pytest.raises(ValueError, match="chunk_size"):
+        _rank_genes_groups(expression_adata, "cluster", chunk_size=0)
+
+
+def test_rank_genes_groups_hands_unsupported_options_to_scanpy(expression_adata, monkeypatch):
+    calls = []
+
+    def fake_rank_genes_groups(data, *, groupby, key_added, **kwargs):
+        calls.append((kwargs["method"], kwargs.get("reference")))
+
+    monkeypatch.setattr("scanpy.tl.rank_genes_groups", fake_rank_genes_groups)
+
+    _rank_genes_groups(expression_adata, "cluster", method="logreg")
+    _rank_genes_groups(expression_adata, "cluster", reference="B")
+    _rank_genes_groups(expression_adata, "cluster", reference="rest", groups="all")
+
+    assert calls == [("logreg", None), ("t-test", "B")]
+
+
+def test_benjamini_hochberg_matches_reference_values():
+    pvalues = np.array([[0.01, 0.04, 0.03, 0.2], [0.5, 0.5, 0.001, 1.0]])
+
+    adjusted = _benjamini_hochberg(pvalues)
+
+    np.testing.assert_allclose(adjusted[0], [0.04, 0.16 / 3, 0.16 / 3, 0.2])
+    np.testing.assert_allclose(adjusted[1], [2 / 3, 2 / 3, 0.004, 1.0])
@@ -1,9 +1,13 @@
+import numpy as np
+import polars as pl
 import pytest
 from lets_plot import aes, geom_vline
 from lets_plot.plot.core import PlotSpec
 from lets_plot.plot.subplots import SupPlotsSpec
+from scipy.stats import gaussian_kde
 
 import cellestial as cl
+from cellestial.single.core._summary import _binned_kde
 from cellestial.util import retrieve
 from cellestial.util.errors import KeyNotFoundError
 
@@ -102,6 +106,122 @@ def test_point_kwargs_not_mutated(adata, fn, group_key):
     assert point_kwargs == expected
 
 
+def test_violin_summary_ships_group_summaries(adata, group_key):
+    plot = cl.violin(
+        adata, "CD14", fill=group_key, summary=True, summary_box=True, show_points=False, n=64
+    )
+    spec = plot.as_dict()
+    polygons, whiskers, boxes, medians = spec["layers"]
+    groups = adata.obs[group_key].dropna().unique()
+
+    # nothing per observation: one 2n-vertex outline and one box row per group
+    assert "data" not in spec
+    assert polygons["geom"] == "polygon"
+    assert polygons["data"].height == len(groups) * 2 * 64
+    assert boxes["data"].height == len(groups)
+    assert (whiskers["geom"], medians["geom"]) == ("segment", "point")
+    x_scale = next(scale for scale in spec["scales"] if scale["aesthetic"] == "x")
+    assert sorted(x_scale["labels"]) == sorted(map(str, groups))
+
+    stats = boxes["data"].sort("violin_x")
+    values = adata.obs_vector("CD14")
+    for row in stats.iter_rows(named=True):
+        group = values[(adata.obs[group_key] == row[group_key]).to_numpy()]
+        q1, median, q3 = np.quantile(group, [0.25, 0.5, 0.75])
+        assert row["count"] == len(group)
+        assert row["q1"] == pytest.approx(q1, rel=1e-5)
+        assert row["median"] == pytest.approx(median, rel=1e-5)
+        assert row["q3"] == pytest.approx(q3, rel=1e-5)
+        assert row["upper"] == pytest.approx(group[group <= q3 + 1.5 * (q3 - q1)].max())
+        outline = polygons["data"].filter(pl.col(group_key) == row[group_key])
+        assert outline["CD14"].min() == pytest.approx(group.min())
+        assert outline["CD14"].max() == pytest.approx(group.max())
+        # trimmed violins sit within their slot around the group position
+        assert (outline["violin_x"] - row["violin_x"]).abs().max() <= 0.5 + 1e-9
+
+
+def test_violin_summary_draws_only_violins_by_default(adata, group_key):
+    plot = cl.violin(adata, "CD14", fill=group_key, summary=True, show_points=False)
+
+    assert [layer["geom"] for layer in plot.as_dict()["layers"]] == ["polygon"]
+    # `retrieve` hands out the per-observation frame, placed at `violin_x`
+    frame = cl.retrieve(plot)
+    assert frame.height == adata.n_obs
+    assert frame["violin_x"].is_in(range(frame[group_key].n_unique())).all()
+
+
+@pytest.mark.parametrize("builder", [cl.violin, cl.violins])
+def test_violin_summary_takes_brackets_at_violin_positions(adata, group_key, builder):
+    key = "CD14" if builder is cl.violin else ["CD14"]
+    spec = (
+        builder(adata, key, fill=group_key, summary=True, show_points=False) + cl.bracket()
+    ).as_dict()
+    if builder is cl.violins:
+        spec = spec["figures"][0]
+
+    brackets = spec["layers"][-1]
+    n_groups = adata.obs[group_key].nunique()
+    assert brackets["geom"] == "bracket"
+    assert len(brackets["data"]["xmin"]) == n_groups * (n_groups - 1) // 2
+    assert set(brackets["data"]["xmin"]) | set(brackets["data"]["xmax"]) == set(range(n_groups))
+
+
+def test_binned_kde_matches_gaussian_kde_per_group():
+    rng = np.random.default_rng(0)
+    values = np.r_[rng.normal(0, 1, 4000), rng.normal(5, 0.3, 1000)]
+    codes = np.repeat([0, 1], [4000, 1000])
+    bandwidths = np.array([0.3, 0.1])
+
+    grid, density = _binned_kde(values, codes, 2, bandwidths=bandwidths, lower=-6.0, upper=8.0)
+
+    for group, bandwidth in enumerate(bandwidths):
+        sample = values[codes == group]
+        exact = gaussian_kde(sample, bw_method=bandwidth / sample.std(ddof=1))(grid)
+        np.testing.assert_allclose(density[group], exact, atol=1e-3 * exact.max())
+
+
+@pytest.mark.parametrize("fn", [cl.violin, cl.boxplot])
+def test_max_points_per_group_caps_only_the_point_layer(adata, fn, group_key):
+    full = fn(adata, "CD14", fill=group_key).as_dict()
+    capped = fn(adata, "CD14", fill=group_key, max_points_per_group=20).as_dict()
+    again = fn(adata, "CD14", fill=group_key, max_points_per_group=20).as_dict()
+    kept = fn(adata, "CD14", fill=group_key, max_points_per_group=20, keep_outliers=True)
+
+    # the geom still summarises every observation
+    assert capped["data"].height == full["data"].height
+    points = capped["layers"][-1]["data"]
+    counts = full["data"][group_key].value_counts()
+    for row in points[group_key].value_counts().iter_rows(named=True):
+        total = counts.filter(pl.col(group_key) == row[group_key])["count"].item()
+        assert row["count"] == min(20, total)
+    assert points.equals(again["layers"][-1]["data"])
+
+    values = full["data"]
+    q1 = pl.col("CD14").quantile(0.25, "linear").over(group_key)
+    q3 = pl.col("CD14").quantile(0.75, "linear").over(group_key)
+    outliers = values.filter(
+        (pl.col("CD14") < q1 - 1.5 * (q3 - q1)) | (pl.col("CD14") > q3 + 1.5 * (q3 - q1))
+    )
+    with_outliers = kept.as_dict()["layers"][-1]["data"]
+    assert outliers.height > 0
+    assert outliers.join(with_outliers, on=with_outliers.columns, how="anti").is_empty()
+
+
+@pytest.mark.parametrize("keep_outliers", [False, True])
+def test_max_points_per_group_without_group_columns(adata, keep_outliers):
+    # a float `color` is not a stratum, so the whole frame is one group
+    plot = cl.boxplot(
+        adata,
+        "CD14",
+        color="pct_counts_mt",
+        max_points_per_group=10,
+        keep_outliers=keep_outliers,
+    )
+    points = plot.as_dict()["layers"][-1]["data"]
+
+    assert points.height >= 10 if keep_outliers else points.height == 10
+
+
 # ---- violins / boxplots (plural) ----
 
 
@@ -181,6 +301,37 @@ def test_ridges_ncol(adata, group_key):
     assert isinstance(plot, SupPlotsSpec)
 
 
+def test_ridge_precompute_ships_group_densities(adata, group_key):
+    groups = sorted(adata.obs[group_key].dropna().unique())
+    plot = cl.ridge(
+        adata, key="CD14", group_by=group_key, drop=groups[0], threshold=0.1, precompute=True
+    )
+    spec = plot.as_dict()
+    layer = spec["layers"][0]
+    densities = layer["data"]
+
+    assert "data" not in spec
+    assert layer["stat"] == "identity"
+    assert layer["scale"] == 2.0
+    assert set(densities[group_key].to_list()) == set(groups[1:])
+    assert densities[group_key].value_counts()["count"].to_list() == [512] * (len(groups) - 1)
+    assert densities["CD14"].min() >= 0.1
+    assert densities["height"].max() == pytest.approx(1.0)
+    # widened by enough bandwidths, every curve carries all of its group's mass
+    tails = cl.ridge(adata, key="CD14", group_by=group_key, precompute=True, tails_cutoff=5)
+    for _, curve in tails.as_dict()["layers"][0]["data"].group_by(group_key):
+        x, density = curve["CD14"].to_numpy(), curve["density"].to_numpy()
+        assert np.sum((density[1:] + density[:-1]) / 2 * np.diff(x)) == pytest.approx(
+            1.0, abs=0.05
+        )
+
+
+def test_ridges_precompute(adata, group_key):
+    plot = cl.ridges(adata, keys=["CD14", "MS4A1"], group_by=group_key, precompute=True, n=64)
+    for panel in plot.as_dict()["figures"]:
+        assert panel["layers"][0]["data"].height == 64 * adata.obs[group_key].nunique()
+
+
 # ---- mapping override ----
 
 
@@ -342,3 +493,54 @@ def test_histogram_validation_paths(adata):
         cl.histograms(adata, [])
     with pytest.raises(ValueError):
         cl.histograms(adata, ["CD14", 1])
+
+
+def test_histogram_precompute_ships_bin_counts(adata, group_key):
+    values = adata.obs_vector("CD14")
+    breaks = np.linspace(values.min() - 0.5, values.max() + 0.5, 7)
+    plot = cl.histogram(adata, "CD14", breaks=breaks.tolist(), precompute=True)
+    stacked = cl.histogram(adata, "CD14", fill=group_key, bins=10, precompute=True)
+    spec = plot.as_dict()
+    bars = spec["layers"][0]["data"]
+
+    assert "data" not in spec
+    assert spec["layers"][0]["geom"] == "rect"
+    expected, _ = np.histogram(values, bins=breaks)
+    assert bars["bin_start"].to_list() == pytest.approx(breaks[:-1][expected > 0].tolist())
+    assert bars["count"].to_list() == expected[expected > 0].tolist()
+
+    # stacked groups split the same total count and stack without gaps
+    groups = stacked.as_dict()["layers"][0]["data"]
+    assert groups["count"].sum() == adata.n_obs
+    tops = groups.group_by("bin_start").agg(pl.col("count_high").max(), pl.col("count").sum())
+    assert (tops["count_high"] == tops["count"]).all()
+
+
+def test_histogram_precompute_retrieves_observations(adata, group_key):
+    plot = cl.histogram(adata, "CD14", fill=group_key, precompute=True)
+    grid = cl.histograms(adata, ["CD14", "LYZ"], precompute=True)
+
+    assert retrieve(plot).height == adata.n_obs
+    assert group_key in retrieve(plot).columns
+    assert "LYZ" in retrieve(grid, 1).columns
+
+
+@pytest.mark.parametrize("precompute", [False, True])
+def test_histograms_shared_bins_use_the_same_edges(adata, precompute):
+    grid = cl.histograms(
+        adata, ["CD14", "MS4A1"], bins=12, shared_bins=True, precompute=precompute
+    )
+    panels = grid.as_dict()["figures"]
+
+    if precompute:
+        bars = pl.concat(
+            [panel["layers"][0]["data"].select("bin_start", "bin_end") for panel in panels]
+        )
+        widths = (bars["bin_end"] - bars["bin_start"]).to_numpy()
+        offsets = (bars["bin_start"].to_numpy() - bars["bin_start"].min()) / widths[0]
+        assert np.allclose(widths, widths[0])
+        assert np.allclose(offsets, np.round(offsets))
+    else:
+        breaks = [panel["layers"][0]["breaks"] for panel in panels]
+        assert breaks[0] == breaks[1]
+        assert len(breaks[0]) == 13
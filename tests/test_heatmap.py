@@ -6,6 +6,7 @@ from lets_plot.plot.core import PlotSpec
 import cellestial as cl
 from cellestial.single.heatmap.heatmap import _scale_values
 from cellestial.single.heatmap.utilities import _compute_violin_polygons
+from cellestial.util.dendrogram import _KEY_LINKAGE_CACHE, _cluster_keys
 from cellestial.util.errors import UnsupportedDataTypeError
 
 
@@ -72,6 +73,82 @@ def test_stacked_violin_dendrogram_key_uses_custom_key(adata, markers, group_key
     assert f"dendrogram_{group_key}" not in local.uns
 
 
+def test_computed_dendrogram_matches_scanpy(adata, group_key):
+    import numpy as np
+    import scanpy as sc
+
+    from cellestial.util.dendrogram import _compute_dendrogram
+
+    dense = adata.copy()
+    dense.X = dense.X.toarray()
+    for representation in ["X_pca", "X"]:
+        expected = sc.tl.dendrogram(
+            dense, groupby=group_key, use_rep=representation, inplace=False
+        )
+        computed = _compute_dendrogram(adata, group_key, representation=representation)
+        assert computed["categories_ordered"] == expected["categories_ordered"]
+        assert np.allclose(computed["linkage"], expected["linkage"])
+
+
+def test_dendrogram_is_computed_and_stored_when_absent(adata, markers, group_key):
+    local = adata.copy()
+    local.uns.pop(f"dendrogram_{group_key}", None)
+    plot = cl.dotplot(local, group_by=group_key, keys=markers, dendrogram=True)
+    assert isinstance(plot, PlotSpec)
+    stored = local.uns[f"dendrogram_{group_key}"]
+    assert sorted(stored["categories_ordered"]) == sorted(
+        local.obs[group_key].cat.categories.astype(str)
+    )
+
+
+def test_cluster_keys_groups_similar_keys_and_caches_linkage():
+    frame = pl.DataFrame(
+        {
+            "a": [1.0, 2.0, 3.0, 4.0],
+            "x": [4.0, 1.0, 3.0, 1.0],
+            "b": [1.1, 2.1, 2.9, 4.2],
+            "y": [4.1, 0.9, 3.2, 1.0],
+        }
+    )
+    order, paths = _cluster_keys(
+        frame, keys=["a", "x", "b", "y"], group_by="g", aggregation="mean"
+    )
+    assert sorted(order) == ["a", "b", "x", "y"]
+    assert {frozenset(order[:2]), frozenset(order[2:])} == {frozenset("ab"), frozenset("xy")}
+    assert paths.columns == ["x", "y", "group"]
+
+    n_cached = len(_KEY_LINKAGE_CACHE)
+    repeat, _ = _cluster_keys(frame, keys=["a", "x", "b", "y"], group_by="g", aggregation="mean")
+    assert repeat == order
+    assert len(_KEY_LINKAGE_CACHE) == n_cached
+
+
+def test_cluster_keys_single_key_is_unchanged():
+    frame = pl.DataFrame({"a": [1.0, 2.0]})
+    assert _cluster_keys(frame, keys=["a"], group_by=None, aggregation="mean") == (["a"], None)
+
+
+@pytest.mark.parametrize("aggregate", [True, False])
+def test_heatmap_cluster_keys_draws_key_dendrogram(adata, markers, group_key, aggregate):
+    sub = adata[:300].copy()
+    spec = cl.heatmap(
+        sub, group_by=group_key, keys=markers, aggregate=aggregate, cluster_keys=True
+    ).as_dict()
+    assert "path" in [layer["geom"] for layer in spec["layers"]]
+
+
+def test_dotplot_cluster_keys_draws_key_dendrogram(adata, markers, group_key):
+    spec = cl.dotplot(adata, group_by=group_key, keys=markers, cluster_keys=True).as_dict()
+    assert "path" in [layer["geom"] for layer in spec["layers"]]
+
+
+def test_matrixplot_cluster_keys_drops_key_groups(adata, markers, group_key):
+    keys = {"first": markers[:3], "second": markers[3:6]}
+    with pytest.warns(UserWarning, match="cluster_keys"):
+        plot = cl.matrixplot(adata, group_by=group_key, keys=keys, cluster_keys=True)
+    assert isinstance(plot, PlotSpec)
+
+
 @pytest.mark.parametrize("scale_axis", [0, 1])
 def test_heatmap_scale_axis(adata, markers, group_key, scale_axis):
     plot = cl.heatmap(adata, group_by=group_key, keys=markers, scale_axis=scale_axis)
@@ -612,3 +689,56 @@ def test_heatmap_variable_axis_nonaggregate_row_operations(adata, scale_axis, ma
 
     assert isinstance(plot, PlotSpec)
     assert "Feature" in plot.as_dict()["data"].columns
+
+
+def _sorted_data(plot: PlotSpec, columns: list[str]) -> pl.DataFrame:
+    data = plot.as_dict()["data"]
+    return data.with_columns(pl.col(pl.Categorical).cast(pl.String)).sort(columns)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 257, 10**9])
+def test_matrixplot_chunked_matches_unchunked(adata, markers, group_key, chunk_size):
+    columns = [group_key, "variable"]
+    whole = _sorted_data(cl.matrixplot(adata, keys=markers, group_by=group_key), columns)
+    chunked = _sorted_data(
+        cl.matrixplot(adata, keys=markers, group_by=group_key, chunk_size=chunk_size), columns
+    )
+    assert chunked[columns].equals(whole[columns])
+    assert chunked["value"].to_list() == pytest.approx(whole["value"].to_list(), rel=1e-5)
+
+
+def test_dotplot_chunked_matches_unchunked(adata, markers, group_key):
+    columns = [group_key, "variable"]
+    whole = _sorted_data(cl.dotplot(adata, keys=markers, group_by=group_key), columns)
+    chunked = _sorted_data(
+        cl.dotplot(adata, keys=markers, group_by=group_key, chunk_size=300), columns
+    )
+    assert chunked[columns].equals(whole[columns])
+    for column in ("avg_exp", "pct_exp"):
+        assert chunked[column].to_list() == pytest.approx(whole[column].to_list(), rel=1e-5)
+
+
+def test_stacked_violin_chunked_matches_unchunked(adata, markers, group_key):
+    whole = cl.stacked_violin(adata, keys=markers[:3], group_by=group_key).as_dict()["data"]
+    chunked = cl.stacked_violin(
+        adata, keys=markers[:3], group_by=group_key, chunk_size=300
+    ).as_dict()["data"]
+    assert chunked.equals(whole)
+
+
+def test_heatmap_variable_axis_chunked(adata):
+    local = adata[:, :100].copy()
+    plot = cl.heatmap(
+        local,
+        keys=["mean_counts", "log1p_mean_counts"],
+        group_by="mt",
+        axis=1,
+        aggregate=True,
+        chunk_size=7,
+    )
+    assert plot.as_dict()["data"].height == 2 * local.var["mt"].nunique()
+
+
+def test_heatmap_chunk_size_must_be_positive(adata, markers, group_key):
+    with pytest.raises(ValueError, match="chunk_size"):
+        cl.heatmap(adata, keys=markers, group_by=group_key, chunk_size=0)
@@ -1,17 +1,23 @@
-import sys
-import types
-
 import numpy as np
 import polars as pl
 import pytest
 from lets_plot import aes, geom_point, ggplot
 from lets_plot.plot.core import PlotSpec
+from lets_plot.plot.subplots import SupPlotsSpec
 
 import cellestial as cl
 from cellestial.layers import DeferredLayer
+from cellestial.layers._streamlines import _streamlines, _velocity_grid
 from cellestial.layers.arrow import _axis_arrow_layers
-from cellestial.layers.bracket import _compute_bracket_frame, _correct_pvalues, _expand_comparisons
+from cellestial.layers.bracket import (
+    _compute_bracket_frame,
+    _correct_pvalues,
+    _expand_comparisons,
+    _mannwhitney_pairs,
+    _ttest_pairs,
+)
 from cellestial.layers.ondata_legend import _compute_label_positions
+from cellestial.layers.outline import _get_density_boundaries
 from cellestial.util import retrieve
 from cellestial.util.errors import InvalidComparisonError, MissingAestheticError
 
@@ -198,6 +204,67 @@ def test_cluster_outlines_too_few_points_raises():
         _ = plot + cl.cluster_outlines(groups="a")
 
 
+def _blob_frame() -> pl.DataFrame:
+    rng = np.random.default_rng(0)
+    centers = {"a": (0.0, 0.0), "b": (6.0, 0.0), "c": (0.0, 8.0)}
+    return pl.concat(
+        [
+            pl.DataFrame(
+                {
+                    "x": rng.normal(center[0], 1.0, 1500),
+                    "y": rng.normal(center[1], 0.6, 1500),
+                    "group": [label] * 1500,
+                }
+            )
+            for label, center in centers.items()
+        ]
+    )
+
+
+def _enclosed_area(path: pl.DataFrame) -> float:
+    x, y = path["x"].to_numpy(), path["y"].to_numpy()
+    return 0.5 * abs(np.dot(x, np.roll(y, 1)) - np.dot(y, np.roll(x, 1)))
+
+
+def test_cluster_outline_density_matches_gaussian_kde():
+    from scipy.stats import gaussian_kde
+    from skimage import measure
+
+    frame = _blob_frame().filter(pl.col("group") == "a")
+    boundaries = _get_density_boundaries(frame, "x", "y", "group", "a", padding=1.5, level=0.04)
+
+    points = frame.select("x", "y").to_numpy()
+    lower, upper = points.min(axis=0) - 1.5, points.max(axis=0) + 1.5
+    x_range = np.linspace(lower[0], upper[0], 200)
+    y_range = np.linspace(lower[1], upper[1], 200)
+    xi, yi = np.meshgrid(x_range, y_range)
+    density = gaussian_kde(points.T)(np.vstack([xi.ravel(), yi.ravel()])).reshape(xi.shape)
+    (contour,) = measure.find_contours(density, density.max() * 0.04)
+    expected = _enclosed_area(
+        pl.DataFrame(
+            {
+                "x": np.interp(contour[:, 1], np.arange(200), x_range),
+                "y": np.interp(contour[:, 0], np.arange(200), y_range),
+            }
+        )
+    )
+
+    assert boundaries["path"].unique().to_list() == ["a_0"]
+    assert _enclosed_area(boundaries) == pytest.approx(expected, rel=0.02)
+
+
+def test_cluster_outlines_bins_shared_labels_into_each_outline():
+    frame = _blob_frame()
+    boundaries = _get_density_boundaries(frame, "x", "y", "group", [["a", "b"], "a", "c"])
+
+    assert boundaries.columns == ["x", "y", "group", "path"]
+    assert boundaries["group"].unique(maintain_order=True).to_list() == ["a+b", "a", "c"]
+    alone = _get_density_boundaries(frame, "x", "y", "group", "a")
+    shared = boundaries.filter(pl.col("group") == "a")
+    np.testing.assert_allclose(shared["x"].to_numpy(), alone["x"].to_numpy())
+    np.testing.assert_allclose(shared["y"].to_numpy(), alone["y"].to_numpy())
+
+
 def test_cluster_outlines_requires_coordinates_and_group_mapping():
     frame = pl.DataFrame(
         {
@@ -471,6 +538,144 @@ def test_bracket_layer_requires_x_and_y_aesthetics():
         _ = (ggplot(frame) + geom_point(aes(x="group"))) + cl.bracket()
 
 
+@pytest.mark.parametrize("alternative", ["two-sided", "less", "greater"])
+def test_bracket_pairwise_tests_match_scipy(alternative):
+    from scipy.stats import mannwhitneyu, ttest_ind
+
+    rng = np.random.default_rng(0)
+    samples = {
+        "large": np.sort(rng.normal(size=40)),
+        "tied": np.sort(np.round(rng.normal(0.5, size=25), 1)),
+        "zeros": np.sort(np.where(rng.random(30) < 0.5, 0.0, rng.normal(size=30))),
+        "small": np.sort(rng.normal(1.0, size=6)),
+    }
+    pairs = [(a, b) for index, a in enumerate(samples) for b in list(samples)[index + 1 :]]
+
+    statistics, pvalues = _mannwhitney_pairs(samples, pairs, alternative)
+    t_statistics, t_pvalues = _ttest_pairs(samples, pairs, alternative)
+
+    for index, (group_a, group_b) in enumerate(pairs):
+        expected = mannwhitneyu(samples[group_a], samples[group_b], alternative=alternative)
+        assert statistics[index] == pytest.approx(expected.statistic)
+        assert pvalues[index] == pytest.approx(expected.pvalue, rel=1e-9, abs=1e-15)
+        expected = ttest_ind(samples[group_a], samples[group_b], alternative=alternative)
+        assert t_statistics[index] == pytest.approx(expected.statistic)
+        assert t_pvalues[index] == pytest.approx(expected.pvalue, rel=1e-9, abs=1e-15)
+
+
+def _bracket_kwargs(**overrides) -> dict:
+    return {
+        "x": "group",
+        "y": "value",
+        "comparisons": None,
+        "test": "permutation",
+        "alternative": "two-sided",
+        "correction": "none",
+        "label": "pvalue",
+        "label_format": ".3g",
+        "prefix": "",
+        "prefix_style": "=",
+        "separator": " ",
+        "threshold": None,
+        "y_position": None,
+        "y_step": None,
+        "y_padding": 0.08,
+    } | overrides
+
+
+@pytest.mark.parametrize("alternative", ["two-sided", "less", "greater"])
+def test_bracket_permutation_test_is_exact_for_small_groups(alternative):
+    from scipy.stats import permutation_test
+
+    rng = np.random.default_rng(1)
+    first, second = rng.normal(size=5), rng.normal(0.8, size=6)
+    frame = pl.DataFrame(
+        {"group": ["a"] * 5 + ["b"] * 6, "value": np.concatenate([first, second])}
+    )
+
+    brackets = _compute_bracket_frame(frame, **_bracket_kwargs(alternative=alternative))
+
+    expected = permutation_test(
+        (first, second),
+        lambda a, b, axis: a.mean(axis=axis) - b.mean(axis=axis),
+        alternative=alternative,
+        vectorized=True,
+    )
+    assert brackets["statistic"][0] == pytest.approx(expected.statistic)
+    assert brackets["pvalue"][0] == pytest.approx(expected.pvalue)
+
+
+def test_bracket_resampling_is_seeded_and_chunked(monkeypatch):
+    rng = np.random.default_rng(2)
+    frame = pl.DataFrame(
+        {
+            "group": ["a"] * 40 + ["b"] * 50 + ["c"] * 30,
+            "value": np.concatenate(
+                [rng.normal(size=40), rng.normal(0.6, size=50), rng.normal(size=30)]
+            ),
+        }
+    )
+    kwargs = _bracket_kwargs(n_resamples=999, ci=0.9, label=["pvalue", "ci"])
+
+    monkeypatch.setattr("cellestial.layers._resampling._RESAMPLE_ENTRIES", 500)
+    first = _compute_bracket_frame(frame, **kwargs, seed=3, n_jobs=1)
+    threaded = _compute_bracket_frame(frame, **kwargs, seed=3, n_jobs=4)
+    other = _compute_bracket_frame(frame, **kwargs, seed=4)
+
+    assert first.equals(threaded)
+    assert not first["pvalue"].equals(other["pvalue"])
+    assert (first["pvalue"] >= 1 / 1000).all()
+    assert (first["ci_low"] < first["statistic"]).all()
+    assert (first["statistic"] < first["ci_high"]).all()
+    assert first["label"][0].endswith(f"[{first['ci_low'][0]:.3g}, {first['ci_high'][0]:.3g}]")
+
+
+def test_bracket_resampling_validation():
+    frame = pl.DataFrame({"group": ["a", "a", "b", "b"], "value": [1.0, 1.1, 2.0, 2.1]})
+    with pytest.raises(ValueError, match="n_resamples"):
+        _compute_bracket_frame(frame, **_bracket_kwargs(n_resamples=0))
+    with pytest.raises(ValueError, match="`ci`"):
+        _compute_bracket_frame(frame, **_bracket_kwargs(ci=1.5))
+    with pytest.raises(ValueError, match="needs a confidence level"):
+        _compute_bracket_frame(frame, **_bracket_kwargs(label="ci"))
+
+
+def test_bracket_rejects_unknown_alternative():
+    frame = pl.DataFrame({"group": ["a", "a", "b", "b"], "value": [1.0, 1.1, 2.0, 2.1]})
+    plot = ggplot(frame) + geom_point(aes(x="group", y="value"))
+    with pytest.raises(ValueError, match="alternative"):
+        _ = plot + cl.bracket(alternative="bigger")
+
+
+def test_bracket_is_added_to_every_panel_of_a_grid(adata, group_key):
+    grid = cl.violins(adata, keys=["CD3D", "CD14"], fill=group_key)
+    combined = grid + cl.bracket()
+
+    assert isinstance(combined, SupPlotsSpec)
+    for index in range(2):
+        layers = cl.get_figure(combined, index).as_dict()["layers"]
+        assert layers[-1]["geom"] == "bracket"
+        assert len(layers) == len(cl.get_figure(grid, index).as_dict()["layers"]) + 1
+
+
+def test_deferred_layer_keeps_the_grid_layout(adata, group_key, monkeypatch):
+    grid = cl.violins(adata, keys=["CD3D", "CD14"], fill=group_key, ncol=1, heights=[1, 2])
+    combined = grid + cl.bracket()
+    assert combined.as_dict()["layout"] == grid.as_dict()["layout"]
+
+    # a spec without a layout falls back to the default grid
+    as_dict = SupPlotsSpec.as_dict
+
+    def without_layout(self):
+        spec = as_dict(self)
+        spec.pop("layout")
+        return spec
+
+    monkeypatch.setattr(SupPlotsSpec, "as_dict", without_layout)
+    fallback = grid + cl.bracket()
+    assert len(cl.get_figures(fallback, [0, 1]).as_dict()["figures"]) == 2
+
+
 def test_stream_requires_velocity(adata):
     # pbmc3k fixture has no velocity columns; stream should raise at `+` time.
     umap = cl.umap(adata)
@@ -502,28 +707,116 @@ def test_stream_velocity_key_requires_dimension_numbers():
         _ = plot + cl.stream(velocity_key="velocity_")
 
 
-def test_stream_builds_layers_with_mocked_velocity_grid(monkeypatch):
-    frame = pl.DataFrame(
+def _rotating_frame(n_obs: int = 600) -> pl.DataFrame:
+    rng = np.random.default_rng(0)
+    coordinates = rng.uniform(-1.0, 1.0, size=(n_obs, 2))
+    return pl.DataFrame(
         {
-            "X_UMAP1": [0.0, 0.0, 1.0, 1.0],
-            "X_UMAP2": [0.0, 1.0, 0.0, 1.0],
-            "VELOCITY_UMAP1": [0.2, 0.2, 0.2, 0.2],
-            "VELOCITY_UMAP2": [0.1, 0.1, 0.1, 0.1],
+            "X_UMAP1": coordinates[:, 0],
+            "X_UMAP2": coordinates[:, 1],
+            "VELOCITY_UMAP1": -coordinates[:, 1],
+            "VELOCITY_UMAP2": coordinates[:, 0],
         }
     )
-    plot = ggplot(frame) + geom_point(aes(x="X_UMAP1", y="X_UMAP2"))
 
-    def compute_velocity_on_grid(**kwargs):
-        grid = np.linspace(0.0, 1.0, 5)
-        velocity = np.ones((5, 5))
-        return (grid, grid), (velocity, velocity)
 
-    fake_module = types.SimpleNamespace(compute_velocity_on_grid=compute_velocity_on_grid)
-    monkeypatch.setitem(sys.modules, "scvelo.plotting.velocity_embedding_grid", fake_module)
+def test_stream_builds_path_and_arrow_layers():
+    plot = ggplot(_rotating_frame()) + geom_point(aes(x="X_UMAP1", y="X_UMAP2"))
 
     combined = plot + cl.stream(arrow_kwargs={"alpha": 0.5}, density=0.5)
 
     assert isinstance(combined, PlotSpec)
+    paths, arrows = combined.as_dict()["layers"][-2:]
+    assert paths["geom"] == "path"
+    assert arrows["geom"] == "segment"
+    n_lines = len(set(paths["data"]["group"]))
+    assert n_lines > 0
+    assert len(arrows["data"]["group"]) == n_lines
+    assert arrows["alpha"] == 0.5
+
+
+@pytest.mark.parametrize("integration_direction", ["both", "forward", "backward"])
+@pytest.mark.parametrize("density", [1, (0.5, 1.5)])
+def test_streamlines_match_matplotlib_streamplot(integration_direction, density):
+    pytest.importorskip("matplotlib")
+    from matplotlib.figure import Figure
+
+    frame = _rotating_frame()
+    x_axis, y_axis, u, v = _velocity_grid(
+        frame.select("X_UMAP1", "X_UMAP2").to_numpy(),
+        frame.select("VELOCITY_UMAP1", "VELOCITY_UMAP2").to_numpy(),
+        n_neighbors=30,
+    )
+
+    axes = Figure().add_subplot(1, 1, 1)
+    reference = axes.streamplot(
+        x_axis,
+        y_axis,
+        u,
+        v,
+        density=density,
+        maxlength=4,
+        integration_direction=integration_direction,
+    )
+    points, lengths = _streamlines(
+        x_axis,
+        y_axis,
+        u,
+        v,
+        density=density,
+        max_length=4,
+        integration_direction=integration_direction,
+    )
+
+    expected = [path.vertices for path in reference.lines.get_paths()]
+    assert [len(line) for line in expected] == lengths.tolist()
+    np.testing.assert_allclose(points, np.concatenate(expected), atol=1e-9)
+
+
+def test_velocity_grid_smooths_and_masks_slow_regions():
+    rng = np.random.default_rng(1)
+    coordinates = rng.uniform(0.0, 1.0, size=(2000, 2))
+    velocities = np.tile([2.0, 1.0], (2000, 1))
+    velocities[coordinates[:, 0] < 0.3] = 0.0
+
+    x_axis, _, u, v = _velocity_grid(
+        coordinates, velocities, grid_density=0.5, cutoff_percentile=40
+    )
+
+    assert x_axis.shape == (25,)
+    assert u.shape == v.shape == (25, 25)
+    moving = np.isfinite(u) & (x_axis[None, :] > 0.5)
+    assert moving.any()
+    np.testing.assert_allclose(u[moving], 2 * v[moving])
+    assert np.isnan(u[:, x_axis < 0.2]).all()
+
+
+def test_streamlines_drop_seeds_that_record_nothing(monkeypatch):
+    from cellestial.layers import _streamlines as streamlines_module
+
+    integrate = streamlines_module._integrate
+
+    def without_second_seed(*args, **kwargs):
+        # as for a seed rounded just outside the grid: no events at all
+        trajectory, *columns = integrate(*args, **kwargs)
+        kept = trajectory != 1
+        return (trajectory[kept], *(column[kept] for column in columns))
+
+    monkeypatch.setattr(streamlines_module, "_integrate", without_second_seed)
+    axis = np.linspace(0.0, 1.0, 20)
+    # upward flow: the first seed runs up the left edge, leaving the second free
+    points, lengths = _streamlines(axis, axis, np.zeros((20, 20)), np.ones((20, 20)))
+
+    assert (lengths > 1).all()
+    assert len(points) == lengths.sum()
+
+
+def test_streamlines_reject_unknown_direction():
+    axis = np.linspace(0.0, 1.0, 5)
+    field = np.ones((5, 5))
+
+    with pytest.raises(ValueError, match="integration_direction"):
+        _streamlines(axis, axis, field, field, integration_direction="sideways")
 
 
 def _adata_with_velocity(adata):
@@ -544,19 +837,11 @@ def test_umap_frame_includes_unplotted_velocity_embedding(adata):
     assert {"VELOCITY_UMAP1", "VELOCITY_UMAP2"} <= set(frame.columns)
 
 
-def test_stream_builds_on_umap_with_velocity_embedding(adata, monkeypatch):
+def test_stream_builds_on_umap_with_velocity_embedding(adata):
     # End-to-end mirror of the reported failure: `cl.umap(...) + cl.stream()`
     # must resolve velocity columns from the umap frame without raising.
     data = _adata_with_velocity(adata)
     umap = cl.umap(data, tooltips="none")
 
-    def compute_velocity_on_grid(**kwargs):
-        grid = np.linspace(0.0, 1.0, 5)
-        velocity = np.ones((5, 5))
-        return (grid, grid), (velocity, velocity)
-
-    fake_module = types.SimpleNamespace(compute_velocity_on_grid=compute_velocity_on_grid)
-    monkeypatch.setitem(sys.modules, "scvelo.plotting.velocity_embedding_grid", fake_module)
-
     combined = umap + cl.stream()
     assert isinstance(combined, PlotSpec)
@@ -1,26 +1,35 @@
+import importlib
 from types import SimpleNamespace
 
+import dask.dataframe as dd
 import geopandas as gpd
 import numpy as np
 import pandas as pd
 import pytest
+import shapely
 from anndata import AnnData
 from lets_plot.plot.core import PlotSpec
 from lets_plot.plot.subplots import SupPlotsSpec
+from scipy import sparse
 from shapely.geometry import MultiPolygon, Point
-from spatialdata import SpatialData
-from spatialdata.models import Image2DModel, ShapesModel, TableModel
-from spatialdata.transformations import Identity, set_transformation
+from spatialdata import SpatialData, transform
+from spatialdata.models import Image2DModel, PointsModel, ShapesModel, TableModel
+from spatialdata.transformations import Affine, Identity, Scale, set_transformation
 from xarray import DataArray
 
 import cellestial as cl
+from cellestial.spatial._bins import _aggregate_bins
+from cellestial.spatial._image import _prepare_image
+from cellestial.spatial._raster import _scanline_fill
 from cellestial.spatial.utilities import (
     _image_to_yxc,
+    _polygon_vertex_frame,
     _resolve_coordinate_system,
     _resolve_image_name,
     _resolve_table,
     _select_one,
     _spatial_components,
+    _spatialdata_components,
 )
 
 # ---- fixtures ----
@@ -237,6 +246,29 @@ def test_spatials_sdata_returns_subplots(data_minimal):
     assert isinstance(plot, SupPlotsSpec)
 
 
+def test_spatials_resolves_components_once(data_minimal, monkeypatch):
+    spatials_module = importlib.import_module("cellestial.spatial.spatials")
+
+    calls = []
+    resolve = spatials_module._spatial_components
+
+    def counting(*args, **kwargs):
+        calls.append(kwargs)
+        return resolve(*args, **kwargs)
+
+    monkeypatch.setattr(spatials_module, "_spatial_components", counting)
+    plot = cl.spatials(data_minimal, ["cluster", "GENE_A", "n_counts"])
+
+    assert len(calls) == 1
+    panels = [figure.as_dict() for figure in vars(plot)["_SupPlotsSpec__figures"]]
+    images = [
+        next(layer for layer in panel["layers"] if layer["geom"] == "image")["href"]
+        for panel in panels
+    ]
+    assert len(images) == 3
+    assert all(href is images[0] for href in images)
+
+
 def test_spatials_sdata_with_selection_kwargs(data_multi):
     plot = cl.spatials(
         data_multi,
@@ -531,7 +563,7 @@ def test_spatial_components_falls_back_to_available_image():
     }
 
     with pytest.warns(cl.util.errors.CellestialWarning, match="using `hires` instead"):
-        image_array, spot_coordinates, _, _ = _spatial_components(
+        image_array, _, spot_coordinates, _, _ = _spatial_components(
             data,
             library_id=None,
             image_key="lowres",
@@ -574,6 +606,97 @@ def test_spatial_components_anndata_errors():
         )
 
 
+def _two_libraries() -> AnnData:
+    n = 6
+    rng = np.random.default_rng(17)
+    data = AnnData(
+        X=rng.random((n, 2)).astype("float32"),
+        obs=pd.DataFrame(
+            {
+                "score": np.arange(n, dtype=float),
+                "library_id": ["a", "a", "a", "b", "b", "b"],
+            },
+            index=[f"c{i}" for i in range(n)],
+        ),
+        var=pd.DataFrame(index=["G1", "G2"]),
+    )
+    data.obsm["spatial"] = rng.random((n, 2)).astype("float32")
+    data.uns["spatial"] = {
+        library: {
+            "images": {"lowres": rng.random((4, 4, 3)).astype("float32")},
+            "scalefactors": {"tissue_lowres_scalef": 1.0},
+        }
+        for library in ("a", "b")
+    }
+    return data
+
+
+def test_spatial_plots_only_the_selected_library():
+    data = _two_libraries()
+    *_, spot_coordinates, _, table = _spatial_components(
+        data, library_id="b", image_key="lowres", image=False, spatial_key="spatial"
+    )
+    assert list(table.obs_names) == ["c3", "c4", "c5"]
+    np.testing.assert_allclose(spot_coordinates, data.obsm["spatial"][3:])
+
+    *_, table = _spatial_components(
+        data,
+        library_id="b",
+        library_key=None,
+        image_key="lowres",
+        image=False,
+        spatial_key="spatial",
+    )
+    assert table.n_obs == 6
+
+    plot = cl.spatial(data, key="score", library_id="b").as_dict()
+    assert sorted(plot["data"]["score"]) == [3.0, 4.0, 5.0]
+
+
+def test_spatial_narrows_a_whole_object_frame_to_the_library():
+    data = _two_libraries()
+    frame = cl.build_frame(data, axis=0, observations_name="Barcode")
+
+    plot = cl.spatial(data, key="score", library_id="b", frame=frame).as_dict()
+    assert plot["data"]["Barcode"].to_list() == ["c3", "c4", "c5"]
+    np.testing.assert_allclose(
+        plot["data"].select("spatial_x", "spatial_y").to_numpy(), data.obsm["spatial"][3:]
+    )
+
+    with pytest.raises(ValueError, match="one row per observation"):
+        cl.spatial(data, key="score", library_id="b", frame=frame.head(4))
+
+
+def test_spatials_library_panels_share_one_frame(monkeypatch):
+    spatials_module = importlib.import_module("cellestial.spatial.spatials")
+    data = _two_libraries()
+
+    calls = []
+    build = spatials_module.build_frame
+
+    def counting(*args, **kwargs):
+        calls.append(kwargs)
+        return build(*args, **kwargs)
+
+    monkeypatch.setattr(spatials_module, "build_frame", counting)
+    plot = cl.spatials(data, ["score", "G1"], library_ids="all")
+
+    assert len(calls) == 1
+    panels = [figure.as_dict() for figure in vars(plot)["_SupPlotsSpec__figures"]]
+    assert [panel["ggtitle"]["text"] for panel in panels] == ["a", "b", "a", "b"]
+    scores = [sorted(panel["data"]["score"]) for panel in panels[:2]]
+    assert scores == [[0.0, 1.0, 2.0], [3.0, 4.0, 5.0]]
+    images = [
+        next(layer for layer in panel["layers"] if layer["geom"] == "image")["href"]
+        for panel in panels
+    ]
+    assert images[0] is images[2]
+    assert images[0] != images[1]
+
+    with pytest.raises(TypeError, match="library_ids"):
+        cl.spatials(SimpleNamespace(), ["score"], library_ids="all")
+
+
 # ---- build_frame() with SpatialData ----
 
 
@@ -625,6 +748,490 @@ def test_image_to_yxc_dataarray_channel_handling():
     assert _image_to_yxc(already_yx).shape == (4, 5)
 
 
+def test_prepare_image_downscales_and_converts_in_tiles(monkeypatch):
+    image_module = importlib.import_module("cellestial.spatial._image")
+    monkeypatch.setattr(image_module, "_TILE_PIXELS", 64)
+    rng = np.random.default_rng(18)
+    image = rng.integers(0, 256, size=(41, 30, 4), dtype=np.uint8)
+
+    same, extent, stretched = _prepare_image(
+        image,
+        None,
+        channels=None,
+        greyscale=False,
+        percentiles=None,
+        vmin=None,
+        vmax=None,
+        resolution=41,
+    )
+    assert same is image
+    assert extent is None
+    assert not stretched
+
+    grey, extent, _ = _prepare_image(
+        image,
+        None,
+        channels=None,
+        greyscale=True,
+        percentiles=None,
+        vmin=None,
+        vmax=None,
+        resolution=10,
+    )
+    blocks = np.pad(image[..., :3].astype(float), ((0, 3), (0, 2), (0, 0)), constant_values=np.nan)
+    means = np.nanmean(blocks.reshape(11, 4, 8, 4, 3), axis=(1, 3))
+    assert grey.dtype == np.uint8
+    assert grey.shape == (11, 8)
+    np.testing.assert_allclose(grey, means @ [0.2126, 0.7152, 0.0722], atol=1.5)
+    assert extent == pytest.approx([-0.5, 31.5, -0.5, 43.5])
+
+    channel, *_ = _prepare_image(
+        image,
+        [0, 10, 40, 60],
+        channels=1,
+        greyscale=True,
+        percentiles=None,
+        vmin=None,
+        vmax=None,
+        resolution=100,
+    )
+    np.testing.assert_array_equal(channel, image[..., 1])
+
+    stretched_image, _, stretched = _prepare_image(
+        image,
+        None,
+        channels=[2, 1, 0],
+        greyscale=False,
+        percentiles=(5, 95),
+        vmin=None,
+        vmax=None,
+        resolution=100,
+    )
+    low, high = np.percentile(image[..., :3], [5, 95], method="inverted_cdf")
+    assert stretched
+    assert stretched_image.shape == (41, 30, 3)
+    expected = np.clip(
+        np.rint((image[..., [2, 1, 0]].astype(float) - low) * 255 / (high - low)), 0, 255
+    )
+    np.testing.assert_array_equal(stretched_image, expected)
+
+    with pytest.raises(ValueError, match="3 \\(RGB\\)"):
+        _prepare_image(
+            image,
+            None,
+            channels=[0, 1],
+            greyscale=False,
+            percentiles=None,
+            vmin=None,
+            vmax=None,
+            resolution=10,
+        )
+    with pytest.raises(ValueError, match="out of range"):
+        _prepare_image(
+            image,
+            None,
+            channels=4,
+            greyscale=False,
+            percentiles=None,
+            vmin=None,
+            vmax=None,
+            resolution=10,
+        )
+    with pytest.raises(ValueError, match="image_percentiles"):
+        _prepare_image(
+            image,
+            None,
+            channels=None,
+            greyscale=False,
+            percentiles=(90, 10),
+            vmin=None,
+            vmax=None,
+            resolution=10,
+        )
+
+
+def test_spatial_image_percentiles_stretch_float_images():
+    data = _visium_like({"tissue_lowres_scalef": 0.5})
+    data.uns["spatial"]["lib"]["images"]["lowres"] = np.linspace(0.2, 0.4, 16).reshape(4, 4)
+
+    plot = cl.spatial(data, image_percentiles=(0, 100), vmax=0.3, cmap="viridis")
+    imshow = next(layer for layer in plot.as_dict()["layers"] if layer["geom"] == "image")
+    assert imshow["geom"] == "image"
+
+
+def test_spatial_points_density_streams_partitions(data_minimal, monkeypatch):
+    points_module = importlib.import_module("cellestial.spatial._points")
+    rng = np.random.default_rng(19)
+    transcripts = pd.DataFrame(
+        {
+            "x": rng.uniform(0, 32, 500),
+            "y": rng.uniform(0, 32, 500),
+            "gene": pd.Categorical(rng.choice(["GENE_A", "GENE_B", "GENE_C"], 500)),
+        }
+    )
+    points = PointsModel.parse(
+        dd.from_pandas(transcripts, npartitions=4),
+        feature_key="gene",
+        transformations={"global": Scale([0.5, 0.5], axes=("x", "y"))},
+    )
+    data = SpatialData(
+        images=data_minimal.images,
+        shapes=data_minimal.shapes,
+        tables=data_minimal.tables,
+        points={"transcripts": points},
+    )
+
+    sizes = []
+    density = points_module._points_density
+
+    def recording(elem, **kwargs):
+        sizes.append(elem.npartitions)
+        return density(elem, **kwargs)
+
+    monkeypatch.setattr(points_module, "_points_density", recording)
+    plot = cl.spatial(
+        data, points_name="transcripts", genes=["GENE_A", "GENE_B"], image_resolution=8
+    ).as_dict()
+    assert sizes == [4]
+    assert plot["guides"]["paint_c"]["title"] == "GENE_A, GENE_B"
+    assert [layer["geom"] for layer in plot["layers"]][:2] == ["image", "image"]
+
+    selected = transcripts[transcripts["gene"].isin(["GENE_A", "GENE_B"])]
+    counts, extent = density(
+        points,
+        matrix=np.diag([0.5, 0.5, 1.0]),
+        genes=["GENE_A", "GENE_B"],
+        feature_key="gene",
+        bounds=(0.0, 0.0, 16.0, 8.0),
+        resolution=8,
+    )
+    expected, *_ = np.histogram2d(
+        selected["y"] / 2, selected["x"] / 2, bins=(4, 8), range=((0, 8), (0, 16))
+    )
+    assert extent == pytest.approx([0.0, 16.0, 0.0, 8.0])
+    np.testing.assert_array_equal(counts, expected)
+
+    with pytest.raises(KeyError, match="points element"):
+        cl.spatial(data, points_name="missing")
+    with pytest.raises(TypeError, match="points_name"):
+        cl.spatial(_visium_like({}), points_name="transcripts", image=False)
+
+
+def _visium_hd(side: int = 8) -> AnnData:
+    rows, cols = np.divmod(np.arange(side * side), side)
+    rng = np.random.default_rng(20)
+    data = AnnData(
+        X=sparse.csr_matrix(rng.integers(0, 3, size=(side * side, 2)).astype("float32")),
+        obs=pd.DataFrame(
+            {
+                "array_row": rows,
+                "array_col": cols,
+                "cluster": pd.Categorical(np.where(cols < side // 2 + 1, "left", "right")),
+                "score": rows.astype(float),
+            },
+            index=[f"s_002um_{row:05d}_{col:05d}-1" for row, col in zip(rows, cols, strict=True)],
+        ),
+        var=pd.DataFrame(index=["G1", "G2"]),
+    )
+    data.obsm["spatial"] = np.column_stack([cols * 10.0, rows * 10.0])
+    return data
+
+
+def test_spatial_merges_visium_hd_bins():
+    data = _visium_hd()
+    binned, coordinates, size = _aggregate_bins(
+        data, data.obsm["spatial"], bin_size=8, aggregate="sum", resolution=1200
+    )
+    assert size == 8
+    assert binned.n_obs == 4
+    assert list(binned.obs_names) == [
+        "s_008um_00000_00000",
+        "s_008um_00000_00001",
+        "s_008um_00001_00000",
+        "s_008um_00001_00001",
+    ]
+    first = (data.obs["array_row"] < 4) & (data.obs["array_col"] < 4)
+    np.testing.assert_allclose(
+        binned.X[0].toarray().ravel(), data.X[first.to_numpy()].sum(axis=0).A1
+    )
+    np.testing.assert_allclose(coordinates[0], [15.0, 15.0])
+    assert list(binned.obs["cluster"]) == ["left", "right", "left", "right"]
+    np.testing.assert_allclose(binned.obs["score"], [1.5, 1.5, 5.5, 5.5])
+
+    # 'auto' coarsens to a power of two of the 2 µm bins for the output size
+    *_, size = _aggregate_bins(
+        data, data.obsm["spatial"], bin_size="auto", aggregate="mean", resolution=12
+    )
+    assert size == 8
+
+    plot = cl.spatial(data, key="G1", image=False, bin_size=16).as_dict()
+    assert plot["caption"]["text"] == "16 µm bins"
+    assert len(plot["data"]["G1"]) == 1
+
+    with pytest.raises(ValueError, match="multiple of the 2 µm bins"):
+        cl.spatial(data, image=False, bin_size=3)
+    with pytest.raises(ValueError, match="grid columns"):
+        cl.spatial(_visium_like({}), image=False, bin_size=8)
+
+
+def test_spatial_smoothing_averages_neighbourhoods_once(monkeypatch):
+    smoothing_module = importlib.import_module("cellestial.spatial._smoothing")
+    data = _visium_hd(6)
+    data.obs["score"] = np.arange(36, dtype=float)
+    data.obs.loc[data.obs_names[7], "score"] = np.nan
+    # jitter the grid so nearest neighbours are never tied
+    data.obsm["spatial"] = data.obsm["spatial"] + np.random.default_rng(21).uniform(
+        -0.1, 0.1, size=(36, 2)
+    )
+    coordinates = data.obsm["spatial"]
+
+    trees = []
+    tree_type = smoothing_module.cKDTree
+
+    def counting(*args, **kwargs):
+        trees.append(args)
+        return tree_type(*args, **kwargs)
+
+    monkeypatch.setattr(smoothing_module, "cKDTree", counting)
+    monkeypatch.setattr(
+        smoothing_module, "_SMOOTHING_CACHE", type(smoothing_module._SMOOTHING_CACHE)()
+    )
+
+    plot = cl.spatial(data, key="score", image=False, smooth_radius=10.5).as_dict()
+    distances = np.linalg.norm(coordinates[:, None] - coordinates[None], axis=-1)
+    score = data.obs["score"].to_numpy()
+    expected = [np.nanmean(score[row <= 10.5]) for row in distances]
+    np.testing.assert_allclose(plot["data"]["score"], expected)
+
+    # all keys of all panels share the weights; the same coordinates hit the cache
+    cl.spatials(data, ["score", "G1", "G2", "cluster"], image=False, smooth_radius=10.5)
+    assert len(trees) == 1
+
+    plot = cl.spatial(data, key="G1", image=False, smooth_k=3).as_dict()
+    nearest = np.argsort(distances, axis=1, kind="stable")[:, :3]
+    g1 = data.X[:, 0].toarray().ravel()
+    np.testing.assert_allclose(plot["data"]["G1"], g1[nearest].mean(axis=1))
+
+    with pytest.raises(ValueError, match="not both"):
+        cl.spatial(data, key="score", image=False, smooth_radius=1, smooth_k=3)
+
+
+def _multiscale_data(data, *, scale=None):
+    """Swap the image of `data` for a 3-level pyramid, optionally scaled to the system."""
+    rng = np.random.default_rng(3)
+    image = Image2DModel.parse(
+        rng.random((3, 64, 48)).astype("float32"),
+        dims=("c", "y", "x"),
+        scale_factors=[2, 2],
+        transformations=None if scale is None else {"global": scale},
+    )
+    return SpatialData(images={"img": image}, shapes=data.shapes, tables=data.tables)
+
+
+def test_spatial_loads_the_coarsest_sufficient_pyramid_level(data_minimal):
+    data = _multiscale_data(data_minimal)
+    image_array, image_extent, *_ = _spatial_components(
+        data,
+        library_id=None,
+        image_key="hires",
+        image=True,
+        spatial_key="spatial",
+        image_resolution=20,
+    )
+    assert image_array.shape == (32, 24, 3)
+    assert image_extent == pytest.approx([-0.5, 47.5, -0.5, 63.5])
+
+    # no level is large enough: the finest one is drawn at its own pixel size
+    image_array, image_extent, *_ = _spatial_components(
+        data,
+        library_id=None,
+        image_key="hires",
+        image=True,
+        spatial_key="spatial",
+    )
+    assert image_array.shape == (64, 48, 3)
+    assert image_extent is None
+
+    # the level is chosen for the window, not the whole image
+    image_array, image_extent, *_ = _spatial_components(
+        data,
+        library_id=None,
+        image_key="hires",
+        image=True,
+        spatial_key="spatial",
+        image_resolution=16,
+        region=(0, 0, 32, 32),
+    )
+    assert image_array.shape == (16, 16, 3)
+    assert image_extent == pytest.approx([-0.5, 31.5, -0.5, 31.5])
+
+    plot = cl.spatial(data, key="cluster", image_resolution=10)
+    imshow = next(layer for layer in plot.as_dict()["layers"] if layer["geom"] == "image")
+    assert (imshow["xmin"], imshow["xmax"]) == pytest.approx((-0.5, 47.5))
+    assert (imshow["ymin"], imshow["ymax"]) == pytest.approx((-0.5, 63.5))
+
+
+def test_pyramid_level_extent_follows_the_transformation(data_minimal):
+    data = _multiscale_data(data_minimal, scale=Scale([3.0, 3.0], axes=("x", "y")))
+    image_array, image_extent, *_ = _spatial_components(
+        data,
+        library_id=None,
+        image_key="hires",
+        image=True,
+        spatial_key="spatial",
+        image_resolution=90,
+    )
+    # levels are loaded at their own size, the scale folded into the extent:
+    # none of 64x48, 32x24, 16x12 reaches 90 px, so the finest is drawn
+    assert image_array.shape == (64, 48, 3)
+    assert image_extent == pytest.approx([-0.5, 143.5, -0.5, 191.5])
+
+    image_array, image_extent, *_ = _spatial_components(
+        data,
+        library_id=None,
+        image_key="hires",
+        image=True,
+        spatial_key="spatial",
+        image_resolution=30,
+    )
+    assert image_array.shape == (32, 24, 3)
+    assert image_extent == pytest.approx([-0.5, 143.5, -0.5, 191.5])
+
+
+def test_spatial_components_place_elements_by_their_affine(data_minimal, monkeypatch):
+    theta = np.pi / 6
+    rotation = Affine(
+        np.array(
+            [
+                [np.cos(theta), -np.sin(theta), 4.0],
+                [np.sin(theta), np.cos(theta), -2.0],
+                [0.0, 0.0, 1.0],
+            ]
+        ),
+        input_axes=("x", "y"),
+        output_axes=("x", "y"),
+    )
+    shapes = data_minimal.shapes["spots"]
+    set_transformation(shapes, rotation, to_coordinate_system="global")
+    expected = transform(shapes, to_coordinate_system="global").geometry
+
+    def no_copies(*args, **kwargs):
+        raise AssertionError
+
+    with monkeypatch.context() as patch:
+        patch.setattr(SpatialData, "transform_element_to_coordinate_system", no_copies)
+        image_array, image_extent, spot_coordinates, *_ = _spatial_components(
+            data_minimal,
+            library_id=None,
+            image_key="hires",
+            image=True,
+            spatial_key="spatial",
+        )
+    np.testing.assert_allclose(spot_coordinates, np.column_stack([expected.x, expected.y]))
+    assert image_array.shape == (32, 32, 3)
+    assert image_extent is None
+
+    # a rotated image cannot be placed by its extent and is resampled
+    set_transformation(data_minimal.images["img"], rotation, to_coordinate_system="global")
+    image_array, image_extent, *_ = _spatial_components(
+        data_minimal,
+        library_id=None,
+        image_key="hires",
+        image=True,
+        spatial_key="spatial",
+    )
+    assert image_array.shape != (32, 32, 3)
+    assert image_extent is not None
+
+
+def test_spatial_region_reads_only_the_window(data_minimal):
+    image_array, image_extent, spot_coordinates, _, table = _spatial_components(
+        data_minimal,
+        library_id=None,
+        image_key="hires",
+        image=True,
+        spatial_key="spatial",
+        region=(4, 6, 16, 22),
+    )
+    assert table.obs_names.tolist() == ["c1", "c2", "c3"]
+    np.testing.assert_allclose(spot_coordinates, [[5, 7], [10, 14], [15, 21]])
+    assert image_array.shape == (16, 12, 3)
+    assert image_extent == pytest.approx([3.5, 15.5, 5.5, 21.5])
+
+    plot = cl.spatial(data_minimal, key="GENE_A", region=(4, 6, 16, 22))
+    spec = plot.as_dict()
+    assert spec["data"].height == 3
+    coord = spec["coord"]
+    assert (coord["xlim"], coord["ylim"]) == ([4, 16], [6, 22])
+
+    # a window beside the image keeps the spots and drops the image
+    image_array, *_, table = _spatial_components(
+        data_minimal,
+        library_id=None,
+        image_key="hires",
+        image=True,
+        spatial_key="spatial",
+        region=(40, 40, 60, 60),
+    )
+    assert image_array is None
+    assert table.n_obs == 0
+
+
+def test_spatial_region_selects_polygons_and_anndata_spots(data_polygons):
+    plot = cl.spatial(data_polygons, key="score", polygon=True, region=(4, 4, 12, 12))
+    assert sorted(plot.as_dict()["data"]["instance_id"].unique()) == [1, 2]
+
+    adata = AnnData(
+        X=np.ones((4, 1), dtype="float32"),
+        obs=pd.DataFrame(index=[f"c{i}" for i in range(4)]),
+        var=pd.DataFrame(index=["G1"]),
+    )
+    adata.obsm["spatial"] = np.array([[0.0, 0.0], [2.0, 3.0], [5.0, 5.0], [9.0, 1.0]])
+    *_, spot_coordinates, _, table = _spatial_components(
+        adata,
+        library_id=None,
+        image_key="hires",
+        image=True,
+        spatial_key="spatial",
+        region=(1, 1, 6, 6),
+    )
+    assert table.obs_names.tolist() == ["c1", "c2"]
+    np.testing.assert_allclose(spot_coordinates, [[2, 3], [5, 5]])
+    assert cl.spatials(adata, keys=["G1"], region=(1, 1, 6, 6)) is not None
+
+    with pytest.raises(ValueError, match="x0 < x1"):
+        cl.spatial(adata, region=(6, 1, 1, 6))
+    with pytest.raises(ValueError, match="4 numbers"):
+        cl.spatial(adata, region=(1, 1, 6))
+
+
+def test_spatial_region_subsets_polygon_tables_without_instance_key(data_polygons):
+    def components(data):
+        return _spatialdata_components(
+            data,
+            table_name=None,
+            image_name=None,
+            shapes_name=None,
+            coordinate_system=None,
+            image=False,
+            polygon=True,
+            region=(4, 4, 12, 12),
+        )
+
+    # a table indexed like its shapes is subset by position
+    table = data_polygons.tables["table"]
+    table.uns.pop("spatialdata_attrs")
+    table.obs_names = ["0", "1", "2"]
+    *_, polygon_frame, subset = components(data_polygons)
+    assert subset.obs_names.tolist() == ["1", "2"]
+    assert sorted(polygon_frame["instance_id"].unique()) == [1, 2]
+
+    table.obs_names = ["c0", "c1", "c2"]
+    with pytest.warns(cl.util.errors.CellestialWarning, match="`region` is not applied"):
+        *_, unsubset = components(data_polygons)
+    assert unsubset.n_obs == 3
+
+
 # ---- Visium HD-style multi-coordinate-system layout ----
 
 
@@ -781,6 +1388,77 @@ def test_polygon_true_emits_geom_polygon(data_polygons):
     assert "point" not in _layer_geoms(plot)
 
 
+def test_polygon_simplify_thins_outlines_and_drops_small_cells(data_polygons):
+    shapes = data_polygons.shapes["polys"]
+    full = _polygon_vertex_frame(shapes)
+    assert full.height == 3 * 65
+    assert full["instance_id"].unique().sort().to_list() == [0, 1, 2]
+
+    thinned = _polygon_vertex_frame(shapes, tolerance=0.2)
+    assert 3 * 4 <= thinned.height < full.height
+    assert not thinned["centroid"].any()
+
+    dropped = _polygon_vertex_frame(shapes, tolerance=5.0)
+    assert dropped["centroid"].all()
+    np.testing.assert_allclose(dropped["polygon_x"], [0, 5, 10], atol=1e-9)
+
+    plot = cl.spatial(data_polygons, key="score", polygon=True, simplify=5.0)
+    assert _layer_geoms(plot) == ["polygon", "point"]
+    assert plot.as_dict()["layers"][1]["data"].height == 3
+
+    # one output pixel is the 12-unit wide view over `image_resolution`
+    plot = cl.spatial(data_polygons, key="score", polygon=True, simplify=True, image_resolution=4)
+    assert plot.as_dict()["layers"][1]["data"].height == 3
+    plot = cl.spatial(data_polygons, key="score", polygon=True, simplify=True)
+    assert _layer_geoms(plot) == ["polygon"]
+
+    with pytest.raises(ValueError, match="positive tolerance"):
+        cl.spatial(data_polygons, key="score", polygon=True, simplify=-1.0)
+
+
+def test_scanline_fill_matches_point_in_polygon():
+    rng = np.random.default_rng(4)
+    polygons = [Point(*rng.random(2) * 40).buffer(rng.uniform(2, 8)) for _ in range(12)]
+    polygons[0] = polygons[0].difference(polygons[0].centroid.buffer(1.5))
+    shapes = gpd.GeoDataFrame(geometry=polygons)
+    vertices = _polygon_vertex_frame(shapes)
+
+    label, extent = _scanline_fill(
+        vertices["polygon_x"].to_numpy(),
+        vertices["polygon_y"].to_numpy(),
+        vertices["instance_id"].rle_id().to_numpy(),
+        bounds=(0, 0, 50, 40),
+        resolution=100,
+    )
+    assert label.shape == (80, 100)
+    assert extent == pytest.approx([0, 50, 0, 40])
+
+    centre_x, centre_y = np.meshgrid(np.arange(100) * 0.5 + 0.25, np.arange(80) * 0.5 + 0.25)
+    expected = np.full(label.shape, -1)
+    for index, polygon in enumerate(polygons):
+        expected[shapely.contains_xy(polygon, centre_x, centre_y)] = index
+    np.testing.assert_array_equal(label, expected)
+
+
+@pytest.mark.parametrize("key", ["cluster", "score"])
+def test_polygon_raster_render_draws_an_image_and_keeps_the_legend(data_polygons, key):
+    plot = cl.spatial(data_polygons, key=key, polygon=True, render="raster", image_resolution=60)
+    spec = plot.as_dict()
+    assert _layer_geoms(plot) == ["image", "point"]
+    assert "data" not in spec or len(spec["data"]) == 0
+    proxy = spec["layers"][1]
+    assert proxy["alpha"] == 0
+    fill_scales = [scale for scale in spec["scales"] if scale["aesthetic"] == "fill"]
+    assert len(fill_scales) == 1
+    if key == "cluster":
+        assert fill_scales[0]["limits"] == ["a", "b"]
+    else:
+        assert len(fill_scales[0]["colors"]) > 2
+
+    with pytest.raises(ValueError, match="render"):
+        cl.spatial(data_polygons, key=key, polygon=True, render="svg")
+
+
 def test_polygon_false_on_polygon_shapes_emits_geom_point(data_polygons):
     plot = cl.spatial(data_polygons, key="cluster")
     assert "point" in _layer_geoms(plot)
@@ -1,6 +1,6 @@
 import polars as pl
 import pytest
-from lets_plot import ggplot
+from lets_plot import aes, geom_point, ggplot, scale_color_hue
 from lets_plot.plot.core import PlotSpec
 from lets_plot.plot.subplots import SupPlotsSpec
 
@@ -27,6 +27,41 @@ def test_retrieve_from_grid(adata):
     assert isinstance(frame, pl.DataFrame)
 
 
+def test_cellestial_plots_skip_spec_serialisation(adata, monkeypatch):
+    umap = cl.umap(adata, key="CD14") + scale_color_hue() + geom_point(aes(size="CD14"))
+    expected_mapping = {**umap.as_dict()["mapping"], **umap.as_dict()["layers"][0]["mapping"]}
+    expected_frame = umap.as_dict()["data"]
+
+    def serialise(self):
+        raise AssertionError
+
+    monkeypatch.setattr(PlotSpec, "as_dict", serialise)
+    assert cl.get_mapping(umap) == expected_mapping
+    assert cl.retrieve(umap) is expected_frame
+
+
+def test_cellestial_plots_are_registered_without_serialising(adata, group_key, monkeypatch):
+    def serialise(self):
+        raise AssertionError
+
+    monkeypatch.setattr(PlotSpec, "as_dict", serialise)
+    umap = cl.umap(adata, key="CD14")
+    violin = cl.violin(adata, "CD14", fill=group_key)
+    assert cl.get_mapping(umap)["color"] == "CD14"
+    assert cl.get_mapping(violin)["y"] == "CD14"
+
+
+def test_foreign_plots_fall_back_to_the_spec(adata):
+    umap = cl.umap(adata, key="CD14")
+    # same frame, different plot: the cellestial mapping must not leak into it
+    foreign = ggplot(cl.retrieve(umap)) + geom_point(aes(x="X_UMAP1", y="X_UMAP2", color="n"))
+    assert cl.get_mapping(foreign)["color"] == "n"
+    # layers appended after the plot was built are read from the spec
+    extended = umap + geom_point(aes(x="X_UMAP1", y="X_UMAP2", color="n"))
+    assert cl.get_mapping(extended, index=1)["color"] == "n"
+    assert cl.get_mapping(extended, index=0)["color"] == "CD14"
+
+
 def test_get_figure_single_index(adata):
     grid = cl.expressions(adata, keys=["CD14", "MS4A1", "NKG7", "CST3"], ncol=2)
     single = cl.get_figure(grid, index=0)